@@ -3,7 +3,7 @@ Inicializaci�n de la aplicaci�n Flask para Buko AI.
 """
 import logging
 import os
-import redis
+import sys
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -14,7 +14,6 @@ from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_socketio import SocketIO
 from flask_caching import Cache
-from celery import Celery
 
 # Extensiones globales
 db = SQLAlchemy()
@@ -35,8 +34,14 @@ def create_celery_app(app=None):
     """
     Crea y configura la instancia de Celery.
     """
+    from celery import Celery
+    
     app = app or create_app()
     
+    # Reutilizar la instancia ya creada para esta aplicación (create_app la inicializa)
+    if celery is not None and getattr(celery, 'flask_app', None) is app:
+        return celery
+    
     # Create a new Celery instance
     celery_app = Celery(app.import_name, include=[
         'app.tasks.book_generation',
@@ -79,10 +84,25 @@ def create_celery_app(app=None):
         """Contexto de aplicaci�n Flask para tareas de Celery."""
         def __call__(self, *args, **kwargs):
             with app.app_context():
-                return self.run(*args, **kwargs)
+                try:
+                    return self.run(*args, **kwargs)
+                finally:
+                    # Los logs del sistema se insertan por lotes: escribirlos antes de cerrar la tarea
+                    from app.models.system_log import SystemLog
+                    SystemLog.flush()
     
     celery_app.Task = ContextTask
     
+    # Los hijos prefork no deben reutilizar las conexiones abiertas por el padre
+    from celery.signals import worker_process_init
+    
+    @worker_process_init.connect(weak=False)
+    def dispose_inherited_pool(**kwargs):
+        with app.app_context():
+            db.engine.dispose(close=False)
+    
+    celery_app.flask_app = app
+    
     # Configurar autodiscovery para encontrar tareas con @shared_task
     celery_app.autodiscover_tasks(['app.tasks'])
     
@@ -99,9 +119,18 @@ def create_celery_app(app=None):
 def create_app(config_name=None):
     """
     Factory para crear la aplicaci�n Flask.
+    
+    Cada proceso debe llamarla una sola vez (``app.py``/``wsgi.py`` en la web,
+    el arranque del paquete en el CLI de Celery); también deja inicializada
+    la instancia global de Celery asociada a la aplicación.
     """
     app = Flask(__name__)
     
+    # Serialización JSON con orjson cuando está instalado
+    from app.utils.json_provider import ORJSONProvider, ORJSON_AVAILABLE
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
+    
     # Configuraci�n
     config_name = config_name or os.environ.get('FLASK_ENV', 'development')
     if config_name == 'development':
@@ -117,6 +146,23 @@ def create_app(config_name=None):
         from config.development import DevelopmentConfig
         app.config.from_object(DevelopmentConfig)
     
+    # En los procesos de Celery el pool se dimensiona para una tarea por proceso
+    if _is_celery_process():
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+            **app.config.get('CELERY_SQLALCHEMY_ENGINE_OPTIONS', {}),
+        }
+    
+    # Columnas JSON serializadas y parseadas con orjson
+    if ORJSON_AVAILABLE:
+        import orjson
+        from app.utils.json_provider import dumps_json_column
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+            'json_serializer': dumps_json_column,
+            'json_deserializer': orjson.loads,
+        }
+    
     # Inicializar extensiones
     db.init_app(app)
     migrate.init_app(app, db)
@@ -176,8 +222,14 @@ def create_app(config_name=None):
     request_logging = RequestLoggingMiddleware(app)
     
     # Configurar Redis y sistema de cache
+    import redis
     redis_url = app.config.get('REDIS_URL', 'redis://localhost:6380/0')
-    redis_client = redis.from_url(redis_url, decode_responses=True)
+    # Pool compartido; las respuestas se mantienen en bytes (el cache las usa sin decodificar)
+    redis_pool = redis.ConnectionPool.from_url(
+        redis_url,
+        max_connections=app.config.get('REDIS_MAX_CONNECTIONS', 50)
+    )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     
     # Inicializar sistema de cache avanzado
     cache_manager = init_cache_system(app, redis_client)
@@ -186,21 +238,22 @@ def create_app(config_name=None):
     from app.services.cache_service import CacheWarmupService
     from app.services.email_service import email_service
     
-    # Pre-calentar cache global al iniciar
-    try:
-        CacheWarmupService.warmup_global_cache()
-    except Exception as e:
-        app.logger.warning(f"Cache warmup failed: {str(e)}")
+    # Pre-calentar cache global al iniciar (solo en workers web)
+    if app.config.get('ENABLE_CACHE_WARMUP', False) and not _is_cli_context():
+        try:
+            CacheWarmupService.warmup_global_cache()
+        except Exception as e:
+            app.logger.warning(f"Cache warmup failed: {str(e)}")
     
     # Inicializar servicio de email
     email_service.init_app(app)
     
     app.logger.info('Buko AI startup - Logging, Cache, Email y Servicios configurados correctamente')
     
-    # Initialize Celery if not already done
+    # Inicializar Celery una sola vez por proceso
     global celery
     if celery is None:
-        celery = create_celery_app(app)
+        create_celery_app(app)
     
     return app
 
@@ -208,28 +261,58 @@ def create_app(config_name=None):
 # Importar modelos para que est�n disponibles para las migraciones
 from app.models import *
 
-# Inicializar Celery automáticamente para que esté disponible cuando se importa el módulo
-try:
-    _app = create_app()
-    celery = create_celery_app(_app)
+
+def _is_celery_process():
+    """Indica si el proceso es el CLI de Celery (worker, beat, flower, inspect)"""
+    return os.path.basename(sys.argv[0] if sys.argv else '') == 'celery'
+
+
+def _is_cli_context():
+    """
+    Indica si el proceso es un CLI/worker (flask CLI, scripts, Celery)
+    en lugar de un worker web.
+    """
+    if os.environ.get('FLASK_RUN_FROM_CLI') or os.environ.get('BUKO_CLI') == '1':
+        return True
+    return _is_celery_process()
+
+
+def _should_auto_init_celery():
+    """
+    Indica si Celery debe inicializarse al importar el paquete.
     
-    # Importar tareas para que se registren con @shared_task
-    from app.tasks import book_generation, email_tasks
-    # Importar payment_tasks y cleanup_tasks si existen
-    try:
-        from app.tasks import payment_tasks
-    except ImportError:
-        pass
+    Solo el CLI de Celery (worker, beat, flower, inspect) necesita ``app.celery``
+    listo al importar; los demás procesos llaman a ``create_app`` explícitamente.
+    Se puede forzar con ``BUKO_AUTO_INIT_CELERY=1``.
+    """
+    if os.environ.get('BUKO_AUTO_INIT_CELERY') == '1':
+        return True
+    return _is_celery_process()
+
+
+# Inicializar Celery automáticamente para que esté disponible cuando se importa el módulo
+if _should_auto_init_celery():
     try:
-        from app.tasks import cleanup_tasks
-    except ImportError:
-        pass
-    
-    # Asegurar que las tareas estén disponibles
-    globals()['celery'] = celery
-    
-except Exception as e:
-    # Si hay error en inicialización, mantener celery como None
-    import logging
-    logging.warning(f"Error initializing Celery in app module: {e}")
-    celery = None
\ No newline at end of file
+        # create_app ya deja inicializada la instancia global de Celery
+        _app = create_app()
+        
+        # Importar tareas para que se registren con @shared_task
+        from app.tasks import book_generation, email_tasks
+        # Importar payment_tasks y cleanup_tasks si existen
+        try:
+            from app.tasks import payment_tasks
+        except ImportError:
+            pass
+        try:
+            from app.tasks import cleanup_tasks
+        except ImportError:
+            pass
+        
+        # Asegurar que las tareas estén disponibles
+        globals()['celery'] = celery
+        
+    except Exception as e:
+        # Si hay error en inicialización, mantener celery como None
+        import logging
+        logging.warning(f"Error initializing Celery in app module: {e}")
+        celery = None
\ No newline at end of file
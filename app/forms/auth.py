@@ -2,18 +2,313 @@
 Formularios de autenticación para Buko AI
 """
 
+import re
+import sys
+from types import MappingProxyType
+
 from flask_wtf import FlaskForm
 from wtforms import (
     StringField, PasswordField, BooleanField, SubmitField,
     TextAreaField, SelectField, TelField, EmailField
 )
 from wtforms.validators import (
-    DataRequired, Email, Length, EqualTo, ValidationError,
-    Regexp, Optional
+    DataRequired, Email, Length, ValidationError,
+    StopValidation, Optional
 )
-from email_validator import validate_email, EmailNotValidError
 
-from app.models.user import User
+
+# Patrones de validación compilados una sola vez y compartidos por todos los formularios
+NAME_RE = re.compile(r'[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+')
+
+# Tabla que elimina los caracteres permitidos en teléfonos (solo ASCII)
+PHONE_CHARS_TABLE = str.maketrans('', '', '0123456789-() \t\n\r\f\v')
+
+
+def _intern_choices(choices):
+    """Interna los valores de las opciones para compararlos por identidad/hash cacheado"""
+    return tuple((sys.intern(value), label) for value, label in choices)
+
+
+# Opciones de los campos de selección (compartidas entre formularios)
+COUNTRY_CHOICES = _intern_choices((
+    ('', 'Selecciona tu país'),
+    ('CO', 'Colombia'),
+    ('MX', 'México'),
+    ('AR', 'Argentina'),
+    ('PE', 'Perú'),
+    ('CL', 'Chile'),
+    ('VE', 'Venezuela'),
+    ('EC', 'Ecuador'),
+    ('BO', 'Bolivia'),
+    ('PY', 'Paraguay'),
+    ('UY', 'Uruguay'),
+    ('ES', 'España'),
+    ('US', 'Estados Unidos'),
+    ('CA', 'Canadá'),
+    ('OTHER', 'Otro'),
+))
+
+PHONE_COUNTRY_CHOICES = _intern_choices((
+    ('', 'Código'),
+    ('+57', '+57 (Colombia)'),
+    ('+52', '+52 (México)'),
+    ('+54', '+54 (Argentina)'),
+    ('+51', '+51 (Perú)'),
+    ('+56', '+56 (Chile)'),
+    ('+58', '+58 (Venezuela)'),
+    ('+593', '+593 (Ecuador)'),
+    ('+591', '+591 (Bolivia)'),
+    ('+595', '+595 (Paraguay)'),
+    ('+598', '+598 (Uruguay)'),
+    ('+34', '+34 (España)'),
+    ('+1', '+1 (EE.UU./Canadá)'),
+))
+
+LANGUAGE_CHOICES = _intern_choices((
+    ('es', 'Español'),
+    ('en', 'English'),
+    ('pt', 'Português'),
+    ('fr', 'Français'),
+))
+
+# Zonas horarias IANA admitidas y su etiqueta visible
+TIMEZONE_LABELS = {
+    'UTC': 'UTC (Coordinated Universal Time)',
+    'America/Bogota': 'América/Bogotá (COT)',
+    'America/Mexico_City': 'América/México (CST)',
+    'America/Argentina/Buenos_Aires': 'América/Buenos Aires (ART)',
+    'America/Lima': 'América/Lima (PET)',
+    'America/Santiago': 'América/Santiago (CLT)',
+    'America/Caracas': 'América/Caracas (VET)',
+    'America/Guayaquil': 'América/Guayaquil (ECT)',
+    'America/La_Paz': 'América/La Paz (BOT)',
+    'America/Asuncion': 'América/Asunción (PYT)',
+    'America/Montevideo': 'América/Montevideo (UYT)',
+    'Europe/Madrid': 'Europa/Madrid (CET)',
+    'America/New_York': 'América/Nueva York (EST)',
+    'America/Los_Angeles': 'América/Los Ángeles (PST)',
+    'America/Toronto': 'América/Toronto (EST)',
+}
+TIMEZONE_KEYS = frozenset(TIMEZONE_LABELS)
+TIMEZONE_CHOICES = _intern_choices(TIMEZONE_LABELS.items())
+
+# Atributos HTML compartidos (solo lectura) para los campos que se repiten
+EMAIL_INPUT_ATTRS = MappingProxyType({
+    'placeholder': 'tu@email.com',
+    'class': 'form-control',
+    'autocomplete': 'email'
+})
+NEW_PASSWORD_INPUT_ATTRS = MappingProxyType({
+    'placeholder': 'Mínimo 8 caracteres',
+    'class': 'form-control',
+    'autocomplete': 'new-password'
+})
+CONFIRM_NEW_PASSWORD_INPUT_ATTRS = MappingProxyType({
+    'placeholder': 'Repite tu nueva contraseña',
+    'class': 'form-control',
+    'autocomplete': 'new-password'
+})
+CURRENT_PASSWORD_INPUT_ATTRS = MappingProxyType({
+    'placeholder': 'Tu contraseña actual',
+    'class': 'form-control',
+    'autocomplete': 'current-password'
+})
+SELECT_ATTRS = MappingProxyType({'class': 'form-select'})
+CHECKBOX_ATTRS = MappingProxyType({'class': 'form-check-input'})
+PRIMARY_BLOCK_BUTTON_ATTRS = MappingProxyType({'class': 'btn btn-primary w-100'})
+SUCCESS_BLOCK_BUTTON_ATTRS = MappingProxyType({'class': 'btn btn-success w-100'})
+PRIMARY_BUTTON_ATTRS = MappingProxyType({'class': 'btn btn-primary'})
+
+# Longitud a partir de la cual un email no puede ser válido ni tras normalizarlo
+# (254 bytes según RFC, con margen para la normalización Unicode de email_validator)
+EMAIL_MAX_INPUT_LENGTH = 1024
+
+# Palabra que confirma la eliminación de la cuenta
+DELETE_CONFIRMATION_WORD = 'ELIMINAR'
+
+# Requisitos de complejidad de contraseña (un bit por tipo de carácter)
+PASSWORD_MIN_LENGTH = 8
+PASSWORD_SYMBOLS = frozenset('@$!%*?&')
+PASSWORD_HAS_LOWER = 1
+PASSWORD_HAS_UPPER = 2
+PASSWORD_HAS_DIGIT = 4
+PASSWORD_HAS_SYMBOL = 8
+PASSWORD_ALL_CLASSES = PASSWORD_HAS_LOWER | PASSWORD_HAS_UPPER | PASSWORD_HAS_DIGIT | PASSWORD_HAS_SYMBOL
+
+
+def _lowercase_email(field):
+    """
+    Normaliza el email del campo a minúsculas una sola vez y lo guarda en el campo.
+    
+    Si ya está en minúsculas se reutiliza la misma cadena sin copiarla.
+    """
+    if not field.data.islower():
+        field.data = field.data.lower()
+    return field.data
+
+
+class PasswordComplexity:
+    """
+    Valida la complejidad de la contraseña en una sola pasada.
+    
+    Equivale a ``^(?=.*[a-z])(?=.*[A-Z])(?=.*\\d)(?=.*[@$!%*?&])[A-Za-z\\d@$!%*?&]{8,}$``
+    compilado con ``re.ASCII``, sin las cuatro búsquedas anticipadas: cada
+    carácter se clasifica una vez y se acumula en una máscara de bits.
+    """
+    
+    def __init__(self, message=None):
+        self.message = message
+    
+    def __call__(self, form, field):
+        password = field.data or ''
+        # El '$' del patrón original admite un salto de línea final
+        if password.endswith('\n'):
+            password = password[:-1]
+        
+        if len(password) >= PASSWORD_MIN_LENGTH:
+            flags = 0
+            for char in password:
+                if 'a' <= char <= 'z':
+                    flags |= PASSWORD_HAS_LOWER
+                elif 'A' <= char <= 'Z':
+                    flags |= PASSWORD_HAS_UPPER
+                elif '0' <= char <= '9':
+                    flags |= PASSWORD_HAS_DIGIT
+                elif char in PASSWORD_SYMBOLS:
+                    flags |= PASSWORD_HAS_SYMBOL
+                else:
+                    break
+            else:
+                if flags == PASSWORD_ALL_CLASSES:
+                    return
+        
+        raise ValidationError(self.message or field.gettext('Invalid input.'))
+
+
+class PhoneCharacters:
+    """
+    Valida que el teléfono solo tenga dígitos, espacios, guiones y paréntesis.
+    
+    Equivale a ``^[0-9\\s\\-\\(\\)]+$`` con ``re.ASCII`` usando ``str.translate``:
+    tras eliminar los caracteres permitidos no debe quedar nada.
+    """
+    
+    def __init__(self, message=None):
+        self.message = message
+    
+    def __call__(self, form, field):
+        phone = field.data or ''
+        remainder = phone.translate(PHONE_CHARS_TABLE)
+        if phone and not remainder:
+            return
+        
+        raise ValidationError(self.message or field.gettext('Invalid input.'))
+
+
+class KeySelectField(SelectField):
+    """
+    ``SelectField`` que valida la opción con una búsqueda en un ``frozenset``.
+    
+    Evita recorrer todas las opciones en ``pre_validate``; ``valid_keys``
+    debe contener exactamente los valores de ``choices``.
+    """
+    
+    def __init__(self, label=None, validators=None, valid_keys=frozenset(), **kwargs):
+        super().__init__(label, validators, **kwargs)
+        self.valid_keys = valid_keys
+    
+    def pre_validate(self, form):
+        if self.validate_choice and self.data not in self.valid_keys:
+            raise ValidationError(self.gettext('Not a valid choice.'))
+
+
+class RequiredText:
+    """
+    Valida en una sola llamada un texto requerido, de longitud acotada y,
+    opcionalmente, con un juego de caracteres restringido.
+    
+    Equivale a ``DataRequired`` + ``Length`` + ``Regexp`` con ``fullmatch``:
+    un valor vacío detiene la validación y, si fallan longitud y caracteres,
+    se reportan ambos errores en el mismo orden que la cadena original.
+    """
+    
+    def __init__(self, min_length, max_length, regex=None, required_message=None,
+                 length_message=None, regex_message=None):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.regex = regex
+        self.required_message = required_message
+        self.length_message = length_message
+        self.regex_message = regex_message
+        self.field_flags = {
+            'required': True,
+            'minlength': min_length,
+            'maxlength': max_length
+        }
+    
+    def __call__(self, form, field):
+        data = field.data
+        if not data or (isinstance(data, str) and not data.strip()):
+            field.errors[:] = []
+            raise StopValidation(self.required_message or field.gettext('This field is required.'))
+        
+        length_error = None
+        if not self.min_length <= len(data) <= self.max_length:
+            length_error = self.length_message or field.gettext('Invalid input.')
+        
+        if self.regex is not None and not self.regex.fullmatch(data):
+            # Ambos errores se reportan, como hacía la cadena de validadores
+            if length_error is not None:
+                field.errors.append(length_error)
+            raise ValidationError(self.regex_message or field.gettext('Invalid input.'))
+        
+        if length_error is not None:
+            raise ValidationError(length_error)
+
+
+class PrefilteredEmail(Email):
+    """
+    Validador ``Email`` con un prefiltro barato.
+    
+    Rechaza sin invocar ``email_validator`` las entradas que nunca pueden
+    ser válidas (sin '@', parte local o dominio vacíos, longitud imposible).
+    """
+    
+    def __call__(self, form, field):
+        data = field.data or ''
+        if (len(data) < 3 or len(data) > EMAIL_MAX_INPUT_LENGTH or '@' not in data
+                or data[0] == '@' or data[-1] == '@'):
+            raise ValidationError(self.message or field.gettext('Invalid email address.'))
+        
+        super().__call__(form, field)
+
+
+class MatchesField:
+    """
+    Valida que el campo coincida con otro campo del formulario.
+    
+    Sustituye a ``EqualTo``: accede al campo como atributo del formulario y
+    usa el mensaje tal cual, sin interpolación. Con ``required_message``
+    también hace el trabajo de ``DataRequired`` (detiene la validación si
+    el campo está vacío) sin un validador adicional.
+    """
+    
+    def __init__(self, fieldname, message=None, required_message=None):
+        self.fieldname = fieldname
+        self.message = message
+        self.required_message = required_message
+        if required_message is not None:
+            self.field_flags = {'required': True}
+    
+    def __call__(self, form, field):
+        data = field.data
+        if self.required_message is not None and (
+                not data or (isinstance(data, str) and not data.strip())):
+            field.errors[:] = []
+            raise StopValidation(self.required_message)
+        
+        if data != getattr(form, self.fieldname).data:
+            raise ValidationError(self.message or field.gettext('Field must be equal to %s.') % self.fieldname)
 
 
 class LoginForm(FlaskForm):
@@ -23,13 +318,9 @@ class LoginForm(FlaskForm):
         'Email',
         validators=[
             DataRequired(message='El email es requerido'),
-            Email(message='Formato de email inválido')
+            PrefilteredEmail(message='Formato de email inválido')
         ],
-        render_kw={
-            'placeholder': 'tu@email.com',
-            'class': 'form-control',
-            'autocomplete': 'email'
-        }
+        render_kw=EMAIL_INPUT_ATTRS
     )
     
     password = PasswordField(
@@ -46,30 +337,29 @@ class LoginForm(FlaskForm):
     
     remember_me = BooleanField(
         'Recordarme',
-        render_kw={'class': 'form-check-input'}
+        render_kw=CHECKBOX_ATTRS
     )
     
     submit = SubmitField(
         'Iniciar Sesión',
-        render_kw={'class': 'btn btn-primary w-100'}
+        render_kw=PRIMARY_BLOCK_BUTTON_ATTRS
     )
 
 
-class RegisterForm(FlaskForm):
-    """Formulario de registro de usuario"""
+class PersonalInfoMixin:
+    """Campos de información personal compartidos por registro y perfil"""
     
     first_name = StringField(
         'Nombre',
         validators=[
-            DataRequired(message='El nombre es requerido'),
-            Length(min=2, max=50, message='El nombre debe tener entre 2 y 50 caracteres'),
-            Regexp(
-                r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$',
-                message='El nombre solo puede contener letras y espacios'
+            RequiredText(
+                2, 50, NAME_RE,
+                required_message='El nombre es requerido',
+                length_message='El nombre debe tener entre 2 y 50 caracteres',
+                regex_message='El nombre solo puede contener letras y espacios'
             )
         ],
         render_kw={
-            'placeholder': 'Tu nombre',
             'class': 'form-control',
             'autocomplete': 'given-name'
         }
@@ -78,130 +368,97 @@ class RegisterForm(FlaskForm):
     last_name = StringField(
         'Apellido',
         validators=[
-            DataRequired(message='El apellido es requerido'),
-            Length(min=2, max=50, message='El apellido debe tener entre 2 y 50 caracteres'),
-            Regexp(
-                r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$',
-                message='El apellido solo puede contener letras y espacios'
+            RequiredText(
+                2, 50, NAME_RE,
+                required_message='El apellido es requerido',
+                length_message='El apellido debe tener entre 2 y 50 caracteres',
+                regex_message='El apellido solo puede contener letras y espacios'
             )
         ],
         render_kw={
-            'placeholder': 'Tu apellido',
             'class': 'form-control',
             'autocomplete': 'family-name'
         }
     )
     
-    email = EmailField(
-        'Email',
-        validators=[
-            DataRequired(message='El email es requerido'),
-            Email(message='Formato de email inválido'),
-            Length(max=120, message='El email es demasiado largo')
-        ],
-        render_kw={
-            'placeholder': 'tu@email.com',
-            'class': 'form-control',
-            'autocomplete': 'email'
-        }
-    )
-    
     country = SelectField(
         'País',
         validators=[DataRequired(message='El país es requerido')],
-        choices=[
-            ('', 'Selecciona tu país'),
-            ('CO', 'Colombia'),
-            ('MX', 'México'),
-            ('AR', 'Argentina'),
-            ('PE', 'Perú'),
-            ('CL', 'Chile'),
-            ('VE', 'Venezuela'),
-            ('EC', 'Ecuador'),
-            ('BO', 'Bolivia'),
-            ('PY', 'Paraguay'),
-            ('UY', 'Uruguay'),
-            ('ES', 'España'),
-            ('US', 'Estados Unidos'),
-            ('CA', 'Canadá'),
-            ('OTHER', 'Otro')
-        ],
-        render_kw={'class': 'form-select'}
+        choices=COUNTRY_CHOICES,
+        render_kw=SELECT_ATTRS
     )
     
     city = StringField(
         'Ciudad',
         validators=[
-            DataRequired(message='La ciudad es requerida'),
-            Length(min=2, max=100, message='La ciudad debe tener entre 2 y 100 caracteres')
+            RequiredText(
+                2, 100,
+                required_message='La ciudad es requerida',
+                length_message='La ciudad debe tener entre 2 y 100 caracteres'
+            )
         ],
         render_kw={
-            'placeholder': 'Tu ciudad',
             'class': 'form-control',
             'autocomplete': 'address-level2'
         }
     )
     
     phone_country = SelectField(
-        'Código País (Opcional)',
+        'Código País',
         validators=[Optional()],
-        choices=[
-            ('', 'Código'),
-            ('+57', '+57 (Colombia)'),
-            ('+52', '+52 (México)'),
-            ('+54', '+54 (Argentina)'),
-            ('+51', '+51 (Perú)'),
-            ('+56', '+56 (Chile)'),
-            ('+58', '+58 (Venezuela)'),
-            ('+593', '+593 (Ecuador)'),
-            ('+591', '+591 (Bolivia)'),
-            ('+595', '+595 (Paraguay)'),
-            ('+598', '+598 (Uruguay)'),
-            ('+34', '+34 (España)'),
-            ('+1', '+1 (EE.UU./Canadá)')
-        ],
-        render_kw={'class': 'form-select'}
+        choices=PHONE_COUNTRY_CHOICES,
+        render_kw=SELECT_ATTRS
     )
     
     phone_number = StringField(
-        'Teléfono (Opcional)',
+        'Teléfono',
         validators=[
             Optional(),
             Length(max=20, message='El teléfono es demasiado largo'),
-            Regexp(
-                r'^[0-9\s\-\(\)]+$',
+            PhoneCharacters(
                 message='El teléfono solo puede contener números, espacios, guiones y paréntesis'
             )
         ],
         render_kw={
-            'placeholder': '300 123 4567',
             'class': 'form-control',
             'autocomplete': 'tel'
         }
     )
+
+
+class RegisterForm(PersonalInfoMixin, FlaskForm):
+    """Formulario de registro de usuario"""
+    
+    email = EmailField(
+        'Email',
+        validators=[
+            DataRequired(message='El email es requerido'),
+            PrefilteredEmail(message='Formato de email inválido'),
+            Length(max=120, message='El email es demasiado largo')
+        ],
+        render_kw=EMAIL_INPUT_ATTRS
+    )
     
     password = PasswordField(
         'Contraseña',
         validators=[
             DataRequired(message='La contraseña es requerida'),
             Length(min=8, max=128, message='La contraseña debe tener al menos 8 caracteres'),
-            Regexp(
-                r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$',
+            PasswordComplexity(
                 message='La contraseña debe contener al menos: una minúscula, una mayúscula, un número y un símbolo'
             )
         ],
-        render_kw={
-            'placeholder': 'Mínimo 8 caracteres',
-            'class': 'form-control',
-            'autocomplete': 'new-password'
-        }
+        render_kw=NEW_PASSWORD_INPUT_ATTRS
     )
     
     confirm_password = PasswordField(
         'Confirmar Contraseña',
         validators=[
-            DataRequired(message='Confirma tu contraseña'),
-            EqualTo('password', message='Las contraseñas no coinciden')
+            MatchesField(
+                'password',
+                message='Las contraseñas no coinciden',
+                required_message='Confirma tu contraseña'
+            )
         ],
         render_kw={
             'placeholder': 'Repite tu contraseña',
@@ -213,14 +470,9 @@ class RegisterForm(FlaskForm):
     preferred_language = SelectField(
         'Idioma Preferido',
         validators=[DataRequired(message='Selecciona tu idioma preferido')],
-        choices=[
-            ('es', 'Español'),
-            ('en', 'English'),
-            ('pt', 'Português'),
-            ('fr', 'Français')
-        ],
+        choices=LANGUAGE_CHOICES,
         default='es',
-        render_kw={'class': 'form-select'}
+        render_kw=SELECT_ATTRS
     )
     
     terms_accepted = BooleanField(
@@ -228,30 +480,30 @@ class RegisterForm(FlaskForm):
         validators=[
             DataRequired(message='Debes aceptar los términos y condiciones')
         ],
-        render_kw={'class': 'form-check-input'}
+        render_kw=CHECKBOX_ATTRS
     )
     
     marketing_emails = BooleanField(
         'Deseo recibir emails sobre nuevas funcionalidades y promociones',
-        render_kw={'class': 'form-check-input'}
+        render_kw=CHECKBOX_ATTRS
     )
     
     submit = SubmitField(
         'Crear Cuenta',
-        render_kw={'class': 'btn btn-success w-100'}
+        render_kw=SUCCESS_BLOCK_BUTTON_ATTRS
     )
     
     def validate_email(self, email):
         """Validación personalizada para email único"""
-        try:
-            # Validación adicional de email
-            validate_email(email.data)
-        except EmailNotValidError:
-            raise ValidationError('Email inválido')
+        # El formato ya lo valida Email() (usa email_validator internamente);
+        # si lo rechazó no hace falta consultar la base de datos
+        normalized_email = _lowercase_email(email)
+        if email.errors:
+            return
         
         # Verificar que el email no esté en uso
-        user = User.find_by_email(email.data.lower())
-        if user:
+        from app.models.user import User
+        if User.email_exists(normalized_email):
             raise ValidationError('Este email ya está registrado')
 
 
@@ -262,26 +514,23 @@ class PasswordResetRequestForm(FlaskForm):
         'Email',
         validators=[
             DataRequired(message='El email es requerido'),
-            Email(message='Formato de email inválido')
+            PrefilteredEmail(message='Formato de email inválido')
         ],
-        render_kw={
-            'placeholder': 'tu@email.com',
-            'class': 'form-control',
-            'autocomplete': 'email'
-        }
+        render_kw=EMAIL_INPUT_ATTRS
     )
     
     submit = SubmitField(
         'Enviar Enlace de Restablecimiento',
-        render_kw={'class': 'btn btn-primary w-100'}
+        render_kw=PRIMARY_BLOCK_BUTTON_ATTRS
     )
     
     def validate_email(self, email):
         """Verificar que el email existe en el sistema"""
-        user = User.find_by_email(email.data.lower())
-        if not user:
+        from app.models.user import User
+        is_active = User.is_active_by_email(_lowercase_email(email))
+        if is_active is None:
             raise ValidationError('No existe una cuenta con este email')
-        if not user.is_active:
+        if not is_active:
             raise ValidationError('Esta cuenta está desactivada')
 
 
@@ -293,34 +542,28 @@ class PasswordResetForm(FlaskForm):
         validators=[
             DataRequired(message='La contraseña es requerida'),
             Length(min=8, max=128, message='La contraseña debe tener al menos 8 caracteres'),
-            Regexp(
-                r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$',
+            PasswordComplexity(
                 message='La contraseña debe contener al menos: una minúscula, una mayúscula, un número y un símbolo'
             )
         ],
-        render_kw={
-            'placeholder': 'Mínimo 8 caracteres',
-            'class': 'form-control',
-            'autocomplete': 'new-password'
-        }
+        render_kw=NEW_PASSWORD_INPUT_ATTRS
     )
     
     confirm_password = PasswordField(
         'Confirmar Nueva Contraseña',
         validators=[
-            DataRequired(message='Confirma tu nueva contraseña'),
-            EqualTo('password', message='Las contraseñas no coinciden')
+            MatchesField(
+                'password',
+                message='Las contraseñas no coinciden',
+                required_message='Confirma tu nueva contraseña'
+            )
         ],
-        render_kw={
-            'placeholder': 'Repite tu nueva contraseña',
-            'class': 'form-control',
-            'autocomplete': 'new-password'
-        }
+        render_kw=CONFIRM_NEW_PASSWORD_INPUT_ATTRS
     )
     
     submit = SubmitField(
         'Cambiar Contraseña',
-        render_kw={'class': 'btn btn-success w-100'}
+        render_kw=SUCCESS_BLOCK_BUTTON_ATTRS
     )
 
 
@@ -332,11 +575,7 @@ class ChangePasswordForm(FlaskForm):
         validators=[
             DataRequired(message='La contraseña actual es requerida')
         ],
-        render_kw={
-            'placeholder': 'Tu contraseña actual',
-            'class': 'form-control',
-            'autocomplete': 'current-password'
-        }
+        render_kw=CURRENT_PASSWORD_INPUT_ATTRS
     )
     
     new_password = PasswordField(
@@ -344,34 +583,28 @@ class ChangePasswordForm(FlaskForm):
         validators=[
             DataRequired(message='La nueva contraseña es requerida'),
             Length(min=8, max=128, message='La contraseña debe tener al menos 8 caracteres'),
-            Regexp(
-                r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$',
+            PasswordComplexity(
                 message='La contraseña debe contener al menos: una minúscula, una mayúscula, un número y un símbolo'
             )
         ],
-        render_kw={
-            'placeholder': 'Mínimo 8 caracteres',
-            'class': 'form-control',
-            'autocomplete': 'new-password'
-        }
+        render_kw=NEW_PASSWORD_INPUT_ATTRS
     )
     
     confirm_new_password = PasswordField(
         'Confirmar Nueva Contraseña',
         validators=[
-            DataRequired(message='Confirma tu nueva contraseña'),
-            EqualTo('new_password', message='Las contraseñas no coinciden')
+            MatchesField(
+                'new_password',
+                message='Las contraseñas no coinciden',
+                required_message='Confirma tu nueva contraseña'
+            )
         ],
-        render_kw={
-            'placeholder': 'Repite tu nueva contraseña',
-            'class': 'form-control',
-            'autocomplete': 'new-password'
-        }
+        render_kw=CONFIRM_NEW_PASSWORD_INPUT_ATTRS
     )
     
     submit = SubmitField(
         'Cambiar Contraseña',
-        render_kw={'class': 'btn btn-primary'}
+        render_kw=PRIMARY_BUTTON_ATTRS
     )
 
 
@@ -384,113 +617,9 @@ class EmailVerificationRequestForm(FlaskForm):
     )
 
 
-class ProfileForm(FlaskForm):
+class ProfileForm(PersonalInfoMixin, FlaskForm):
     """Formulario para actualizar perfil de usuario"""
     
-    first_name = StringField(
-        'Nombre',
-        validators=[
-            DataRequired(message='El nombre es requerido'),
-            Length(min=2, max=50, message='El nombre debe tener entre 2 y 50 caracteres'),
-            Regexp(
-                r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$',
-                message='El nombre solo puede contener letras y espacios'
-            )
-        ],
-        render_kw={
-            'class': 'form-control',
-            'autocomplete': 'given-name'
-        }
-    )
-    
-    last_name = StringField(
-        'Apellido',
-        validators=[
-            DataRequired(message='El apellido es requerido'),
-            Length(min=2, max=50, message='El apellido debe tener entre 2 y 50 caracteres'),
-            Regexp(
-                r'^[a-zA-ZáéíóúÁÉÍÓÚñÑüÜ\s]+$',
-                message='El apellido solo puede contener letras y espacios'
-            )
-        ],
-        render_kw={
-            'class': 'form-control',
-            'autocomplete': 'family-name'
-        }
-    )
-    
-    country = SelectField(
-        'País',
-        validators=[DataRequired(message='El país es requerido')],
-        choices=[
-            ('', 'Selecciona tu país'),
-            ('CO', 'Colombia'),
-            ('MX', 'México'),
-            ('AR', 'Argentina'),
-            ('PE', 'Perú'),
-            ('CL', 'Chile'),
-            ('VE', 'Venezuela'),
-            ('EC', 'Ecuador'),
-            ('BO', 'Bolivia'),
-            ('PY', 'Paraguay'),
-            ('UY', 'Uruguay'),
-            ('ES', 'España'),
-            ('US', 'Estados Unidos'),
-            ('CA', 'Canadá'),
-            ('OTHER', 'Otro')
-        ],
-        render_kw={'class': 'form-select'}
-    )
-    
-    city = StringField(
-        'Ciudad',
-        validators=[
-            DataRequired(message='La ciudad es requerida'),
-            Length(min=2, max=100, message='La ciudad debe tener entre 2 y 100 caracteres')
-        ],
-        render_kw={
-            'class': 'form-control',
-            'autocomplete': 'address-level2'
-        }
-    )
-    
-    phone_country = SelectField(
-        'Código País',
-        validators=[Optional()],
-        choices=[
-            ('', 'Código'),
-            ('+57', '+57 (Colombia)'),
-            ('+52', '+52 (México)'),
-            ('+54', '+54 (Argentina)'),
-            ('+51', '+51 (Perú)'),
-            ('+56', '+56 (Chile)'),
-            ('+58', '+58 (Venezuela)'),
-            ('+593', '+593 (Ecuador)'),
-            ('+591', '+591 (Bolivia)'),
-            ('+595', '+595 (Paraguay)'),
-            ('+598', '+598 (Uruguay)'),
-            ('+34', '+34 (España)'),
-            ('+1', '+1 (EE.UU./Canadá)')
-        ],
-        render_kw={'class': 'form-select'}
-    )
-    
-    phone_number = StringField(
-        'Teléfono',
-        validators=[
-            Optional(),
-            Length(max=20, message='El teléfono es demasiado largo'),
-            Regexp(
-                r'^[0-9\s\-\(\)]+$',
-                message='El teléfono solo puede contener números, espacios, guiones y paréntesis'
-            )
-        ],
-        render_kw={
-            'class': 'form-control',
-            'autocomplete': 'tel'
-        }
-    )
-    
     billing_address = TextAreaField(
         'Dirección de Facturación',
         validators=[
@@ -507,41 +636,21 @@ class ProfileForm(FlaskForm):
     preferred_language = SelectField(
         'Idioma Preferido',
         validators=[DataRequired(message='Selecciona tu idioma preferido')],
-        choices=[
-            ('es', 'Español'),
-            ('en', 'English'),
-            ('pt', 'Português'),
-            ('fr', 'Français')
-        ],
-        render_kw={'class': 'form-select'}
+        choices=LANGUAGE_CHOICES,
+        render_kw=SELECT_ATTRS
     )
     
-    timezone = SelectField(
+    timezone = KeySelectField(
         'Zona Horaria',
         validators=[DataRequired(message='Selecciona tu zona horaria')],
-        choices=[
-            ('UTC', 'UTC (Coordinated Universal Time)'),
-            ('America/Bogota', 'América/Bogotá (COT)'),
-            ('America/Mexico_City', 'América/México (CST)'),
-            ('America/Argentina/Buenos_Aires', 'América/Buenos Aires (ART)'),
-            ('America/Lima', 'América/Lima (PET)'),
-            ('America/Santiago', 'América/Santiago (CLT)'),
-            ('America/Caracas', 'América/Caracas (VET)'),
-            ('America/Guayaquil', 'América/Guayaquil (ECT)'),
-            ('America/La_Paz', 'América/La Paz (BOT)'),
-            ('America/Asuncion', 'América/Asunción (PYT)'),
-            ('America/Montevideo', 'América/Montevideo (UYT)'),
-            ('Europe/Madrid', 'Europa/Madrid (CET)'),
-            ('America/New_York', 'América/Nueva York (EST)'),
-            ('America/Los_Angeles', 'América/Los Ángeles (PST)'),
-            ('America/Toronto', 'América/Toronto (EST)')
-        ],
-        render_kw={'class': 'form-select'}
+        choices=TIMEZONE_CHOICES,
+        valid_keys=TIMEZONE_KEYS,
+        render_kw=SELECT_ATTRS
     )
     
     submit = SubmitField(
         'Actualizar Perfil',
-        render_kw={'class': 'btn btn-primary'}
+        render_kw=PRIMARY_BUTTON_ATTRS
     )
 
 
@@ -553,11 +662,7 @@ class DeleteAccountForm(FlaskForm):
         validators=[
             DataRequired(message='La contraseña es requerida para eliminar la cuenta')
         ],
-        render_kw={
-            'placeholder': 'Tu contraseña actual',
-            'class': 'form-control',
-            'autocomplete': 'current-password'
-        }
+        render_kw=CURRENT_PASSWORD_INPUT_ATTRS
     )
     
     confirmation = StringField(
@@ -578,5 +683,7 @@ class DeleteAccountForm(FlaskForm):
 
     def validate_confirmation(self, confirmation):
         """Validación personalizada para confirmación"""
-        if confirmation.data != 'ELIMINAR':
+        # Descartar por longitud antes de comparar (entradas pegadas muy largas)
+        data = confirmation.data
+        if len(data) != len(DELETE_CONFIRMATION_WORD) or data != DELETE_CONFIRMATION_WORD:
             raise ValidationError('Debes escribir exactamente "ELIMINAR"')
\ No newline at end of file
@@ -2,9 +2,14 @@
 Modelos de Buko AI
 """
 
+import textwrap
+from types import MappingProxyType
+
+from sqlalchemy import inspect
+
 from .base import db, BaseModel, SoftDeleteMixin, TimestampMixin, AuditMixin
 from .user import User, UserStatus, SubscriptionType
-from .book_generation import BookGeneration, BookStatus, BookFormat
+from .book_generation import BookGeneration, BookFile, BookStatus, BookFormat
 from .subscription import Subscription, Payment, PaymentStatus, PaymentMethod
 from .system_log import SystemLog, BookDownload, Referral, LogLevel, LogStatus
 from .email_template import EmailTemplate
@@ -20,6 +25,7 @@ __all__ = [
     'UserStatus',
     'SubscriptionType',
     'BookGeneration',
+    'BookFile',
     'BookStatus',
     'BookFormat',
     'Subscription',
@@ -35,13 +41,192 @@ __all__ = [
 ]
 
 
+def _normalize_email_template(template: dict) -> MappingProxyType:
+    """Quita la indentación de los contenidos y congela la plantilla"""
+    return MappingProxyType({
+        **template,
+        'html_content': textwrap.dedent(template['html_content']).strip(),
+        'text_content': textwrap.dedent(template['text_content']).strip()
+    })
+
+
+# Plantillas de email por defecto; el contenido se desindenta una sola vez al importar
+DEFAULT_EMAIL_TEMPLATES = tuple(map(_normalize_email_template, (
+    {
+        'name': 'welcome',
+        'subject': 'Bienvenido a Buko AI',
+        'html_content': '''
+        <html>
+            <body>
+                <h1>�Bienvenido a Buko AI!</h1>
+                <p>Hola {{ first_name }},</p>
+                <p>Gracias por registrarte en Buko AI. �Estamos emocionados de ayudarte a crear libros incre�bles!</p>
+                <p>Puedes comenzar a crear tu primer libro visitando tu <a href="{{ dashboard_url }}">dashboard</a>.</p>
+                <p>Si tienes alguna pregunta, no dudes en contactarnos.</p>
+                <p>�Saludos!<br>El equipo de Buko AI</p>
+            </body>
+        </html>
+        ''',
+        'text_content': '''
+        �Bienvenido a Buko AI!
+        
+        Hola {{ first_name }},
+        
+        Gracias por registrarte en Buko AI. �Estamos emocionados de ayudarte a crear libros incre�bles!
+        
+        Puedes comenzar a crear tu primer libro visitando tu dashboard: {{ dashboard_url }}
+        
+        Si tienes alguna pregunta, no dudes en contactarnos.
+        
+        �Saludos!
+        El equipo de Buko AI
+        ''',
+        'variables': {
+            'first_name': 'string',
+            'dashboard_url': 'string'
+        }
+    },
+    {
+        'name': 'book_completed',
+        'subject': 'Tu libro "{{ book_title }}" est� listo',
+        'html_content': '''
+        <html>
+            <body>
+                <h1>�Tu libro est� listo!</h1>
+                <p>Hola {{ first_name }},</p>
+                <p>Tu libro <strong>"{{ book_title }}"</strong> ha sido generado exitosamente.</p>
+                <p><strong>Estad�sticas:</strong></p>
+                <ul>
+                    <li>P�ginas: {{ pages }}</li>
+                    <li>Palabras: {{ words }}</li>
+                    <li>Tiempo de generaci�n: {{ generation_time }}</li>
+                </ul>
+                <p>Puedes descargarlo desde tu <a href="{{ download_url }}">dashboard</a>.</p>
+                <p>�Esperamos que disfrutes tu nuevo libro!</p>
+                <p>�Saludos!<br>El equipo de Buko AI</p>
+            </body>
+        </html>
+        ''',
+        'text_content': '''
+        �Tu libro est� listo!
+        
+        Hola {{ first_name }},
+        
+        Tu libro "{{ book_title }}" ha sido generado exitosamente.
+        
+        Estad�sticas:
+        - P�ginas: {{ pages }}
+        - Palabras: {{ words }}
+        - Tiempo de generaci�n: {{ generation_time }}
+        
+        Puedes descargarlo desde tu dashboard: {{ download_url }}
+        
+        �Esperamos que disfrutes tu nuevo libro!
+        
+        �Saludos!
+        El equipo de Buko AI
+        ''',
+        'variables': {
+            'first_name': 'string',
+            'book_title': 'string',
+            'pages': 'number',
+            'words': 'number',
+            'generation_time': 'string',
+            'download_url': 'string'
+        }
+    },
+    {
+        'name': 'password_reset',
+        'subject': 'Restablece tu contrase�a en Buko AI',
+        'html_content': '''
+        <html>
+            <body>
+                <h1>Restablece tu contrase�a</h1>
+                <p>Hola {{ first_name }},</p>
+                <p>Hemos recibido una solicitud para restablecer tu contrase�a.</p>
+                <p>Haz clic en el siguiente enlace para crear una nueva contrase�a:</p>
+                <p><a href="{{ reset_url }}">Restablecer contrase�a</a></p>
+                <p>Este enlace expirar� en {{ expiry_hours }} hora(s).</p>
+                <p>Si no solicitaste este cambio, puedes ignorar este email.</p>
+                <p>�Saludos!<br>El equipo de Buko AI</p>
+            </body>
+        </html>
+        ''',
+        'text_content': '''
+        Restablece tu contrase�a
+        
+        Hola {{ first_name }},
+        
+        Hemos recibido una solicitud para restablecer tu contrase�a.
+        
+        Haz clic en el siguiente enlace para crear una nueva contrase�a:
+        {{ reset_url }}
+        
+        Este enlace expirar� en {{ expiry_hours }} hora(s).
+        
+        Si no solicitaste este cambio, puedes ignorar este email.
+        
+        �Saludos!
+        El equipo de Buko AI
+        ''',
+        'variables': {
+            'first_name': 'string',
+            'reset_url': 'string',
+            'expiry_hours': 'number'
+        }
+    },
+    {
+        'name': 'email_verification',
+        'subject': 'Verifica tu cuenta en Buko AI',
+        'html_content': '''
+        <html>
+            <body>
+                <h1>Verifica tu cuenta</h1>
+                <p>Hola {{ first_name }},</p>
+                <p>Gracias por registrarte en Buko AI. Para completar tu registro, necesitamos verificar tu direcci�n de email.</p>
+                <p>Haz clic en el siguiente enlace para verificar tu cuenta:</p>
+                <p><a href="{{ verification_url }}">Verificar cuenta</a></p>
+                <p>Este enlace expirar� en {{ expiry_hours }} hora(s).</p>
+                <p>Si no te registraste en Buko AI, puedes ignorar este email.</p>
+                <p>�Saludos!<br>El equipo de Buko AI</p>
+            </body>
+        </html>
+        ''',
+        'text_content': '''
+        Verifica tu cuenta
+        
+        Hola {{ first_name }},
+        
+        Gracias por registrarte en Buko AI. Para completar tu registro, necesitamos verificar tu direcci�n de email.
+        
+        Haz clic en el siguiente enlace para verificar tu cuenta:
+        {{ verification_url }}
+        
+        Este enlace expirar� en {{ expiry_hours }} hora(s).
+        
+        Si no te registraste en Buko AI, puedes ignorar este email.
+        
+        �Saludos!
+        El equipo de Buko AI
+        ''',
+        'variables': {
+            'first_name': 'string',
+            'verification_url': 'string',
+            'expiry_hours': 'number'
+        }
+    },
+)))
+
+
 def init_db(app):
     """Inicializa la base de datos con la aplicacion Flask"""
     db.init_app(app)
     
-    # Crear todas las tablas
+    # Crear las tablas solo si falta alguna (una consulta en lugar de una por tabla)
     with app.app_context():
-        db.create_all()
+        existing_tables = set(inspect(db.engine).get_table_names())
+        if not existing_tables.issuperset(db.metadata.tables):
+            db.create_all()
         
         # Insertar datos iniciales si es necesario
         create_default_data()
@@ -58,177 +243,20 @@ def create_default_data():
 
 def create_default_email_templates():
     """Crea plantillas de email por defecto"""
-    templates = [
-        {
-            'name': 'welcome',
-            'subject': 'Bienvenido a Buko AI',
-            'html_content': '''
-            <html>
-                <body>
-                    <h1>�Bienvenido a Buko AI!</h1>
-                    <p>Hola {{ first_name }},</p>
-                    <p>Gracias por registrarte en Buko AI. �Estamos emocionados de ayudarte a crear libros incre�bles!</p>
-                    <p>Puedes comenzar a crear tu primer libro visitando tu <a href="{{ dashboard_url }}">dashboard</a>.</p>
-                    <p>Si tienes alguna pregunta, no dudes en contactarnos.</p>
-                    <p>�Saludos!<br>El equipo de Buko AI</p>
-                </body>
-            </html>
-            ''',
-            'text_content': '''
-            �Bienvenido a Buko AI!
-            
-            Hola {{ first_name }},
-            
-            Gracias por registrarte en Buko AI. �Estamos emocionados de ayudarte a crear libros incre�bles!
-            
-            Puedes comenzar a crear tu primer libro visitando tu dashboard: {{ dashboard_url }}
-            
-            Si tienes alguna pregunta, no dudes en contactarnos.
-            
-            �Saludos!
-            El equipo de Buko AI
-            ''',
-            'variables': {
-                'first_name': 'string',
-                'dashboard_url': 'string'
-            }
-        },
-        {
-            'name': 'book_completed',
-            'subject': 'Tu libro "{{ book_title }}" est� listo',
-            'html_content': '''
-            <html>
-                <body>
-                    <h1>�Tu libro est� listo!</h1>
-                    <p>Hola {{ first_name }},</p>
-                    <p>Tu libro <strong>"{{ book_title }}"</strong> ha sido generado exitosamente.</p>
-                    <p><strong>Estad�sticas:</strong></p>
-                    <ul>
-                        <li>P�ginas: {{ pages }}</li>
-                        <li>Palabras: {{ words }}</li>
-                        <li>Tiempo de generaci�n: {{ generation_time }}</li>
-                    </ul>
-                    <p>Puedes descargarlo desde tu <a href="{{ download_url }}">dashboard</a>.</p>
-                    <p>�Esperamos que disfrutes tu nuevo libro!</p>
-                    <p>�Saludos!<br>El equipo de Buko AI</p>
-                </body>
-            </html>
-            ''',
-            'text_content': '''
-            �Tu libro est� listo!
-            
-            Hola {{ first_name }},
-            
-            Tu libro "{{ book_title }}" ha sido generado exitosamente.
-            
-            Estad�sticas:
-            - P�ginas: {{ pages }}
-            - Palabras: {{ words }}
-            - Tiempo de generaci�n: {{ generation_time }}
-            
-            Puedes descargarlo desde tu dashboard: {{ download_url }}
-            
-            �Esperamos que disfrutes tu nuevo libro!
-            
-            �Saludos!
-            El equipo de Buko AI
-            ''',
-            'variables': {
-                'first_name': 'string',
-                'book_title': 'string',
-                'pages': 'number',
-                'words': 'number',
-                'generation_time': 'string',
-                'download_url': 'string'
-            }
-        },
-        {
-            'name': 'password_reset',
-            'subject': 'Restablece tu contrase�a en Buko AI',
-            'html_content': '''
-            <html>
-                <body>
-                    <h1>Restablece tu contrase�a</h1>
-                    <p>Hola {{ first_name }},</p>
-                    <p>Hemos recibido una solicitud para restablecer tu contrase�a.</p>
-                    <p>Haz clic en el siguiente enlace para crear una nueva contrase�a:</p>
-                    <p><a href="{{ reset_url }}">Restablecer contrase�a</a></p>
-                    <p>Este enlace expirar� en {{ expiry_hours }} hora(s).</p>
-                    <p>Si no solicitaste este cambio, puedes ignorar este email.</p>
-                    <p>�Saludos!<br>El equipo de Buko AI</p>
-                </body>
-            </html>
-            ''',
-            'text_content': '''
-            Restablece tu contrase�a
-            
-            Hola {{ first_name }},
-            
-            Hemos recibido una solicitud para restablecer tu contrase�a.
-            
-            Haz clic en el siguiente enlace para crear una nueva contrase�a:
-            {{ reset_url }}
-            
-            Este enlace expirar� en {{ expiry_hours }} hora(s).
-            
-            Si no solicitaste este cambio, puedes ignorar este email.
-            
-            �Saludos!
-            El equipo de Buko AI
-            ''',
-            'variables': {
-                'first_name': 'string',
-                'reset_url': 'string',
-                'expiry_hours': 'number'
-            }
-        },
-        {
-            'name': 'email_verification',
-            'subject': 'Verifica tu cuenta en Buko AI',
-            'html_content': '''
-            <html>
-                <body>
-                    <h1>Verifica tu cuenta</h1>
-                    <p>Hola {{ first_name }},</p>
-                    <p>Gracias por registrarte en Buko AI. Para completar tu registro, necesitamos verificar tu direcci�n de email.</p>
-                    <p>Haz clic en el siguiente enlace para verificar tu cuenta:</p>
-                    <p><a href="{{ verification_url }}">Verificar cuenta</a></p>
-                    <p>Este enlace expirar� en {{ expiry_hours }} hora(s).</p>
-                    <p>Si no te registraste en Buko AI, puedes ignorar este email.</p>
-                    <p>�Saludos!<br>El equipo de Buko AI</p>
-                </body>
-            </html>
-            ''',
-            'text_content': '''
-            Verifica tu cuenta
-            
-            Hola {{ first_name }},
-            
-            Gracias por registrarte en Buko AI. Para completar tu registro, necesitamos verificar tu direcci�n de email.
-            
-            Haz clic en el siguiente enlace para verificar tu cuenta:
-            {{ verification_url }}
-            
-            Este enlace expirar� en {{ expiry_hours }} hora(s).
-            
-            Si no te registraste en Buko AI, puedes ignorar este email.
-            
-            �Saludos!
-            El equipo de Buko AI
-            ''',
-            'variables': {
-                'first_name': 'string',
-                'verification_url': 'string',
-                'expiry_hours': 'number'
-            }
-        }
+    # Una sola consulta para saber cuáles existen y un solo INSERT para el resto
+    names = [template_data['name'] for template_data in DEFAULT_EMAIL_TEMPLATES]
+    existing_names = {
+        name for (name,) in db.session.query(EmailTemplate.name).filter(
+            EmailTemplate.name.in_(names)
+        )
+    }
+    missing_templates = [
+        dict(template_data) for template_data in DEFAULT_EMAIL_TEMPLATES
+        if template_data['name'] not in existing_names
     ]
     
-    for template_data in templates:
-        existing_template = EmailTemplate.query.filter_by(name=template_data['name']).first()
-        if not existing_template:
-            template = EmailTemplate(**template_data)
-            template.save()
+    if missing_templates:
+        EmailTemplate.bulk_create(missing_templates)
 
 
 def create_admin_user():
@@ -238,8 +266,7 @@ def create_admin_user():
     admin_email = current_app.config.get('ADMIN_EMAIL', 'admin@buko-ai.com')
     admin_password = current_app.config.get('ADMIN_PASSWORD', 'admin123')
     
-    existing_admin = User.find_by_email(admin_email)
-    if not existing_admin:
+    if not User.email_exists(admin_email):
         admin = User(
             email=admin_email,
             password=admin_password,
@@ -261,22 +288,27 @@ def create_admin_user():
 
 def reset_monthly_usage():
     """Resetea el uso mensual de todos los usuarios"""
-    from datetime import datetime, timedelta
+    from datetime import datetime, timedelta, timezone
     
     # Resetear usuarios cuyo �ltimo reset fue hace m�s de un mes
     one_month_ago = datetime.utcnow() - timedelta(days=30)
     
-    users_to_reset = User.query.filter(
+    # Un solo UPDATE en el servidor en lugar de cargar y confirmar usuario por usuario
+    users_reset = User.query.filter(
         User.last_reset_date < one_month_ago
-    ).all()
-    
-    for user in users_to_reset:
-        user.reset_monthly_usage()
+    ).update(
+        {
+            User.books_used_this_month: 0,
+            User.last_reset_date: datetime.now(timezone.utc)
+        },
+        synchronize_session=False
+    )
+    db.session.commit()
     
     # Log de reset mensual
     SystemLog.log_action(
         action='monthly_usage_reset',
-        details={'users_reset': len(users_to_reset)},
+        details={'users_reset': users_reset},
         level=LogLevel.INFO
     )
 
@@ -287,44 +319,61 @@ def cleanup_old_logs(days: int = 30):
     
     cutoff_date = datetime.utcnow() - timedelta(days=days)
     
-    old_logs = SystemLog.query.filter(
+    # Un solo DELETE en el servidor; SystemLog no tiene dependientes en cascada
+    logs_deleted = SystemLog.query.filter(
         SystemLog.created_at < cutoff_date
-    ).all()
-    
-    for log in old_logs:
-        log.delete()
+    ).delete(synchronize_session=False)
+    db.session.commit()
     
     # Log de limpieza
     SystemLog.log_action(
         action='logs_cleanup',
-        details={'logs_deleted': len(old_logs), 'days': days},
+        details={'logs_deleted': logs_deleted, 'days': days},
         level=LogLevel.INFO
     )
 
 
+def _counts_by(column) -> dict:
+    """Cuenta las filas agrupadas por los valores de una columna en una sola consulta"""
+    return dict(
+        db.session.query(column, db.func.count()).group_by(column).all()
+    )
+
+
 def get_database_statistics():
     """Retorna estad�sticas de la base de datos"""
+    # Una consulta agrupada por tabla y columna en lugar de un COUNT por valor
+    users_by_status = _counts_by(User.status)
+    users_by_verified = _counts_by(User.email_verified)
+    users_by_subscription = _counts_by(User.subscription_type)
+    books_by_status = _counts_by(BookGeneration.status)
+    payments_by_status = _counts_by(Payment.status)
+    
     stats = {
         'users': {
-            'total': User.query.count(),
-            'active': User.query.filter_by(status=UserStatus.ACTIVE).count(),
-            'verified': User.query.filter_by(email_verified=True).count(),
-            'by_subscription': {}
+            'total': sum(users_by_status.values()),
+            'active': users_by_status.get(UserStatus.ACTIVE, 0),
+            'verified': users_by_verified.get(True, 0),
+            # Todos los tipos de suscripción, con 0 para los que no tienen usuarios
+            'by_subscription': {
+                sub_type.value: users_by_subscription.get(sub_type, 0)
+                for sub_type in SubscriptionType
+            }
         },
         'books': {
-            'total': BookGeneration.query.count(),
-            'completed': BookGeneration.query.filter_by(status=BookStatus.COMPLETED).count(),
-            'processing': BookGeneration.query.filter_by(status=BookStatus.PROCESSING).count(),
-            'failed': BookGeneration.query.filter_by(status=BookStatus.FAILED).count(),
-            'queued': BookGeneration.query.filter_by(status=BookStatus.QUEUED).count(),
+            'total': sum(books_by_status.values()),
+            'completed': books_by_status.get(BookStatus.COMPLETED, 0),
+            'processing': books_by_status.get(BookStatus.PROCESSING, 0),
+            'failed': books_by_status.get(BookStatus.FAILED, 0),
+            'queued': books_by_status.get(BookStatus.QUEUED, 0),
         },
         'subscriptions': {
             'total': Subscription.query.count(),
-            'active': len(Subscription.get_active_subscriptions()),
+            'active': Subscription.count_active(),
         },
         'payments': {
-            'total': Payment.query.count(),
-            'completed': Payment.query.filter_by(status=PaymentStatus.COMPLETED).count(),
+            'total': sum(payments_by_status.values()),
+            'completed': payments_by_status.get(PaymentStatus.COMPLETED, 0),
             'total_revenue': Payment.get_total_revenue(),
         },
         'downloads': {
@@ -333,10 +382,4 @@ def get_database_statistics():
         }
     }
     
-    # Estad�sticas por tipo de suscripci�n
-    for sub_type in SubscriptionType:
-        stats['users']['by_subscription'][sub_type.value] = User.query.filter_by(
-            subscription_type=sub_type
-        ).count()
-    
     return stats
\ No newline at end of file
@@ -3,44 +3,98 @@ Modelos base para Buko AI
 """
 
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, DateTime, Integer, String, Boolean, Text, JSON
+from sqlalchemy import Column, DateTime, Integer, String, Boolean, Text, JSON, Uuid, Enum as SQLEnum, insert, select, bindparam
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-import uuid
 
 db = SQLAlchemy()
 
 
+def _enum_to_json(value: Any) -> Any:
+    """Valor de un Enum"""
+    try:
+        return value.value
+    except AttributeError:
+        # Columna Enum asignada con una cadena y aún sin recargar
+        return value
+
+
+def _datetime_to_json(value: Any) -> Any:
+    """Fecha en formato ISO 8601"""
+    return value.isoformat()
+
+
+def _uuid_to_json(value: Any) -> Any:
+    """UUID como cadena"""
+    return str(value)
+
+
+def _commit_or_flush(commit: bool) -> None:
+    """Confirma la transacción o, si el llamador la agrupa, solo envía los cambios"""
+    if commit:
+        db.session.commit()
+    else:
+        db.session.flush()
+
+
+def _column_converter(column_type) -> Optional[Callable[[Any], Any]]:
+    """Elige la conversión a JSON según el tipo de la columna"""
+    if isinstance(column_type, SQLEnum):
+        return _enum_to_json
+    if isinstance(column_type, DateTime):
+        return _datetime_to_json
+    if isinstance(column_type, Uuid):
+        return _uuid_to_json
+    return None
+
+
 class BaseModel(db.Model):
-    """Modelo base con campos comunes"""
+    """
+    Modelo base con campos comunes.
+    
+    Las columnas Text/JSON grandes de los modelos derivados se declaran con
+    ``deferred(..., group=...)`` y se cargan con ``undefer_group`` solo en las
+    rutas que las usan.
+    """
     
     __abstract__ = True
     
     id = Column(Integer, primary_key=True)
-    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    uuid = Column(UUID(as_uuid=True), server_default=func.gen_random_uuid(), unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
     
+    @classmethod
+    def _to_dict_spec(cls) -> Tuple[Tuple[str, Optional[Callable[[Any], Any]]], ...]:
+        """
+        Retorna los pares (columna, conversor) de la clase, calculados una sola vez.
+        
+        El conversor se elige por el tipo de la columna; ``None`` indica que el
+        valor se copia tal cual.
+        """
+        spec = cls.__dict__.get('_to_dict_columns')
+        if spec is None:
+            spec = tuple(
+                (column.name, _column_converter(column.type))
+                for column in cls.__table__.columns
+            )
+            cls._to_dict_columns = spec
+        return spec
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el modelo a diccionario"""
         result = {}
-        for column in self.__table__.columns:
-            value = getattr(self, column.name)
+        for name, converter in type(self)._to_dict_spec():
+            value = getattr(self, name)
             # Manejar tipos especiales para serialización JSON
-            if value is None:
-                result[column.name] = None
-            elif hasattr(value, 'value'):  # Enum
-                result[column.name] = value.value
-            elif isinstance(value, datetime):
-                result[column.name] = value.isoformat()
-            elif isinstance(value, uuid.UUID):
-                result[column.name] = str(value)
+            if converter is None or value is None:
+                result[name] = value
             else:
-                result[column.name] = value
+                result[name] = converter(value)
         return result
     
     def update(self, **kwargs) -> None:
@@ -48,27 +102,58 @@ class BaseModel(db.Model):
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
-        self.updated_at = datetime.now(timezone.utc)
-    
-    def save(self) -> None:
-        """Guarda el modelo en la base de datos"""
+        # updated_at lo actualiza onupdate solo si algún campo cambió realmente
+    
+    def save(self, commit: bool = True) -> None:
+        """
+        Guarda el modelo en la base de datos.
+        
+        Con ``commit=False`` solo hace flush, para agrupar varios cambios en
+        una misma transacción que el llamador confirma al final.
+        """
         db.session.add(self)
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def delete(self) -> None:
-        """Elimina el modelo de la base de datos"""
+    def delete(self, commit: bool = True) -> None:
+        """Elimina el modelo de la base de datos (``commit=False`` solo hace flush)"""
         db.session.delete(self)
+        _commit_or_flush(commit)
+    
+    @classmethod
+    def bulk_create(cls, mappings: List[Dict[str, Any]], batch_size: int = 1000,
+                    return_ids: bool = False) -> List[int]:
+        """
+        Inserta varios registros con un INSERT multi-VALUES por lote y un solo commit.
+        
+        Es la vía recomendada para cargas masivas en lugar de llamar a ``save()``
+        por registro. Con ``return_ids`` retorna los IDs generados (RETURNING).
+        """
+        stmt = insert(cls)
+        if return_ids:
+            stmt = stmt.returning(cls.id)
+        
+        ids = []
+        for start in range(0, len(mappings), batch_size):
+            result = db.session.execute(stmt, mappings[start:start + batch_size])
+            if return_ids:
+                ids.extend(row[0] for row in result)
         db.session.commit()
+        return ids
     
     @classmethod
     def find_by_id(cls, id: int):
-        """Busca un modelo por ID"""
-        return cls.query.get(id)
+        """Busca un modelo por ID (usa el identity map de la sesión)"""
+        return db.session.get(cls, id)
     
     @classmethod
     def find_by_uuid(cls, uuid: str):
         """Busca un modelo por UUID"""
-        return cls.query.filter_by(uuid=uuid).first()
+        stmt = cls.__dict__.get('_find_by_uuid_stmt')
+        if stmt is None:
+            # Sentencia construida una vez por clase; solo cambia el parámetro
+            stmt = select(cls).where(cls.uuid == bindparam('uuid_value')).limit(1)
+            cls._find_by_uuid_stmt = stmt
+        return db.session.execute(stmt, {'uuid_value': uuid}).scalars().first()
     
     @classmethod
     def find_all(cls):
@@ -84,15 +169,20 @@ class SoftDeleteMixin:
     
     deleted_at = Column(DateTime(timezone=True), nullable=True)
     
-    def soft_delete(self) -> None:
-        """Marca el modelo como eliminado"""
-        self.deleted_at = datetime.now(timezone.utc)
-        db.session.commit()
-    
-    def restore(self) -> None:
-        """Restaura el modelo eliminado"""
+    def soft_delete(self, commit: bool = True, now: Optional[datetime] = None) -> None:
+        """
+        Marca el modelo como eliminado (``commit=False`` solo hace flush).
+        
+        En operaciones por lotes se puede pasar ``now`` para que todas las filas
+        compartan la misma marca de tiempo sin leer el reloj en cada una.
+        """
+        self.deleted_at = now or datetime.now(timezone.utc)
+        _commit_or_flush(commit)
+    
+    def restore(self, commit: bool = True) -> None:
+        """Restaura el modelo eliminado (``commit=False`` solo hace flush)"""
         self.deleted_at = None
-        db.session.commit()
+        _commit_or_flush(commit)
     
     @property
     def is_deleted(self) -> bool:
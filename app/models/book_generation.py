@@ -3,13 +3,31 @@ Modelo de Generación de Libros para Buko AI
 """
 
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum, DECIMAL
-from sqlalchemy.orm import relationship
+from decimal import Decimal
+from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum, DECIMAL, Index, event, text
+from sqlalchemy.orm import relationship, deferred, defer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.sql import func
 import enum
+import hashlib
+import json
+import logging
+import re
+from types import MappingProxyType
 
-from .base import BaseModel, db
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from .base import BaseModel, db, _commit_or_flush
+
+logger = logging.getLogger(__name__)
+
+# Parser JSON: orjson si está instalado, si no la librería estándar
+json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
 
 class BookStatus(enum.Enum):
@@ -30,10 +48,113 @@ class BookFormat(enum.Enum):
     TXT = "txt"
 
 
+# Columnas Text/JSON pesadas que los listados no cargan (ver ``list_load_options``)
+LIST_DEFERRED_COLUMNS = (
+    "content_html",
+    "thinking_content",
+    "architecture",
+    "regeneration_history",
+    "streaming_stats",
+    "parameters",
+)
+
+# Progreso fijo de los estados que no dependen del tiempo transcurrido
+STATUS_PROGRESS = {
+    BookStatus.COMPLETED: 100,
+    BookStatus.FAILED: -1,
+    BookStatus.QUEUED: 0,
+    BookStatus.ARCHITECTURE_REVIEW: 25,  # Arquitectura generada, esperando aprobación
+}
+
+# Estimación de generación: ~30 segundos por página
+MINUTES_PER_PAGE = 0.5
+
+# Palabras clave comunes en feedback de arquitectura, por tema (en orden de prioridad)
+FEEDBACK_THEMES_KEYWORDS = {
+    "characters": ["personaje", "character", "protagonista", "mentor"],
+    "structure": ["estructura", "structure", "capítulo", "chapter", "organización"],
+    "content": ["contenido", "content", "tema", "topic", "información"],
+    "tone": ["tono", "tone", "estilo", "style", "enfoque", "approach"],
+    "length": ["largo", "length", "páginas", "pages", "extenso", "corto"]
+}
+
+# Una sola pasada por el texto: cada grupo nombrado es un tema. El lookahead
+# permite coincidencias solapadas, igual que buscar cada palabra por separado.
+FEEDBACK_THEMES_PATTERN = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{theme}>" + "|".join(map(re.escape, keywords)) + ")"
+        for theme, keywords in FEEDBACK_THEMES_KEYWORDS.items()
+    ) + ")",
+    re.IGNORECASE
+)
+
+# Precios por token (Claude Sonnet 4: 0.015 / 0.075 / 0.015 USD por 1K tokens)
+PROMPT_TOKEN_PRICE = Decimal("0.000015")
+COMPLETION_TOKEN_PRICE = Decimal("0.000075")
+THINKING_TOKEN_PRICE = Decimal("0.000015")
+ESTIMATED_COST_QUANTUM = Decimal("0.0001")
+
+# Gradientes de portada por género (se construyen una vez al importar)
+DEFAULT_COVER_GRADIENT = 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)'
+COVER_GRADIENTS = MappingProxyType({
+    'fiction': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+    'non_fiction': 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)',
+    'children': 'linear-gradient(135deg, #4facfe 0%, #00f2fe 100%)',
+    'poetry': 'linear-gradient(135deg, #43e97b 0%, #38f9d7 100%)',
+    'technical': 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)',
+    'self_help': 'linear-gradient(135deg, #a8edea 0%, #fed6e3 100%)',
+    'biography': 'linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%)',
+    'history': 'linear-gradient(135deg, #ffd89b 0%, #19547b 100%)',
+    'science_fiction': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
+    'romance': 'linear-gradient(135deg, #ff9a9e 0%, #fecfef 100%)',
+    'mystery': 'linear-gradient(135deg, #434343 0%, #000000 100%)',
+    'fantasy': 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)',
+})
+
+# Palabra: secuencia de caracteres que no son espacio (mismo criterio que str.split())
+WORD_PATTERN = re.compile(r'\S+')
+
+
+def count_words(text: Optional[str]) -> int:
+    """Cuenta las palabras de un texto sin construir la lista de palabras"""
+    if not text:
+        return 0
+    return sum(1 for _ in WORD_PATTERN.finditer(text))
+
+
+# Entradas que se conservan en regeneration_history
+REGENERATION_HISTORY_LIMIT = 10
+
+# Clave en ``Session.info`` con los libros cuyo progreso cacheado se descarta al confirmar
+PROGRESS_INVALIDATIONS_KEY = "book_progress_invalidations"
+
+
+def _summarize_architecture(architecture: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Resume una arquitectura para el historial: número de capítulos y huella del contenido"""
+    if not architecture:
+        return None
+    
+    chapters = (architecture.get("structure") or {}).get("chapters") or architecture.get("chapters") or []
+    fingerprint = hashlib.sha256(
+        json.dumps(architecture, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return {"chapter_count": len(chapters), "hash": fingerprint}
+
+
 class BookGeneration(BaseModel):
     """Modelo para generación de libros"""
     
     __tablename__ = "book_generations"
+    __table_args__ = (
+        # Conteos por estado y limpiezas por estado + antigüedad
+        Index('idx_book_generations_status_created_at', 'status', 'created_at'),
+        # Cola: filtro por estado con el mismo orden que get_queued_books
+        Index('idx_book_generations_queue', 'status', text('priority DESC'), 'created_at'),
+        # Listado por usuario, del más reciente al más antiguo
+        Index('idx_book_generations_user_id_created_at', 'user_id', text('created_at DESC')),
+        # Promedio de tiempo de procesamiento de los completados
+        Index('idx_book_generations_status_started_at_completed_at', 'status', 'started_at', 'completed_at'),
+    )
     
     # Relación con usuario
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -61,8 +182,8 @@ class BookGeneration(BaseModel):
     # Parámetros completos (JSON)
     parameters = Column(JSON, nullable=True)
     
-    # Contenido generado
-    content = Column(Text, nullable=True)
+    # Contenido generado (diferido: solo se carga al accederlo)
+    content = deferred(Column(Text, nullable=True))
     content_html = Column(Text, nullable=True)  # Contenido en HTML estructurado para formateo profesional
     thinking_content = Column(Text, nullable=True)
     thinking_length = Column(Integer, default=0, nullable=False)
@@ -96,7 +217,7 @@ class BookGeneration(BaseModel):
     # Resultado final
     final_pages = Column(Integer, nullable=True)
     final_words = Column(Integer, nullable=True)
-    file_paths = Column(JSON, nullable=True)
+    file_paths = Column(JSON, nullable=True)  # Obsoleto: las rutas nuevas se guardan en BookFile (files)
     cover_url = Column(String(500), nullable=True)
     
     # Manejo de errores
@@ -110,6 +231,7 @@ class BookGeneration(BaseModel):
     
     # Relaciones
     downloads = relationship("BookDownload", back_populates="book", cascade="all, delete-orphan")
+    files = relationship("BookFile", back_populates="book", cascade="all, delete-orphan", order_by="BookFile.id")
     
     def __init__(self, **kwargs):
         """Inicializa una nueva generación de libro"""
@@ -194,21 +316,33 @@ class BookGeneration(BaseModel):
             return max(1, self.final_words // 200)
         return None
     
+    @property
+    def file_path_map(self) -> Dict[str, str]:
+        """
+        Retorna las rutas de archivos generados por formato.
+        
+        Se leen de ``files``; los libros anteriores a la tabla ``book_files``
+        conservan sus rutas en la columna JSON ``file_paths``.
+        """
+        if self.files:
+            return {book_file.format: book_file.path for book_file in self.files}
+        return self.file_paths or {}
+    
     @property
     def file_formats(self) -> List[str]:
         """Retorna los formatos de archivo disponibles"""
-        if self.file_paths:
-            return list(self.file_paths.keys())
-        return []
+        return list(self.file_path_map)
     
-    def start_processing(self) -> None:
+    def start_processing(self, commit: bool = True) -> None:
         """Marca el libro como en procesamiento"""
         self.status = BookStatus.PROCESSING
         self.started_at = datetime.now(timezone.utc)
-        db.session.commit()
+        self._invalidate_progress_cache()
+        _commit_or_flush(commit)
     
-    def mark_completed(self, content: str, final_stats: Dict[str, Any]) -> None:
-        """Marca el libro como completado"""
+    def mark_completed(self, content: str, final_stats: Dict[str, Any], commit: bool = True, *,
+                       prompt_tokens: int = 0, completion_tokens: int = 0, thinking_tokens: int = 0) -> None:
+        """Marca el libro como completado (con los tokens de la última fase en el mismo UPDATE)"""
         self.status = BookStatus.COMPLETED
         self.content = content  # Mantener para compatibilidad
         self.content_html = content  # El contenido ya viene en HTML estructurado
@@ -224,16 +358,25 @@ class BookGeneration(BaseModel):
             if final_stats.get("chapters"):
                 self.chapter_count = final_stats.get("chapters")
         
-        db.session.commit()
+        # Contar las palabras una sola vez para no recontarlas en cada lectura
+        if not self.final_words and content:
+            self.final_words = count_words(content)
+        
+        if prompt_tokens or completion_tokens or thinking_tokens:
+            self.add_token_usage(prompt_tokens, completion_tokens, thinking_tokens)
+        
+        self._invalidate_progress_cache()
+        _commit_or_flush(commit)
     
-    def mark_failed(self, error_message: str) -> None:
+    def mark_failed(self, error_message: str, commit: bool = True) -> None:
         """Marca el libro como fallido"""
         self.status = BookStatus.FAILED
         self.error_message = error_message
         self.completed_at = datetime.utcnow()
-        db.session.commit()
+        self._invalidate_progress_cache()
+        _commit_or_flush(commit)
     
-    def retry_generation(self) -> None:
+    def retry_generation(self, commit: bool = True) -> None:
         """Reintenta la generación"""
         if self.can_retry:
             self.retry_count += 1
@@ -241,22 +384,36 @@ class BookGeneration(BaseModel):
             self.error_message = None
             self.started_at = None
             self.completed_at = None
-            db.session.commit()
+            self._invalidate_progress_cache()
+            _commit_or_flush(commit)
     
-    def cancel_generation(self) -> None:
+    def cancel_generation(self, commit: bool = True) -> None:
         """Cancela la generación"""
         self.status = BookStatus.CANCELLED
         self.completed_at = datetime.utcnow()
-        db.session.commit()
+        self._invalidate_progress_cache()
+        _commit_or_flush(commit)
     
-    def mark_architecture_review(self, architecture: Dict[str, Any]) -> None:
+    def _invalidate_progress_cache(self) -> None:
+        """
+        Programa el descarte del progreso cacheado para cuando se confirme la transacción.
+        
+        Con ``commit=False`` el cambio aún no es visible para otras conexiones: si se
+        descartara ya, el polling volvería a cachear el estado anterior. Se descarta en
+        ``after_commit`` y se olvida si la transacción se revierte.
+        """
+        db.session.info.setdefault(PROGRESS_INVALIDATIONS_KEY, set()).add(self.id)
+    
+    def mark_architecture_review(self, architecture: Dict[str, Any], commit: bool = True) -> None:
         """Marca el libro como esperando revisión de arquitectura"""
         self.status = BookStatus.ARCHITECTURE_REVIEW
         self.architecture = architecture
         self.completed_at = None  # Reset completed_at
-        db.session.commit()
+        self._invalidate_progress_cache()
+        _commit_or_flush(commit)
     
-    def approve_architecture(self, updated_architecture: Optional[Dict[str, Any]] = None) -> None:
+    def approve_architecture(self, updated_architecture: Optional[Dict[str, Any]] = None,
+                             commit: bool = True) -> None:
         """Aprueba la arquitectura y marca para generación completa"""
         if updated_architecture:
             self.architecture = updated_architecture
@@ -268,37 +425,36 @@ class BookGeneration(BaseModel):
             from app.services.markdown_to_html_service import convert_markdown_to_content_html
             try:
                 self.content_html = convert_markdown_to_content_html(self.content)
-            except Exception as e:
+            except Exception:
                 # Log error pero no fallar la aprobación
-                print(f"Error converting markdown to HTML: {e}")
+                logger.exception("Error converting markdown to HTML for book %s", self.id)
         
-        db.session.commit()
+        self._invalidate_progress_cache()
+        _commit_or_flush(commit)
     
-    def add_regeneration_feedback(self, feedback_what: str, feedback_how: str, current_architecture: Dict[str, Any]) -> None:
+    def add_regeneration_feedback(self, feedback_what: str, feedback_how: str, current_architecture: Dict[str, Any],
+                                  commit: bool = True) -> None:
         """Agrega feedback de regeneración al historial"""
         self.regeneration_feedback_what = feedback_what
         self.regeneration_feedback_how = feedback_how
         self.regeneration_count += 1
         
-        # Inicializar historial si no existe
-        if not self.regeneration_history:
-            self.regeneration_history = []
-        
-        # Agregar entrada al historial
+        # Agregar entrada al historial (solo un resumen de la arquitectura anterior)
         regeneration_entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "feedback_what": feedback_what,
             "feedback_how": feedback_how,
-            "previous_architecture": current_architecture,
+            "previous_architecture": _summarize_architecture(current_architecture),
             "regeneration_number": self.regeneration_count
         }
-        self.regeneration_history.append(regeneration_entry)
         
-        # Limitar historial a las últimas 10 regeneraciones para evitar que crezca demasiado
-        if len(self.regeneration_history) > 10:
-            self.regeneration_history = self.regeneration_history[-10:]
+        # Limitar historial a las últimas regeneraciones antes de serializarlo; la
+        # asignación de una lista nueva marca la columna JSON como modificada
+        self.regeneration_history = (
+            (self.regeneration_history or [])[-(REGENERATION_HISTORY_LIMIT - 1):] + [regeneration_entry]
+        )
         
-        db.session.commit()
+        _commit_or_flush(commit)
     
     def get_regeneration_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas de regeneración para análisis"""
@@ -316,59 +472,71 @@ class BookGeneration(BaseModel):
         if not self.regeneration_history:
             return []
         
-        # Palabras clave comunes en feedback de arquitectura
-        themes_keywords = {
-            "characters": ["personaje", "character", "protagonista", "mentor"],
-            "structure": ["estructura", "structure", "capítulo", "chapter", "organización"],
-            "content": ["contenido", "content", "tema", "topic", "información"],
-            "tone": ["tono", "tone", "estilo", "style", "enfoque", "approach"],
-            "length": ["largo", "length", "páginas", "pages", "extenso", "corto"]
-        }
-        
-        feedback_texts = []
+        themes_found = set()
         for entry in self.regeneration_history:
-            feedback_texts.extend([entry.get("feedback_what", ""), entry.get("feedback_how", "")])
-        
-        combined_feedback = " ".join(feedback_texts).lower()
-        
-        themes_found = []
-        for theme, keywords in themes_keywords.items():
-            if any(keyword in combined_feedback for keyword in keywords):
-                themes_found.append(theme)
+            for feedback in (entry.get("feedback_what"), entry.get("feedback_how")):
+                if feedback:
+                    themes_found.update(match.lastgroup for match in FEEDBACK_THEMES_PATTERN.finditer(feedback))
+            if len(themes_found) == len(FEEDBACK_THEMES_KEYWORDS):
+                break
         
+        themes_found = [theme for theme in FEEDBACK_THEMES_KEYWORDS if theme in themes_found]
         return themes_found[:3]  # Retornar máximo 3 temas principales
     
-    def update_queue_position(self, position: int) -> None:
+    def update_queue_position(self, position: int, commit: bool = True) -> None:
         """Actualiza la posición en cola"""
         self.queue_position = position
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def update_tokens(self, prompt_tokens: int, completion_tokens: int, thinking_tokens: int = 0) -> None:
-        """Actualiza las métricas de tokens ACUMULANDO todas las fases (arquitectura + regeneración + generación)"""
+    def update_tokens(self, prompt_tokens: int, completion_tokens: int, thinking_tokens: int = 0,
+                      commit: bool = True) -> None:
+        """
+        Actualiza las métricas de tokens ACUMULANDO todas las fases (arquitectura + regeneración + generación).
+        
+        Con ``commit=False`` solo hace flush y el cambio viaja en la transacción del llamador.
+        """
+        self.add_token_usage(prompt_tokens, completion_tokens, thinking_tokens)
+        _commit_or_flush(commit)
+    
+    def add_token_usage(self, prompt_tokens: int, completion_tokens: int, thinking_tokens: int = 0) -> None:
+        """
+        Acumula tokens y recalcula el costo sin escribir en la base de datos.
+        
+        Los cambios se guardan en el mismo UPDATE que el siguiente flush/commit,
+        por ejemplo el de la transición de estado que cierra la tarea.
+        """
         # ACUMULAR tokens de todas las fases en lugar de sobrescribir
         self.prompt_tokens = (self.prompt_tokens or 0) + prompt_tokens
         self.completion_tokens = (self.completion_tokens or 0) + completion_tokens
         self.thinking_tokens = (self.thinking_tokens or 0) + thinking_tokens
         self.total_tokens = self.prompt_tokens + self.completion_tokens + self.thinking_tokens
         
-        # Calcular costo estimado total (precios Claude Sonnet 4)
-        input_cost = (self.prompt_tokens / 1000) * 0.015
-        output_cost = (self.completion_tokens / 1000) * 0.075
-        thinking_cost = (self.thinking_tokens / 1000) * 0.015
-        self.estimated_cost = round(input_cost + output_cost + thinking_cost, 4)
-        
-        db.session.commit()
-    
-    def update_file_paths(self, file_paths: Dict[str, str]) -> None:
-        """Actualiza las rutas de archivos generados"""
-        self.file_paths = file_paths
-        db.session.commit()
+        # Calcular costo estimado total en Decimal, como la columna DECIMAL(10, 4)
+        self.estimated_cost = (
+            self.prompt_tokens * PROMPT_TOKEN_PRICE
+            + self.completion_tokens * COMPLETION_TOKEN_PRICE
+            + self.thinking_tokens * THINKING_TOKEN_PRICE
+        ).quantize(ESTIMATED_COST_QUANTUM)
+    
+    def update_file_paths(self, file_paths: Dict[str, str], commit: bool = True) -> None:
+        """Actualiza las rutas de archivos generados (un único upsert para todos los formatos)"""
+        if file_paths:
+            db.session.flush()
+            stmt = pg_insert(BookFile).values([
+                {"book_id": self.id, "format": format_type, "path": path}
+                for format_type, path in file_paths.items()
+            ])
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[BookFile.book_id, BookFile.format],
+                set_={"path": stmt.excluded.path, "updated_at": func.now()}
+            ))
+            # La colección se vuelve a leer con las rutas actualizadas
+            db.session.expire(self, ["files"])
+        _commit_or_flush(commit)
     
     def get_file_path(self, format_type: str) -> Optional[str]:
         """Retorna la ruta del archivo en el formato especificado"""
-        if self.file_paths:
-            return self.file_paths.get(format_type)
-        return None
+        return self.file_path_map.get(format_type)
     
     def get_download_url(self, format_type: str) -> Optional[str]:
         """Retorna la URL de descarga para el formato especificado"""
@@ -394,27 +562,25 @@ class BookGeneration(BaseModel):
     
     def _calculate_progress(self) -> int:
         """Calcula el progreso porcentual dinámico basado en tiempo transcurrido"""
-        if self.status == BookStatus.COMPLETED:
-            return 100
-        elif self.status == BookStatus.FAILED:
-            return -1
-        elif self.status == BookStatus.QUEUED:
-            return 0
-        elif self.status == BookStatus.ARCHITECTURE_REVIEW:
-            return 25  # Arquitectura generada, esperando aprobación
-        elif self.status == BookStatus.PROCESSING:
+        static_progress = STATUS_PROGRESS.get(self.status)
+        if static_progress is not None:
+            return static_progress
+        if self.status == BookStatus.PROCESSING:
             # Progreso dinámico basado en tiempo transcurrido
             if not self.started_at:
                 return 5  # Recién iniciado
-            
-            elapsed_minutes = (datetime.now(timezone.utc) - self.started_at).total_seconds() / 60
-            estimated_total_minutes = self.page_count * 0.5  # ~30 segundos por página
-            
-            # Progreso base de 10% + progreso por tiempo transcurrido
-            time_progress = min(80, (elapsed_minutes / estimated_total_minutes) * 80)
-            return max(10, min(90, 10 + int(time_progress)))
+            return self._processing_progress()[1]
         return 0
     
+    def _processing_progress(self) -> Tuple[float, int]:
+        """Retorna (minutos transcurridos, porcentaje) de un libro en procesamiento con ``started_at``"""
+        elapsed_minutes = (datetime.now(timezone.utc) - self.started_at).total_seconds() / 60
+        estimated_total_minutes = self.page_count * MINUTES_PER_PAGE
+        
+        # Progreso base de 10% + progreso por tiempo transcurrido (máximo 90%)
+        time_progress = min(80, (elapsed_minutes / estimated_total_minutes) * 80)
+        return elapsed_minutes, max(10, min(90, 10 + int(time_progress)))
+    
     def _estimate_completion_time(self) -> Optional[str]:
         """Estima el tiempo de finalización"""
         if self.status == BookStatus.COMPLETED:
@@ -433,6 +599,7 @@ class BookGeneration(BaseModel):
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el modelo a diccionario"""
         base_dict = super().to_dict()
+        file_formats = self.file_formats
         base_dict.update({
             "user_email": self.user.email if self.user else None,
             "is_completed": self.is_completed,
@@ -440,67 +607,77 @@ class BookGeneration(BaseModel):
             "is_processing": self.is_processing,
             "processing_time": self.processing_time,
             "estimated_reading_time": self.estimated_reading_time,
-            "file_formats": self.file_formats,
+            "file_formats": file_formats,
             "download_urls": {
-                fmt: self.get_download_url(fmt) for fmt in self.file_formats
+                fmt: self.get_download_url(fmt) for fmt in file_formats
             },
         })
         return base_dict
     
     @classmethod
-    def get_by_user(cls, user_id: int) -> List['BookGeneration']:
-        """Retorna libros de un usuario"""
-        return cls.query.filter_by(user_id=user_id).order_by(cls.created_at.desc()).all()
+    def list_load_options(cls, keep: Tuple[str, ...] = ()) -> tuple:
+        """
+        Opciones de carga para listados: difieren las columnas Text/JSON pesadas.
+        
+        Los listados solo muestran metadatos; el contenido y las estructuras JSON
+        se cargan al accederlos en un libro concreto. ``keep`` nombra las columnas
+        de ``LIST_DEFERRED_COLUMNS`` que el listado sí lee.
+        """
+        return tuple(
+            defer(getattr(cls, name)) for name in LIST_DEFERRED_COLUMNS if name not in keep
+        )
     
     @classmethod
-    def find_by_uuid(cls, uuid_str: str) -> Optional['BookGeneration']:
-        """Busca un libro por UUID"""
-        return cls.query.filter_by(uuid=uuid_str).first()
+    def get_by_user(cls, user_id: int) -> List['BookGeneration']:
+        """Retorna libros de un usuario"""
+        return cls.query.options(*cls.list_load_options()).filter_by(
+            user_id=user_id
+        ).order_by(cls.created_at.desc()).all()
     
     @classmethod
     def get_queued_books(cls) -> List['BookGeneration']:
         """Retorna libros en cola ordenados por prioridad"""
-        return cls.query.filter_by(status=BookStatus.QUEUED).order_by(
-            cls.priority.desc(), cls.created_at.asc()
-        ).all()
+        return cls.query.options(*cls.list_load_options()).filter_by(
+            status=BookStatus.QUEUED
+        ).order_by(cls.priority.desc(), cls.created_at.asc()).all()
     
     @classmethod
     def get_processing_books(cls) -> List['BookGeneration']:
         """Retorna libros en procesamiento"""
-        return cls.query.filter_by(status=BookStatus.PROCESSING).all()
+        return cls.query.options(*cls.list_load_options()).filter_by(status=BookStatus.PROCESSING).all()
     
     @classmethod
     def get_completed_books(cls) -> List['BookGeneration']:
         """Retorna libros completados"""
-        return cls.query.filter_by(status=BookStatus.COMPLETED).all()
+        return cls.query.options(*cls.list_load_options()).filter_by(status=BookStatus.COMPLETED).all()
     
     @classmethod
     def get_failed_books(cls) -> List['BookGeneration']:
         """Retorna libros fallidos"""
-        return cls.query.filter_by(status=BookStatus.FAILED).all()
+        return cls.query.options(*cls.list_load_options()).filter_by(status=BookStatus.FAILED).all()
     
     @classmethod
     def get_architecture_review_books(cls) -> List['BookGeneration']:
         """Retorna libros esperando revisión de arquitectura"""
-        return cls.query.filter_by(status=BookStatus.ARCHITECTURE_REVIEW).all()
+        return cls.query.options(*cls.list_load_options()).filter_by(status=BookStatus.ARCHITECTURE_REVIEW).all()
     
     @classmethod
     def get_statistics(cls) -> Dict[str, Any]:
         """Retorna estadísticas globales"""
-        total = cls.query.count()
-        completed = cls.query.filter_by(status=BookStatus.COMPLETED).count()
-        failed = cls.query.filter_by(status=BookStatus.FAILED).count()
-        processing = cls.query.filter_by(status=BookStatus.PROCESSING).count()
-        queued = cls.query.filter_by(status=BookStatus.QUEUED).count()
-        architecture_review = cls.query.filter_by(status=BookStatus.ARCHITECTURE_REVIEW).count()
+        # Un solo GROUP BY en lugar de un COUNT por estado
+        counts = dict(
+            db.session.query(cls.status, func.count(cls.id)).group_by(cls.status).all()
+        )
+        total = sum(counts.values())
+        completed = counts.get(BookStatus.COMPLETED, 0)
         
         return {
             "total_books": total,
             "completed_books": completed,
-            "failed_books": failed,
-            "processing_books": processing,
-            "queued_books": queued,
-            "architecture_review_books": architecture_review,
+            "failed_books": counts.get(BookStatus.FAILED, 0),
+            "processing_books": counts.get(BookStatus.PROCESSING, 0),
+            "queued_books": counts.get(BookStatus.QUEUED, 0),
+            "architecture_review_books": counts.get(BookStatus.ARCHITECTURE_REVIEW, 0),
             "success_rate": (completed / total * 100) if total > 0 else 0,
             "average_processing_time": cls._calculate_average_processing_time(),
         }
@@ -508,39 +685,20 @@ class BookGeneration(BaseModel):
     @classmethod
     def _calculate_average_processing_time(cls) -> Optional[float]:
         """Calcula el tiempo promedio de procesamiento"""
-        completed_books = cls.query.filter(
+        # El promedio se calcula en la base de datos sin cargar filas
+        average = db.session.query(
+            func.avg(func.extract('epoch', cls.completed_at - cls.started_at))
+        ).filter(
             cls.status == BookStatus.COMPLETED,
             cls.started_at.isnot(None),
             cls.completed_at.isnot(None)
-        ).all()
+        ).scalar()
         
-        if not completed_books:
-            return None
-        
-        total_time = sum(
-            (book.completed_at - book.started_at).total_seconds()
-            for book in completed_books
-        )
-        
-        return total_time / len(completed_books)
+        return float(average) if average is not None else None
     
     def get_cover_gradient(self) -> str:
         """Genera un gradiente de color para la portada basado en el género"""
-        gradients = {
-            'fiction': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
-            'non_fiction': 'linear-gradient(135deg, #f093fb 0%, #f5576c 100%)',
-            'children': 'linear-gradient(135deg, #4facfe 0%, #00f2fe 100%)',
-            'poetry': 'linear-gradient(135deg, #43e97b 0%, #38f9d7 100%)',
-            'technical': 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)',
-            'self_help': 'linear-gradient(135deg, #a8edea 0%, #fed6e3 100%)',
-            'biography': 'linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%)',
-            'history': 'linear-gradient(135deg, #ffd89b 0%, #19547b 100%)',
-            'science_fiction': 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
-            'romance': 'linear-gradient(135deg, #ff9a9e 0%, #fecfef 100%)',
-            'mystery': 'linear-gradient(135deg, #434343 0%, #000000 100%)',
-            'fantasy': 'linear-gradient(135deg, #fa709a 0%, #fee140 100%)',
-        }
-        return gradients.get(self.genre, 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)')
+        return COVER_GRADIENTS.get(self.genre, DEFAULT_COVER_GRADIENT)
     
     def get_estimated_pages(self) -> int:
         """Retorna el número estimado de páginas"""
@@ -559,9 +717,9 @@ class BookGeneration(BaseModel):
         if self.final_words:
             return self.final_words
         
-        # Estimación basada en contenido
+        # Estimación basada en contenido (mark_completed ya guarda final_words)
         if self.content:
-            return len(self.content.split())
+            return count_words(self.content)
         
         # Estimación basada en capítulos (3000 palabras por capítulo)
         return self.chapter_count * 3000
@@ -586,23 +744,35 @@ class BookGeneration(BaseModel):
     
     @property
     def content_data(self) -> Optional[Dict[str, Any]]:
-        """Retorna el contenido estructurado como diccionario"""
-        if self.content:
+        """
+        Retorna el contenido estructurado como diccionario.
+        
+        El resultado se guarda en la instancia junto con el ``content`` del que
+        sale: accesos repetidos no vuelven a parsear el JSON y cualquier
+        asignación de ``content`` invalida el resultado.
+        """
+        content = self.content
+        cached = self.__dict__.get('_content_data_cache')
+        if cached is not None and cached[0] is content:
+            return cached[1]
+        
+        content_data = None
+        if content:
             try:
                 # Si el contenido es JSON, parsearlo
-                import json
-                return json.loads(self.content)
+                content_data = json_loads(content)
             except:
                 # Si no es JSON, estructurar el contenido como un solo capítulo
-                return {
+                content_data = {
                     'chapters': [
                         {
                             'title': 'Contenido Principal',
-                            'content': self.content
+                            'content': content
                         }
                     ]
                 }
-        return None
+        self._content_data_cache = (content, content_data)
+        return content_data
     
     @property
     def progress(self) -> int:
@@ -624,9 +794,7 @@ class BookGeneration(BaseModel):
             if not self.started_at:
                 return "Iniciando generación con Claude AI..."
             
-            elapsed_minutes = (datetime.now(timezone.utc) - self.started_at).total_seconds() / 60
-            estimated_total_minutes = self.page_count * 0.5  # Misma lógica que _calculate_progress()
-            progress_percentage = min(90, max(10, 10 + int((elapsed_minutes / estimated_total_minutes) * 80)))
+            elapsed_minutes, progress_percentage = self._processing_progress()
             
             # Mensajes basados en progreso real en lugar de tiempo fijo
             if progress_percentage < 15:
@@ -647,4 +815,42 @@ class BookGeneration(BaseModel):
             return "Estado desconocido"
     
     def __repr__(self) -> str:
-        return f"<BookGeneration {self.title} by {self.user.email if self.user else 'Unknown'}>"
\ No newline at end of file
+        return f"<BookGeneration {self.title} by {self.user.email if self.user else 'Unknown'}>"
+
+
+class BookFile(BaseModel):
+    """Archivo generado de un libro (una fila por formato)"""
+    
+    __tablename__ = "book_files"
+    __table_args__ = (
+        # Una ruta por libro y formato; también es el índice de búsqueda
+        Index('idx_book_files_book_id_format', 'book_id', 'format', unique=True),
+    )
+    
+    book_id = Column(Integer, ForeignKey("book_generations.id", ondelete="CASCADE"), nullable=False)
+    book = relationship("BookGeneration", back_populates="files")
+    
+    format = Column(String(10), nullable=False)
+    path = Column(String(500), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<BookFile {self.format} for book {self.book_id}>"
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_committed_progress(session) -> None:
+    """Descarta el progreso cacheado de los libros cuyo estado se acaba de confirmar"""
+    book_ids = session.info.pop(PROGRESS_INVALIDATIONS_KEY, None)
+    if not book_ids:
+        return
+    
+    from app.services.cache_service import BookCacheService
+    
+    for book_id in book_ids:
+        BookCacheService.invalidate_progress(book_id)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_progress_invalidations(session) -> None:
+    """Olvida las invalidaciones pendientes: el estado cacheado sigue siendo el confirmado"""
+    session.info.pop(PROGRESS_INVALIDATIONS_KEY, None)
@@ -1,12 +1,32 @@
 """
 Modelo para plantillas de email
 """
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from sqlalchemy import Column, String, Text, Boolean, JSON
-from jinja2 import Template
+from sqlalchemy.orm import deferred, undefer_group
+from jinja2 import Environment, Template
 from app.models.base import BaseModel
 
 
+# Entorno compartido: mismas opciones que jinja2.Template (sin autoescape)
+TEMPLATE_ENV = Environment(auto_reload=False)
+
+# Plantillas compiladas distintas que se mantienen en memoria
+TEMPLATE_CACHE_SIZE = 400
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(source: str) -> Template:
+    """
+    Compila una plantilla Jinja una sola vez por texto fuente.
+    
+    La clave es el propio texto, así que editar una plantilla genera una entrada
+    nueva sin necesidad de invalidar nada.
+    """
+    return TEMPLATE_ENV.from_string(source)
+
+
 class EmailTemplate(BaseModel):
     """Modelo de plantillas de email"""
     
@@ -15,8 +35,9 @@ class EmailTemplate(BaseModel):
     # Información de la plantilla
     name = Column(String(100), unique=True, nullable=False)
     subject = Column(String(255), nullable=False)
-    html_content = Column(Text, nullable=False)
-    text_content = Column(Text, nullable=True)
+    # Cuerpos diferidos: solo se cargan (juntos) al renderizar
+    html_content = deferred(Column(Text, nullable=False), group='content')
+    text_content = deferred(Column(Text, nullable=True), group='content')
     
     # Variables disponibles
     variables = Column(JSON, nullable=True)
@@ -27,27 +48,27 @@ class EmailTemplate(BaseModel):
     
     def render_subject(self, variables: Dict[str, Any]) -> str:
         """Renderiza el asunto de la plantilla con las variables"""
-        subject_template = Template(self.subject)
-        return subject_template.render(**variables)
+        subject_template = compile_template(self.subject)
+        return subject_template.render(variables)
     
     def render_html_content(self, variables: Dict[str, Any]) -> str:
         """Renderiza el contenido HTML de la plantilla con las variables"""
-        html_template = Template(self.html_content)
-        return html_template.render(**variables)
+        html_template = compile_template(self.html_content)
+        return html_template.render(variables)
     
     def render_text_content(self, variables: Dict[str, Any]) -> str:
         """Renderiza el contenido de texto de la plantilla con las variables"""
         if not self.text_content:
             return ""
-        text_template = Template(self.text_content)
-        return text_template.render(**variables)
+        text_template = compile_template(self.text_content)
+        return text_template.render(variables)
     
     def render_template(self, variables: Dict[str, Any]) -> Dict[str, str]:
-        """Renderiza la plantilla con las variables"""
+        """Renderiza la plantilla con las variables (el mismo contexto para las tres partes)"""
         return {
-            "subject": self.render_subject(variables),
-            "html_content": self.render_html_content(variables),
-            "text_content": self.render_text_content(variables)
+            "subject": compile_template(self.subject).render(variables),
+            "html_content": compile_template(self.html_content).render(variables),
+            "text_content": compile_template(self.text_content).render(variables) if self.text_content else ""
         }
     
     def to_dict(self) -> Dict[str, Any]:
@@ -61,13 +82,15 @@ class EmailTemplate(BaseModel):
     
     @classmethod
     def get_by_name(cls, name: str, language: str = "es") -> Optional['EmailTemplate']:
-        """Busca una plantilla por nombre e idioma"""
-        return cls.query.filter_by(name=name, language=language, is_active=True).first()
+        """Busca una plantilla por nombre e idioma, con su contenido cargado para renderizar"""
+        return cls.query.options(undefer_group('content')).filter_by(
+            name=name, language=language, is_active=True
+        ).first()
     
     @classmethod
     def get_active_templates(cls) -> List['EmailTemplate']:
-        """Retorna plantillas activas"""
-        return cls.query.filter_by(is_active=True).all()
+        """Retorna plantillas activas, con su contenido cargado (``to_dict`` lo serializa)"""
+        return cls.query.options(undefer_group('content')).filter_by(is_active=True).all()
     
     def __repr__(self) -> str:
         return f"<EmailTemplate {self.name} - {self.language}>"
\ No newline at end of file
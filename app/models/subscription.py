@@ -2,14 +2,15 @@
 Modelos de Suscripción y Pagos para Buko AI
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum, DECIMAL
-from sqlalchemy.orm import relationship
+from flask import current_app
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum, DECIMAL, Index
+from sqlalchemy.orm import relationship, selectinload
 from sqlalchemy.sql import func
 import enum
 
-from .base import BaseModel, db
+from .base import BaseModel, db, _commit_or_flush
 from .user import SubscriptionType
 
 
@@ -34,6 +35,10 @@ class Subscription(BaseModel):
     """Modelo de Suscripción"""
     
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        # Suscripciones activas y por expirar (estado + fin del período)
+        Index('idx_subscriptions_status_current_period_end', 'status', 'current_period_end'),
+    )
     
     # Relación con usuario
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -65,10 +70,14 @@ class Subscription(BaseModel):
     @property
     def is_active(self) -> bool:
         """Verifica si la suscripción está activa"""
+        return self._is_active(datetime.utcnow())
+    
+    def _is_active(self, now: datetime) -> bool:
+        """``is_active`` evaluado en el instante ``now``"""
         return (
             self.status == PaymentStatus.COMPLETED and
             self.current_period_end is not None and
-            self.current_period_end > datetime.utcnow() and
+            self.current_period_end > now and
             not self.is_cancelled
         )
     
@@ -80,7 +89,10 @@ class Subscription(BaseModel):
     @property
     def is_trial(self) -> bool:
         """Verifica si está en período de prueba"""
-        now = datetime.utcnow()
+        return self._is_trial(datetime.utcnow())
+    
+    def _is_trial(self, now: datetime) -> bool:
+        """``is_trial`` evaluado en el instante ``now``"""
         return (
             self.trial_start is not None and
             self.trial_end is not None and
@@ -90,39 +102,40 @@ class Subscription(BaseModel):
     @property
     def days_until_renewal(self) -> Optional[int]:
         """Días hasta la renovación"""
+        return self._days_until_renewal(datetime.utcnow())
+    
+    def _days_until_renewal(self, now: datetime) -> Optional[int]:
+        """``days_until_renewal`` calculado desde el instante ``now``"""
         if self.current_period_end:
-            delta = self.current_period_end - datetime.utcnow()
+            delta = self.current_period_end - now
             return max(0, delta.days)
         return None
     
     @property
     def plan_details(self) -> Dict[str, Any]:
-        """Retorna los detalles del plan"""
-        from flask import current_app
-        
-        plans = current_app.config.get("SUBSCRIPTION_PLANS", {})
-        return plans.get(self.plan_type.value, {})
+        """Retorna los detalles del plan (el dict de la configuración, sin copiarlo)"""
+        return current_app.config.get("SUBSCRIPTION_PLANS", {}).get(self.plan_type.value, {})
     
-    def start_subscription(self, period_months: int = 1) -> None:
+    def start_subscription(self, period_months: int = 1, commit: bool = True) -> None:
         """Inicia la suscripción"""
         now = datetime.utcnow()
         self.current_period_start = now
         self.current_period_end = now + timedelta(days=30 * period_months)
         self.status = PaymentStatus.COMPLETED
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def renew_subscription(self, period_months: int = 1) -> None:
+    def renew_subscription(self, period_months: int = 1, commit: bool = True) -> None:
         """Renueva la suscripción"""
         if self.current_period_end:
             self.current_period_start = self.current_period_end
             self.current_period_end = self.current_period_end + timedelta(days=30 * period_months)
         else:
-            self.start_subscription(period_months)
+            self.start_subscription(period_months, commit=False)
         
         self.status = PaymentStatus.COMPLETED
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def cancel_subscription(self, at_period_end: bool = True) -> None:
+    def cancel_subscription(self, at_period_end: bool = True, commit: bool = True) -> None:
         """Cancela la suscripción"""
         if at_period_end:
             self.cancel_at_period_end = True
@@ -130,58 +143,71 @@ class Subscription(BaseModel):
             self.cancelled_at = datetime.utcnow()
             self.status = PaymentStatus.CANCELLED
         
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def reactivate_subscription(self) -> None:
+    def reactivate_subscription(self, commit: bool = True) -> None:
         """Reactiva la suscripción"""
         self.cancel_at_period_end = False
         self.cancelled_at = None
         self.status = PaymentStatus.COMPLETED
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def start_trial(self, trial_days: int = 7) -> None:
+    def start_trial(self, trial_days: int = 7, commit: bool = True) -> None:
         """Inicia período de prueba"""
         now = datetime.utcnow()
         self.trial_start = now
         self.trial_end = now + timedelta(days=trial_days)
         self.status = PaymentStatus.COMPLETED
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def upgrade_plan(self, new_plan: SubscriptionType) -> None:
+    def upgrade_plan(self, new_plan: SubscriptionType, commit: bool = True) -> None:
         """Actualiza el plan de suscripción"""
         self.plan_type = new_plan
-        db.session.commit()
+        _commit_or_flush(commit)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el modelo a diccionario"""
         base_dict = super().to_dict()
+        # Una sola lectura del reloj para todos los campos que dependen de la fecha
+        now = datetime.utcnow()
         base_dict.update({
             "plan_type": self.plan_type.value,
             "status": self.status.value,
-            "is_active": self.is_active,
+            "is_active": self._is_active(now),
             "is_cancelled": self.is_cancelled,
-            "is_trial": self.is_trial,
-            "days_until_renewal": self.days_until_renewal,
+            "is_trial": self._is_trial(now),
+            "days_until_renewal": self._days_until_renewal(now),
             "plan_details": self.plan_details,
         })
         return base_dict
     
     @classmethod
-    def get_active_subscriptions(cls) -> List['Subscription']:
-        """Retorna suscripciones activas"""
+    def _active_query(cls):
+        """Query de suscripciones activas"""
         return cls.query.filter(
             cls.status == PaymentStatus.COMPLETED,
             cls.current_period_end > datetime.utcnow()
-        ).all()
+        )
+    
+    @classmethod
+    def get_active_subscriptions(cls) -> List['Subscription']:
+        """Retorna suscripciones activas (con sus usuarios)"""
+        return cls._active_query().options(selectinload(cls.user)).all()
+    
+    @classmethod
+    def count_active(cls) -> int:
+        """Cuenta las suscripciones activas sin cargarlas"""
+        return cls._active_query().count()
     
     @classmethod
     def get_expiring_subscriptions(cls, days: int = 7) -> List['Subscription']:
-        """Retorna suscripciones que expiran pronto"""
-        expiry_date = datetime.utcnow() + timedelta(days=days)
-        return cls.query.filter(
+        """Retorna suscripciones que expiran pronto (con sus usuarios, para avisarles)"""
+        now = datetime.utcnow()
+        expiry_date = now + timedelta(days=days)
+        return cls.query.options(selectinload(cls.user)).filter(
             cls.status == PaymentStatus.COMPLETED,
             cls.current_period_end <= expiry_date,
-            cls.current_period_end > datetime.utcnow()
+            cls.current_period_end > now
         ).all()
     
     def __repr__(self) -> str:
@@ -192,6 +218,12 @@ class Payment(BaseModel):
     """Modelo de Pago"""
     
     __tablename__ = "payments"
+    __table_args__ = (
+        # Conteos por estado e ingresos por estado y rango de fechas
+        Index('idx_payments_status_created_at', 'status', 'created_at'),
+        # Historial de pagos por usuario, del más reciente al más antiguo
+        Index('idx_payments_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     # Relaciones
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -241,42 +273,42 @@ class Payment(BaseModel):
         """Retorna el monto formateado"""
         return f"{self.amount:.2f} {self.currency}"
     
-    def mark_completed(self, provider_transaction_id: str = None) -> None:
+    def mark_completed(self, provider_transaction_id: str = None, commit: bool = True) -> None:
         """Marca el pago como completado"""
         self.status = PaymentStatus.COMPLETED
         self.processed_at = datetime.utcnow()
         if provider_transaction_id:
             self.provider_transaction_id = provider_transaction_id
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def mark_failed(self, error_message: str = None) -> None:
+    def mark_failed(self, error_message: str = None, commit: bool = True) -> None:
         """Marca el pago como fallido"""
         self.status = PaymentStatus.FAILED
         self.processed_at = datetime.utcnow()
         if error_message and self.payment_metadata:
             self.payment_metadata["error_message"] = error_message
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def mark_refunded(self, refund_amount: float = None) -> None:
+    def mark_refunded(self, refund_amount: float = None, commit: bool = True) -> None:
         """Marca el pago como reembolsado"""
         self.status = PaymentStatus.REFUNDED
         if refund_amount and self.payment_metadata:
             self.payment_metadata["refund_amount"] = refund_amount
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def update_provider_info(self, provider_payment_id: str, provider_transaction_id: str = None) -> None:
+    def update_provider_info(self, provider_payment_id: str, provider_transaction_id: str = None, commit: bool = True) -> None:
         """Actualiza información del proveedor"""
         self.provider_payment_id = provider_payment_id
         if provider_transaction_id:
             self.provider_transaction_id = provider_transaction_id
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def add_metadata(self, key: str, value: Any) -> None:
+    def add_metadata(self, key: str, value: Any, commit: bool = True) -> None:
         """Agrega metadatos al pago"""
         if not self.payment_metadata:
             self.payment_metadata = {}
         self.payment_metadata[key] = value
-        db.session.commit()
+        _commit_or_flush(commit)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el modelo a diccionario"""
@@ -300,13 +332,13 @@ class Payment(BaseModel):
     
     @classmethod
     def get_completed_payments(cls) -> List['Payment']:
-        """Retorna pagos completados"""
-        return cls.query.filter_by(status=PaymentStatus.COMPLETED).all()
+        """Retorna pagos completados (con sus usuarios)"""
+        return cls.query.options(selectinload(cls.user)).filter_by(status=PaymentStatus.COMPLETED).all()
     
     @classmethod
     def get_failed_payments(cls) -> List['Payment']:
-        """Retorna pagos fallidos"""
-        return cls.query.filter_by(status=PaymentStatus.FAILED).all()
+        """Retorna pagos fallidos (con sus usuarios)"""
+        return cls.query.options(selectinload(cls.user)).filter_by(status=PaymentStatus.FAILED).all()
     
     @classmethod
     def get_total_revenue(cls) -> float:
@@ -319,10 +351,13 @@ class Payment(BaseModel):
     @classmethod
     def get_monthly_revenue(cls, year: int, month: int) -> float:
         """Retorna ingresos mensuales"""
+        # Rango semiabierto [inicio de mes, inicio del siguiente) para usar el índice
+        month_start = datetime(year, month, 1, tzinfo=timezone.utc)
+        next_month_start = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
         result = db.session.query(func.sum(cls.amount)).filter(
             cls.status == PaymentStatus.COMPLETED,
-            func.extract('year', cls.created_at) == year,
-            func.extract('month', cls.created_at) == month
+            cls.created_at >= month_start,
+            cls.created_at < next_month_start
         ).scalar()
         return float(result) if result else 0.0
     
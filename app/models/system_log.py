@@ -2,15 +2,34 @@
 Modelos de Sistema para Buko AI
 """
 
-from datetime import datetime
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
 from typing import Dict, List, Optional, Any
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum, DECIMAL, BigInteger
-from sqlalchemy.orm import relationship
+from flask import current_app
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum, DECIMAL, BigInteger, Index, select
+from sqlalchemy.orm import relationship, selectinload
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import INET
 import enum
 
-from .base import BaseModel, db
+from .base import BaseModel, db, _commit_or_flush
+from app.utils.cache_manager import cached_result
+
+logger = logging.getLogger(__name__)
+
+
+# Unidades de tamaño de archivo (potencias de 1024)
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Escritura por lotes de SystemLog: filas por INSERT y espera máxima para completar un lote
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 0.2  # segundos
+# Espera máxima de SystemLog.flush() (también al salir del proceso)
+LOG_FLUSH_TIMEOUT = 10  # segundos
 
 
 class LogLevel(enum.Enum):
@@ -41,6 +60,14 @@ class SystemLog(BaseModel):
     """Modelo de logs del sistema"""
     
     __tablename__ = "system_logs"
+    __table_args__ = (
+        # Limpieza de logs antiguos
+        Index('idx_system_logs_created_at', 'created_at'),
+        # Listados filtrados por nivel, usuario o acción, ordenados por fecha
+        Index('idx_system_logs_level_created_at', 'level', 'created_at'),
+        Index('idx_system_logs_user_id_created_at', 'user_id', 'created_at'),
+        Index('idx_system_logs_action_created_at', 'action', 'created_at'),
+    )
     
     # Relación con usuario (opcional)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -95,9 +122,14 @@ class SystemLog(BaseModel):
     def log_action(cls, action: str, user_id: int = None, details: Dict[str, Any] = None, 
                    level: LogLevel = LogLevel.INFO, status: LogStatus = LogStatus.SUCCESS,
                    ip_address: str = None, user_agent: str = None, session_id: str = None,
-                   error_message: str = None, execution_time: int = None) -> 'SystemLog':
-        """Crea un nuevo log"""
-        log = cls(
+                   error_message: str = None, execution_time: int = None) -> Dict[str, Any]:
+        """
+        Registra un log sin bloquear al llamador.
+        
+        La fila se encola y el hilo de escritura la inserta en el siguiente lote;
+        retorna los valores encolados. ``SystemLog.flush()`` escribe los pendientes.
+        """
+        values = dict(
             action=action,
             user_id=user_id,
             details=details,
@@ -109,18 +141,23 @@ class SystemLog(BaseModel):
             error_message=error_message,
             execution_time=execution_time
         )
-        log.save()
-        return log
+        _log_sink.put(current_app._get_current_object(), values)
+        return values
+    
+    @classmethod
+    def flush(cls) -> None:
+        """Escribe en la base de datos los logs encolados por ``log_action``"""
+        _log_sink.flush()
     
     @classmethod
     def get_recent_logs(cls, limit: int = 100) -> List['SystemLog']:
-        """Retorna logs recientes"""
-        return cls.query.order_by(cls.created_at.desc()).limit(limit).all()
+        """Retorna logs recientes (con sus usuarios, que usa to_dict)"""
+        return cls.query.options(selectinload(cls.user)).order_by(cls.created_at.desc()).limit(limit).all()
     
     @classmethod
     def get_error_logs(cls, limit: int = 100) -> List['SystemLog']:
         """Retorna logs de error"""
-        return cls.query.filter(
+        return cls.query.options(selectinload(cls.user)).filter(
             cls.level.in_([LogLevel.ERROR, LogLevel.CRITICAL])
         ).order_by(cls.created_at.desc()).limit(limit).all()
     
@@ -134,7 +171,7 @@ class SystemLog(BaseModel):
     @classmethod
     def get_logs_by_action(cls, action: str, limit: int = 100) -> List['SystemLog']:
         """Retorna logs por acción"""
-        return cls.query.filter_by(action=action).order_by(
+        return cls.query.options(selectinload(cls.user)).filter_by(action=action).order_by(
             cls.created_at.desc()
         ).limit(limit).all()
     
@@ -142,10 +179,103 @@ class SystemLog(BaseModel):
         return f"<SystemLog {self.action} - {self.level.value}>"
 
 
+class _SystemLogSink:
+    """
+    Cola en memoria de ``SystemLog.log_action`` que se inserta por lotes.
+    
+    Un hilo en segundo plano agrupa hasta ``LOG_BATCH_SIZE`` filas (o las que
+    lleguen en ``LOG_FLUSH_INTERVAL``) en un INSERT multi-VALUES con un solo commit.
+    El hilo se arranca con el primer log de cada proceso y el estado se reinicia
+    tras un fork, así que también funciona en los workers de gunicorn y Celery.
+    """
+    
+    def __init__(self):
+        self._reset()
+    
+    def _reset(self) -> None:
+        """Estado vacío; tras un fork la cola, los locks y el hilo heredados son del padre"""
+        self._queue = queue.SimpleQueue()
+        self._start_lock = threading.Lock()
+        # Filas encoladas y aún no escritas, incluido el lote que tiene el hilo
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._thread = None
+    
+    def put(self, app, values: Dict[str, Any]) -> None:
+        """Encola una fila para la aplicación dada"""
+        self._ensure_started()
+        with self._idle:
+            self._pending += 1
+        self._queue.put((app, values))
+    
+    def flush(self, timeout: float = LOG_FLUSH_TIMEOUT) -> None:
+        """Espera a que el hilo escriba todas las filas encoladas, incluido el lote en curso"""
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._pending == 0, timeout=timeout):
+                logger.warning("Timed out flushing %d system logs", self._pending)
+    
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='system-log-sink', daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            while len(batch) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                with self._idle:
+                    self._pending -= len(batch)
+                    if self._pending == 0:
+                        self._idle.notify_all()
+    
+    @staticmethod
+    def _write(batch: List[tuple]) -> None:
+        rows_by_app = {}
+        for app, values in batch:
+            rows_by_app.setdefault(app, []).append(values)
+        
+        for app, rows in rows_by_app.items():
+            with app.app_context():
+                try:
+                    SystemLog.bulk_create(rows, batch_size=LOG_BATCH_SIZE)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Error writing %d system logs", len(rows))
+                finally:
+                    db.session.remove()
+
+
+_log_sink = _SystemLogSink()
+os.register_at_fork(after_in_child=_log_sink._reset)
+atexit.register(_log_sink.flush)
+
+
 class BookDownload(BaseModel):
     """Modelo de descargas de libros"""
     
     __tablename__ = "book_downloads"
+    __table_args__ = (
+        # Descargas por usuario y por libro, ordenadas por fecha
+        Index('idx_book_downloads_user_id_created_at', 'user_id', 'created_at'),
+        Index('idx_book_downloads_book_id_created_at', 'book_id', 'created_at'),
+        # Agregado por formato resuelto solo con el índice (get_popular_formats)
+        Index('idx_book_downloads_format_download_count', 'format', 'download_count'),
+    )
     
     # Relaciones
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -171,22 +301,26 @@ class BookDownload(BaseModel):
     def formatted_file_size(self) -> Optional[str]:
         """Retorna el tamaño del archivo formateado"""
         if self.file_size:
-            size = self.file_size
-            units = ['B', 'KB', 'MB', 'GB', 'TB']
+            # Unidad = potencias de 1024 contenidas en el tamaño (bits / 10), sin bucle;
+            # los tamaños negativos se muestran en bytes, como antes
             unit_index = 0
-            
-            while size >= 1024 and unit_index < len(units) - 1:
-                size /= 1024
-                unit_index += 1
-            
-            return f"{size:.2f} {units[unit_index]}"
+            if self.file_size > 0:
+                unit_index = min(len(FILE_SIZE_UNITS) - 1, (self.file_size.bit_length() - 1) // 10)
+            size = self.file_size / (1 << (10 * unit_index))
+            return f"{size:.2f} {FILE_SIZE_UNITS[unit_index]}"
         return None
     
-    def increment_download_count(self) -> None:
+    def increment_download_count(self, commit: bool = True) -> None:
         """Incrementa el contador de descargas"""
-        self.download_count += 1
-        self.last_downloaded_at = datetime.utcnow()
-        db.session.commit()
+        # Incremento en el propio UPDATE (download_count = download_count + 1):
+        # no depende del valor leído y no pierde descargas concurrentes
+        BookDownload.query.filter_by(id=self.id).update({
+            BookDownload.download_count: BookDownload.download_count + 1,
+            BookDownload.last_downloaded_at: func.now(),
+        }, synchronize_session=False)
+        # Los valores nuevos se releen de la base al próximo acceso
+        db.session.expire(self, ['download_count', 'last_downloaded_at'])
+        _commit_or_flush(commit)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el modelo a diccionario"""
@@ -201,29 +335,29 @@ class BookDownload(BaseModel):
     
     @classmethod
     def get_by_user(cls, user_id: int) -> List['BookDownload']:
-        """Retorna descargas de un usuario"""
-        return cls.query.filter_by(user_id=user_id).order_by(cls.created_at.desc()).all()
+        """Retorna descargas de un usuario (con sus libros, que usa to_dict)"""
+        return cls.query.options(selectinload(cls.book)).filter_by(user_id=user_id).order_by(cls.created_at.desc()).all()
     
     @classmethod
     def get_by_book(cls, book_id: int) -> List['BookDownload']:
-        """Retorna descargas de un libro"""
-        return cls.query.filter_by(book_id=book_id).order_by(cls.created_at.desc()).all()
+        """Retorna descargas de un libro (con sus usuarios, que usa to_dict)"""
+        return cls.query.options(selectinload(cls.user)).filter_by(book_id=book_id).order_by(cls.created_at.desc()).all()
     
     @classmethod
+    @cached_result(cache_type='temporary', key_prefix='book_downloads:popular_formats')
     def get_popular_formats(cls) -> List[Dict[str, Any]]:
-        """Retorna formatos más populares"""
-        results = db.session.query(
-            cls.format,
-            func.count(cls.id).label('count'),
-            func.sum(cls.download_count).label('total_downloads')
-        ).group_by(cls.format).order_by(func.sum(cls.download_count).desc()).all()
+        """Retorna formatos más populares (agregado de baja variación, cacheado un minuto)"""
+        total_downloads = func.coalesce(func.sum(cls.download_count), 0).label('total_downloads')
+        results = db.session.execute(
+            select(
+                cls.format,
+                func.count(cls.id).label('unique_downloads'),
+                total_downloads
+            ).group_by(cls.format).order_by(total_downloads.desc(), cls.format)
+        ).mappings()
         
         return [
-            {
-                "format": result.format.value,
-                "unique_downloads": result.count,
-                "total_downloads": result.total_downloads
-            }
+            {**result, "format": result["format"].value}
             for result in results
         ]
     
@@ -236,6 +370,11 @@ class Referral(BaseModel):
     """Modelo de referidos"""
     
     __tablename__ = "referrals"
+    __table_args__ = (
+        # Búsquedas por referidor y por código (un código se comparte entre referidos)
+        Index('idx_referrals_referrer_id', 'referrer_id'),
+        Index('idx_referrals_referral_code', 'referral_code'),
+    )
     
     # Relaciones
     referrer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -260,15 +399,15 @@ class Referral(BaseModel):
         """Retorna la comisión pendiente"""
         return float(self.commission_earned - self.commission_paid)
     
-    def add_commission(self, amount: float) -> None:
+    def add_commission(self, amount: float, commit: bool = True) -> None:
         """Agrega comisión"""
         self.commission_earned += amount
-        db.session.commit()
+        _commit_or_flush(commit)
     
-    def pay_commission(self, amount: float) -> None:
+    def pay_commission(self, amount: float, commit: bool = True) -> None:
         """Marca comisión como pagada"""
         self.commission_paid += amount
-        db.session.commit()
+        _commit_or_flush(commit)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el modelo a diccionario"""
@@ -285,8 +424,8 @@ class Referral(BaseModel):
     
     @classmethod
     def get_by_referrer(cls, referrer_id: int) -> List['Referral']:
-        """Retorna referidos de un usuario"""
-        return cls.query.filter_by(referrer_id=referrer_id).all()
+        """Retorna referidos de un usuario (con los usuarios referidos, que usa to_dict)"""
+        return cls.query.options(selectinload(cls.referred)).filter_by(referrer_id=referrer_id).all()
     
     @classmethod
     def get_by_referral_code(cls, code: str) -> Optional['Referral']:
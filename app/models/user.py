@@ -6,7 +6,7 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 import bcrypt
 from flask_login import UserMixin
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -35,6 +35,12 @@ class User(BaseModel, SoftDeleteMixin, UserMixin):
     """Modelo de Usuario"""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Estadísticas por estado/suscripción y reset mensual
+        Index('idx_users_status_subscription_type', 'status', 'subscription_type'),
+        Index('idx_users_subscription_type', 'subscription_type'),
+        Index('idx_users_last_reset_date', 'last_reset_date'),
+    )
     
     # Información básica
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -272,10 +278,15 @@ class User(BaseModel, SoftDeleteMixin, UserMixin):
     
     def get_statistics(self) -> dict:
         """Retorna estadísticas del usuario"""
-        total_books = len(self.books)
-        completed_books = len([b for b in self.books if b.status == "completed"])
-        total_pages = sum(b.final_pages or 0 for b in self.books if b.final_pages)
-        total_words = sum(b.final_words or 0 for b in self.books if b.final_words)
+        from .book_generation import BookGeneration, BookStatus
+        
+        # Agregados en SQL: no se cargan los libros (ni su contenido) para contarlos
+        total_books, completed_books, total_pages, total_words = db.session.query(
+            func.count(BookGeneration.id),
+            func.count(BookGeneration.id).filter(BookGeneration.status == BookStatus.COMPLETED),
+            func.coalesce(func.sum(BookGeneration.final_pages), 0),
+            func.coalesce(func.sum(BookGeneration.final_words), 0)
+        ).filter(BookGeneration.user_id == self.id).one()
         
         return {
             "total_books": total_books,
@@ -294,6 +305,19 @@ class User(BaseModel, SoftDeleteMixin, UserMixin):
         """Busca un usuario por email"""
         return cls.query.filter_by(email=email).first()
     
+    @classmethod
+    def email_exists(cls, email: str) -> bool:
+        """Verifica si el email está registrado (solo consulta el id)"""
+        return db.session.query(cls.id).filter(cls.email == email).first() is not None
+    
+    @classmethod
+    def is_active_by_email(cls, email: str) -> Optional[bool]:
+        """Indica si el usuario con ese email está activo (None si no existe)"""
+        row = db.session.query(cls.status, cls.deleted_at).filter(cls.email == email).first()
+        if row is None:
+            return None
+        return row.status == UserStatus.ACTIVE and row.deleted_at is None
+    
     @classmethod
     def find_by_verification_token(cls, token: str) -> Optional['User']:
         """Busca un usuario por token de verificación"""
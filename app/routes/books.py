@@ -3,9 +3,10 @@ Rutas para generación de libros con IA.
 """
 from flask import Blueprint, render_template, jsonify, request, redirect, url_for, flash, send_file
 from flask_login import login_required, current_user
-from app.models.book_generation import BookGeneration, BookStatus
+from app.models.book_generation import BookGeneration, BookStatus, count_words
 from app.models.subscription import Subscription
 from app.services.claude_service import ClaudeService
+from app.services.cache_service import BookCacheService
 from app import db, cache
 from app.utils.decorators import subscription_required
 from app.utils.page_calculations import calculate_pages_from_words
@@ -391,7 +392,10 @@ def generation_status(book_id):
 @login_required
 def my_books():
     """Lista de libros del usuario."""
-    books = BookGeneration.query.filter_by(
+    # La plantilla solo lee metadatos y ``parameters`` (filtro por extensión)
+    books = BookGeneration.query.options(
+        *BookGeneration.list_load_options(keep=('parameters',))
+    ).filter_by(
         user_id=current_user.id
     ).order_by(BookGeneration.created_at.desc()).all()
     
@@ -407,11 +411,15 @@ def view_book(book_id):
         user_id=current_user.id
     ).first_or_404()
     
+    # Palabras del contenido, contadas como mucho una vez y solo si hacen falta
+    content_words = None
+    if book.content and (not book.final_pages or not book.final_words):
+        content_words = count_words(book.content)
+    
     # Calcular estadísticas si no existen (para libros completados sin estadísticas)
     if book.status == BookStatus.COMPLETED and book.content:
         if not book.final_pages or not book.final_words:
             # Calcular desde el contenido actual usando formato específico
-            content_words = len(book.content.split()) if book.content else 0
             content_pages = calculate_pages_from_words(
                 content_words, 
                 book.format_size or 'pocket', 
@@ -433,12 +441,12 @@ def view_book(book_id):
     # Asegurar valores mínimos para mostrar
     display_pages = book.final_pages or (
         calculate_pages_from_words(
-            len(book.content.split()) if book.content else 0,
+            content_words,
             book.format_size or 'pocket',
             book.line_spacing or 'medium'
-        ) if book.content else 0
+        ) if content_words is not None else 0
     ) or 0
-    display_words = book.final_words or (len(book.content.split()) if book.content else 0) or 0
+    display_words = book.final_words or content_words or 0
     
     return render_template('books/view_book_compact.html', 
                          book=book,
@@ -566,18 +574,8 @@ def _export_and_download(book, format: str, platform: str):
 
 
 # API Endpoints para monitoreo
-@bp.route('/api/<int:book_id>/status')
-@login_required
-def api_book_status(book_id):
-    """API endpoint para obtener el estado de un libro."""
-    book = BookGeneration.query.filter_by(
-        id=book_id,
-        user_id=current_user.id
-    ).first()
-    
-    if not book:
-        return jsonify({'error': 'Libro no encontrado'}), 404
-    
+def _book_status_data(book):
+    """Construye el estado de un libro que devuelven los endpoints de polling."""
     # Calcular tiempo transcurrido si está en proceso
     elapsed_time = None
     if book.started_at:
@@ -625,7 +623,7 @@ def api_book_status(book_id):
         display_pages = target_pages
         display_words = target_words
     
-    return jsonify({
+    status_data = {
         'book_id': book.id,
         'status': book.status.value,
         'progress': progress,
@@ -647,31 +645,58 @@ def api_book_status(book_id):
             'words': display_words,
             'chapters': book.chapter_count or 0
         }
-    })
+    }
+    return status_data
 
 
-@bp.route('/api/<int:book_id>/progress')
-@login_required  
-def api_book_progress(book_id):
-    """API endpoint simplificado para progreso del libro."""
+def _get_book_status(book_id: int):
+    """
+    Retorna el estado del libro del usuario actual, o ``None`` si no es suyo.
+    
+    Los endpoints de estado y progreso se consultan por polling: comparten la
+    misma entrada de cache durante unos segundos.
+    """
+    status_data = BookCacheService.get_progress(book_id, current_user.id)
+    if status_data is not None:
+        return status_data
+    
     book = BookGeneration.query.filter_by(
         id=book_id,
         user_id=current_user.id
     ).first()
     
     if not book:
+        return None
+    
+    status_data = _book_status_data(book)
+    BookCacheService.set_progress(book.id, current_user.id, status_data)
+    return status_data
+
+
+@bp.route('/api/<int:book_id>/status')
+@login_required
+def api_book_status(book_id):
+    """API endpoint para obtener el estado de un libro."""
+    status_data = _get_book_status(book_id)
+    if status_data is None:
         return jsonify({'error': 'Libro no encontrado'}), 404
     
-    # Force 100% progress for completed books
-    progress = getattr(book, 'progress', 0)
-    if book.status.value == 'completed':
-        progress = 100
+    return jsonify(status_data)
+
+
+@bp.route('/api/<int:book_id>/progress')
+@login_required  
+def api_book_progress(book_id):
+    """API endpoint simplificado para progreso del libro."""
+    status_data = _get_book_status(book_id)
+    if status_data is None:
+        return jsonify({'error': 'Libro no encontrado'}), 404
     
     return jsonify({
-        'book_id': book.id,
-        'status': book.status.value,
-        'progress': progress,
-        'message': getattr(book, 'current_step', 'Sin mensaje')
+        'book_id': status_data['book_id'],
+        'status': status_data['status'],
+        'progress': status_data['progress'],
+        'message': status_data['message']
     })
 
 
@@ -983,7 +1008,7 @@ def regenerate_architecture(book_id):
             return jsonify({'error': 'El feedback debe ser más detallado (mínimo 20 caracteres cada campo)'}), 400
         
         # Guardar feedback en la base de datos para estadísticas usando el método del modelo
-        book.add_regeneration_feedback(feedback_what, feedback_how, current_architecture)
+        book.add_regeneration_feedback(feedback_what, feedback_how, current_architecture, commit=False)
         
         # Log del evento
         from app.utils.logging import log_system_event
@@ -6,10 +6,25 @@ para diferentes plataformas de comercio de ebooks.
 
 import re
 import json
+import hashlib
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from flask import current_app, has_app_context
+
+
+# Patrones precompilados para la identificación de elementos
+NUMBERED_EXPRESSION_RE = re.compile(r'^\*\*(\d+)\.\s+(.+?)\*\*$')
+PHONETIC_TRANSCRIPTION_RE = re.compile(r'^\*\[.+?\]\*$')
+
+# Primera línea "# Título" del contenido (ignora espacios alrededor)
+MAIN_TITLE_RE = re.compile(r'^[^\S\n]*# [^\S\n]*(\S[^\n]*)', re.MULTILINE)
+
+# Cache del análisis estructural, indexado por hash del contenido
+ANALYSIS_CACHE_PREFIX = 'book_analysis'
+ANALYSIS_CACHE_TTL = 86400  # 24 horas
+
 
 class FormattingPlatform(Enum):
     """Plataformas de comercio de ebooks con diferentes estándares."""
@@ -215,7 +230,37 @@ class BookFormattingService:
         self.platform_specs = PlatformSpecifications()
     
     def analyze_content_structure(self, content: str) -> BookStructure:
-        """Analiza el contenido del libro e identifica todos los elementos estructurales."""
+        """Analiza el contenido del libro e identifica todos los elementos estructurales.
+        
+        El análisis solo depende del contenido, así que se memoiza en el
+        cache de la aplicación usando un hash del texto como clave.
+        """
+        if not has_app_context() or 'cache' not in current_app.extensions:
+            return self._analyze_content_structure(content)
+        
+        from app import cache
+        
+        content_hash = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        cache_key = f"{ANALYSIS_CACHE_PREFIX}:{content_hash}"
+        
+        try:
+            cached_structure = cache.get(cache_key)
+            if cached_structure is not None:
+                return cached_structure
+        except Exception as e:
+            current_app.logger.warning(f"Book analysis cache get failed: {str(e)}")
+        
+        book_structure = self._analyze_content_structure(content)
+        
+        try:
+            cache.set(cache_key, book_structure, timeout=ANALYSIS_CACHE_TTL)
+        except Exception as e:
+            current_app.logger.warning(f"Book analysis cache set failed: {str(e)}")
+        
+        return book_structure
+    
+    def _analyze_content_structure(self, content: str) -> BookStructure:
+        """Realiza el análisis estructural completo del contenido (sin cache)."""
         
         # Dividir contenido en líneas para análisis
         lines = content.split('\n')
@@ -331,9 +376,9 @@ class BookFormattingService:
             )
         
         # Expresión numerada (**1. Expresión**)
-        numbered_expr_pattern = r'^\*\*(\d+)\.\s+(.+?)\*\*$'
-        if re.match(numbered_expr_pattern, line):
-            match = re.match(numbered_expr_pattern, line)
+        # El prefijo literal evita invocar el regex en párrafos comunes
+        match = NUMBERED_EXPRESSION_RE.match(line) if line.startswith('**') else None
+        if match:
             return BookElement(
                 element_type=ElementType.NUMBERED_EXPRESSION,
                 content=line,
@@ -346,8 +391,7 @@ class BookFormattingService:
             )
         
         # Transcripción fonética (*[fonética]*)
-        phonetic_pattern = r'^\*\[.+?\]\*$'
-        if re.match(phonetic_pattern, line):
+        if line.startswith('*[') and PHONETIC_TRANSCRIPTION_RE.match(line):
             return BookElement(
                 element_type=ElementType.PHONETIC_TRANSCRIPTION,
                 content=line,
@@ -401,7 +445,7 @@ class BookFormattingService:
             )
         
         # Separador (---)
-        if line.strip() == '---':
+        if line == '---':
             return BookElement(
                 element_type=ElementType.SEPARATOR,
                 content=line,
@@ -410,7 +454,7 @@ class BookFormattingService:
             )
         
         # Párrafo regular (cualquier otro texto)
-        if line.strip():
+        if line:
             return BookElement(
                 element_type=ElementType.PARAGRAPH,
                 content=line,
@@ -426,11 +470,10 @@ class BookFormattingService:
     
     def _extract_title(self, content: str) -> str:
         """Extrae el título principal del contenido."""
-        lines = content.split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.startswith('# ') and not line.startswith('## '):
-                return line[2:].strip()
+        # Una sola búsqueda sobre el contenido en lugar de dividirlo en líneas
+        match = MAIN_TITLE_RE.search(content)
+        if match:
+            return match.group(1).strip()
         return "Untitled Book"
     
     def generate_professional_elements(self, book_structure: BookStructure, 
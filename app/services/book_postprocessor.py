@@ -9,6 +9,35 @@ from typing import Dict, List, Any, Tuple
 
 logger = structlog.get_logger()
 
+# Patrones de títulos técnicos a eliminar, fusionados en una sola alternancia
+# para recorrer el contenido una única vez
+TECHNICAL_TITLE_RE = re.compile(
+    r'<h[1-6][^>]*>\s*(?:'
+    r'\*\*.*?CHUNK.*?\*\*\s*'
+    r'|CHUNK.*?'
+    r'|#.*?CHUNK.*?'
+    r'|📋.*?CHUNK.*?'
+    r'|\*\*.*?CONTENIDO PLANIFICADO.*?\*\*\s*'
+    r'|CONTENIDO PLANIFICADO.*?'
+    r'|\*\*.*?SECCIÓN.*?\*\*\s*'
+    r'|\*\*.*?PARTE.*?\*\*\s*'
+    r'|\*\*.*?PÁGINAS TARGET.*?\*\*\s*'
+    r')</h[1-6]>',
+    re.IGNORECASE | re.DOTALL
+)
+
+MULTIPLE_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+NON_WORD_RE = re.compile(r'[^\w\s]')
+HEADING_RE = re.compile(r'<(h[1-3])([^>]*)>(.*?)</h[1-3]>', re.DOTALL)
+HEADING_OPEN_RE = re.compile(r'(<h[1-6][^>]*>)')
+HEADING_CLOSE_RE = re.compile(r'(</h[1-6]>)')
+
+# Patrones de numeración existente en encabezados
+CHAPTER_PREFIXES = ('capítulo', 'chapter')
+CHAPTER_PREFIX_RE = re.compile(r'^(Capítulo\s+\d+\s*[:.-]\s*|Chapter\s+\d+\s*[:.-]\s*)', re.IGNORECASE)
+STRUCTURAL_NUMBERING_RE = re.compile(r'^\d+(?:\.\d+)*\s+')
+LEADING_NUMBER_RE = re.compile(r'^\d+\s+')
+
 class BookPostProcessor:
     """
     Post-procesador de contenido de libros que:
@@ -62,25 +91,10 @@ class BookPostProcessor:
     def _remove_technical_titles(self, content: str) -> str:
         """Elimina títulos técnicos de organización interna."""
         
-        # Patrones de títulos técnicos a eliminar
-        technical_patterns = [
-            r'<h[1-6][^>]*>\s*\*\*.*?CHUNK.*?\*\*\s*</h[1-6]>',
-            r'<h[1-6][^>]*>\s*CHUNK.*?</h[1-6]>',
-            r'<h[1-6][^>]*>\s*#.*?CHUNK.*?</h[1-6]>',
-            r'<h[1-6][^>]*>\s*📋.*?CHUNK.*?</h[1-6]>',
-            r'<h[1-6][^>]*>\s*\*\*.*?CONTENIDO PLANIFICADO.*?\*\*\s*</h[1-6]>',
-            r'<h[1-6][^>]*>\s*CONTENIDO PLANIFICADO.*?</h[1-6]>',
-            r'<h[1-6][^>]*>\s*\*\*.*?SECCIÓN.*?\*\*\s*</h[1-6]>',
-            r'<h[1-6][^>]*>\s*\*\*.*?PARTE.*?\*\*\s*</h[1-6]>',
-            r'<h[1-6][^>]*>\s*\*\*.*?PÁGINAS TARGET.*?\*\*\s*</h[1-6]>',
-        ]
-        
-        cleaned = content
-        for pattern in technical_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE | re.DOTALL)
+        cleaned = TECHNICAL_TITLE_RE.sub('', content)
         
         # Eliminar líneas vacías múltiples que quedan después del filtrado
-        cleaned = re.sub(r'\n\s*\n\s*\n+', '\n\n', cleaned)
+        cleaned = MULTIPLE_BLANK_LINES_RE.sub('\n\n', cleaned)
         
         return cleaned
     
@@ -91,7 +105,7 @@ class BookPostProcessor:
             return content
         
         # Normalizar título para comparación
-        normalized_title = re.sub(r'[^\w\s]', '', book_title.lower()).strip()
+        normalized_title = NON_WORD_RE.sub('', book_title.lower()).strip()
         
         # Patrones para encontrar títulos duplicados
         title_patterns = [
@@ -126,10 +140,14 @@ class BookPostProcessor:
                 self.subsection_counters[self.chapter_counter] = {}
                 
                 # Limpiar TODA numeración existente (incluye números simples al inicio)
-                clean_content = re.sub(r'^(Capítulo\s+\d+\s*[:.-]\s*|Chapter\s+\d+\s*[:.-]\s*)', '', content_text, flags=re.IGNORECASE).strip()
+                # Comprobación literal del prefijo antes de recurrir al regex
+                clean_content = content_text
+                if content_text[:8].lower().startswith(CHAPTER_PREFIXES):
+                    clean_content = CHAPTER_PREFIX_RE.sub('', content_text)
+                clean_content = clean_content.strip()
                 # Eliminar cualquier numeración adicional
-                clean_content = re.sub(r'^\d+(?:\.\d+)*\s+', '', clean_content).strip()
-                clean_content = re.sub(r'^\d+\s+', '', clean_content).strip()
+                clean_content = STRUCTURAL_NUMBERING_RE.sub('', clean_content).strip()
+                clean_content = LEADING_NUMBER_RE.sub('', clean_content).strip()
                 
                 return f'<h1{attributes}>Capítulo {self.chapter_counter}: {clean_content}</h1>'
                 
@@ -150,9 +168,9 @@ class BookPostProcessor:
                 
                 # Limpiar TODA numeración existente de forma más agresiva
                 # Primero eliminar cualquier numeración estructural (1.2.3, 1.2, etc)
-                clean_content = re.sub(r'^\d+(?:\.\d+)*\s+', '', content_text).strip()
+                clean_content = STRUCTURAL_NUMBERING_RE.sub('', content_text).strip()
                 # Luego eliminar cualquier número simple al inicio
-                clean_content = re.sub(r'^\d+\s+', '', clean_content).strip()
+                clean_content = LEADING_NUMBER_RE.sub('', clean_content).strip()
                 
                 return f'<h2{attributes}>{current_chapter}.{current_section} {clean_content}</h2>'
                 
@@ -171,9 +189,9 @@ class BookPostProcessor:
                 
                 # Limpiar TODA numeración existente de forma más agresiva
                 # Primero eliminar cualquier numeración estructural (1.2.3, 1.2, etc)
-                clean_content = re.sub(r'^\d+(?:\.\d+)*\s+', '', content_text).strip()
+                clean_content = STRUCTURAL_NUMBERING_RE.sub('', content_text).strip()
                 # Luego eliminar cualquier número simple al inicio
-                clean_content = re.sub(r'^\d+\s+', '', clean_content).strip()
+                clean_content = LEADING_NUMBER_RE.sub('', clean_content).strip()
                 
                 return f'<h3{attributes}>{current_chapter}.{current_section}.{current_subsection} {clean_content}</h3>'
             
@@ -181,7 +199,7 @@ class BookPostProcessor:
             return match.group(0)
         
         # Procesar todos los encabezados secuencialmente en una sola pasada
-        content = re.sub(r'<(h[1-3])([^>]*)>(.*?)</h[1-3]>', replace_heading, content, flags=re.DOTALL)
+        content = HEADING_RE.sub(replace_heading, content)
         
         return content
     
@@ -189,11 +207,11 @@ class BookPostProcessor:
         """Optimiza el formato HTML final."""
         
         # Eliminar espacios en blanco excesivos
-        content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)
+        content = MULTIPLE_BLANK_LINES_RE.sub('\n\n', content)
         
         # Asegurar espaciado consistente alrededor de encabezados
-        content = re.sub(r'(<h[1-6][^>]*>)', r'\n\1', content)
-        content = re.sub(r'(</h[1-6]>)', r'\1\n', content)
+        content = HEADING_OPEN_RE.sub(r'\n\1', content)
+        content = HEADING_CLOSE_RE.sub(r'\1\n', content)
         
         # Limpiar espacios al inicio y final
         content = content.strip()
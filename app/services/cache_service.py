@@ -84,6 +84,41 @@ class BookCacheService:
             # Invalidar listas que puedan contener este libro
             pattern = f"book_list:*"
             cache_manager.delete_pattern(pattern)
+    
+    @staticmethod
+    def get_progress(book_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el estado de progreso cacheado de un libro.
+        
+        Solo se devuelve al dueño del libro; para cualquier otro usuario se
+        trata como un fallo de cache y la ruta consulta la base de datos.
+        """
+        cache_manager = getattr(current_app, 'cache_manager', None)
+        if not cache_manager:
+            return None
+        
+        cached = cache_manager.get(CacheStrategies.book_cache_key(book_id, 'progress'))
+        if cached and cached.get('user_id') == user_id:
+            return cached['data']
+        return None
+    
+    @staticmethod
+    def set_progress(book_id: int, user_id: int, data: Dict[str, Any]) -> None:
+        """Cachea el estado de progreso de un libro durante unos segundos."""
+        cache_manager = getattr(current_app, 'cache_manager', None)
+        if cache_manager:
+            cache_manager.set(
+                CacheStrategies.book_cache_key(book_id, 'progress'),
+                {'user_id': user_id, 'data': data},
+                timeout=CacheStrategies.get_ttl('book_progress')
+            )
+    
+    @staticmethod
+    def invalidate_progress(book_id: int) -> None:
+        """Invalida el estado de progreso cacheado al cambiar el estado del libro."""
+        cache_manager = getattr(current_app, 'cache_manager', None)
+        if cache_manager:
+            cache_manager.delete(CacheStrategies.book_cache_key(book_id, 'progress'))
 
 
 class UserCacheService:
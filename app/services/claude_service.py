@@ -8,6 +8,7 @@ Supports streaming, retry logic, and error handling.
 import json
 import logging
 import asyncio
+import re
 from typing import Dict, Any, AsyncIterator, Optional, List
 from datetime import datetime, timezone
 import anthropic
@@ -22,6 +23,11 @@ import time
 
 logger = structlog.get_logger()
 
+# Patrones para la estimación híbrida de thinking tokens
+WORD_TOKEN_RE = re.compile(r'\b\w+\b')
+NUMBER_TOKEN_RE = re.compile(r'\b\d+\b')
+PUNCT_TOKEN_RE = re.compile(r'[.!?;:,\-(){}[\]"]')
+
 
 class ClaudeService:
     """
@@ -3326,12 +3332,10 @@ Tu respuesta debe contener ÚNICAMENTE HTML válido del capítulo regenerado. NO
         # - Puntuación
         # - Espacios y saltos de línea
         
-        import re
-        
-        # Contar diferentes tipos de elementos
-        word_tokens = len(re.findall(r'\b\w+\b', cleaned_content))  # Palabras
-        number_tokens = len(re.findall(r'\b\d+\b', cleaned_content))  # Números
-        punct_tokens = len(re.findall(r'[.!?;:,\-(){}[\]"]', cleaned_content))  # Puntuación
+        # Contar diferentes tipos de elementos (sin materializar las coincidencias)
+        word_tokens = sum(1 for _ in WORD_TOKEN_RE.finditer(cleaned_content))  # Palabras
+        number_tokens = sum(1 for _ in NUMBER_TOKEN_RE.finditer(cleaned_content))  # Números
+        punct_tokens = sum(1 for _ in PUNCT_TOKEN_RE.finditer(cleaned_content))  # Puntuación
         newline_tokens = cleaned_content.count('\n')  # Saltos de línea
         
         # Estimación más precisa
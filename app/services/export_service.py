@@ -1196,12 +1196,13 @@ class BookExportService:
         
         # Process each chapter
         for i, part in enumerate(content_parts[1:], 1):
-            if not part.strip():
+            part = part.strip()
+            if not part:
                 continue
             
-            lines = part.strip().split('\n')
-            chapter_title = lines[0].strip() if lines else f'Capítulo {i}'
-            chapter_content = '\n'.join(lines[1:]) if len(lines) > 1 else ''
+            # Separar título y cuerpo sin partir el capítulo en líneas
+            chapter_title, _, chapter_content = part.partition('\n')
+            chapter_title = chapter_title.strip()
             
             html_content = self._format_epub_chapter(chapter_title, chapter_content)
             chapters.append((chapter_title, html_content))
@@ -17,6 +17,35 @@ from bs4 import BeautifulSoup
 import json
 
 
+# Patrones precompilados de pre-procesamiento y detección de elementos
+HEADING_SPACING_RE = re.compile(r'^(#{1,6})([^# ])', re.MULTILINE)
+LIST_MARKER_RE = re.compile(r'^(\s*)[*+-]\s+', re.MULTILINE)
+NUMBERED_EXPRESSION_RE = re.compile(r'^\*\*(\d+)\.\s+(.*?)\*\*$')
+PHONETIC_RE = re.compile(r'^\*\[(.*?)\]\*$')
+CHAPTER_NUMBER_RE = re.compile(r'^#\s+(CAPÍTULO|Capítulo)\s+(\d+)')
+TRANSLATION_LABEL_RE = re.compile(r'^\*\*.*?:\*\*\s*')
+USAGE_LABEL_RE = re.compile(r'^\*\*Uso:\*\*\s*')
+EXAMPLE_LABEL_RE = re.compile(r'^\*\*Ejemplo:\*\*\s*')
+
+# Elementos de bloque en una sola alternancia (un solo match por línea)
+BLOCK_ELEMENT_RE = re.compile(
+    r'^(?:'
+    r'#{1,6}\s+'  # Encabezados
+    r'|\*\*\d+\.\s+.*\*\*$'  # Expresiones numeradas
+    r'|\*\[.*\]\*$'  # Transcripciones fonéticas
+    r'|\*\*(?:Traducción|Uso|Ejemplo):'  # Elementos especiales
+    r'|[-*+]\s+'  # Listas
+    r'|(?:---|___|[*]{3})$'  # Separadores
+    r')'
+)
+
+# Patrones de markdown inline
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+ITALIC_RE = re.compile(r'(?<!\*)\*([^*]+?)\*(?!\*)')
+INLINE_CODE_RE = re.compile(r'`(.+?)`')
+LINK_RE = re.compile(r'\[(.+?)\]\((.+?)\)')
+
+
 class HTMLElementType(Enum):
     """Tipos de elementos HTML para estructura semántica."""
     BOOK_TITLE = "book-title"
@@ -294,10 +323,10 @@ class MarkdownToHTMLConverter:
         content = content.replace('\r\n', '\n').replace('\r', '\n')
         
         # Asegurar espacios después de # en encabezados
-        content = re.sub(r'^(#{1,6})([^# ])', r'\1 \2', content, flags=re.MULTILINE)
+        content = HEADING_SPACING_RE.sub(r'\1 \2', content)
         
         # Normalizar listas
-        content = re.sub(r'^(\s*)[*+-]\s+', r'\1- ', content, flags=re.MULTILINE)
+        content = LIST_MARKER_RE.sub(r'\1- ', content)
         
         return content
     
@@ -317,7 +346,7 @@ class MarkdownToHTMLConverter:
                 continue
             
             # Capítulo
-            if line.startswith('# CAPÍTULO') or line.startswith('# Capítulo'):
+            if line.startswith(('# CAPÍTULO', '# Capítulo')):
                 chapter_elem, skip = self._create_chapter(lines, i)
                 elements.append(chapter_elem)
                 i += skip
@@ -342,13 +371,13 @@ class MarkdownToHTMLConverter:
                 continue
             
             # Expresión numerada
-            if re.match(r'^\*\*\d+\.\s+.*\*\*$', line):
+            if line.startswith('**') and NUMBERED_EXPRESSION_RE.match(line):
                 elements.append(self._create_expression(line))
                 i += 1
                 continue
             
             # Transcripción fonética
-            if re.match(r'^\*\[.*\]\*$', line):
+            if line.startswith('*[') and PHONETIC_RE.match(line):
                 elements.append(self._create_phonetic(line))
                 i += 1
                 continue
@@ -369,21 +398,23 @@ class MarkdownToHTMLConverter:
                 i += 1
                 continue
             
+            stripped = line.strip()
+            
             # Lista
-            if line.strip().startswith('- '):
+            if stripped.startswith('- '):
                 list_elem, skip = self._create_list(lines, i)
                 elements.append(list_elem)
                 i += skip
                 continue
             
             # Separador
-            if line.strip() in ['---', '***', '___']:
+            if stripped in ['---', '***', '___']:
                 elements.append(self._create_separator())
                 i += 1
                 continue
             
             # Párrafo
-            if line.strip():
+            if stripped:
                 para_elem, skip = self._create_paragraph(lines, i)
                 elements.append(para_elem)
                 i += skip
@@ -414,7 +445,7 @@ class MarkdownToHTMLConverter:
         
         # Extraer título del capítulo
         chapter_line = lines[start_idx]
-        chapter_match = re.match(r'^#\s+(CAPÍTULO|Capítulo)\s+(\d+)', chapter_line)
+        chapter_match = CHAPTER_NUMBER_RE.match(chapter_line)
         chapter_num = chapter_match.group(2) if chapter_match else str(self.element_counter)
         
         self.current_chapter = chapter_num
@@ -522,7 +553,7 @@ class MarkdownToHTMLConverter:
         elem_id = f"expression-{self.element_counter}"
         
         # Extraer número y contenido
-        match = re.match(r'^\*\*(\d+)\.\s+(.*?)\*\*$', line)
+        match = NUMBERED_EXPRESSION_RE.match(line)
         if match:
             expr_num = match.group(1)
             expr_text = match.group(2)
@@ -555,7 +586,7 @@ class MarkdownToHTMLConverter:
         elem_id = f"phonetic-{self.element_counter}"
         
         # Extraer contenido fonético
-        match = re.match(r'^\*\[(.*?)\]\*$', line)
+        match = PHONETIC_RE.match(line)
         phonetic_text = match.group(1) if match else line
         
         return HTMLElement(
@@ -580,7 +611,7 @@ class MarkdownToHTMLConverter:
         translation_type = "literal" if is_literal else "contextual"
         
         # Extraer texto de traducción
-        content = re.sub(r'^\*\*.*?:\*\*\s*', '', line)
+        content = TRANSLATION_LABEL_RE.sub('', line)
         
         return HTMLElement(
             id=elem_id,
@@ -601,7 +632,7 @@ class MarkdownToHTMLConverter:
         self.element_counter += 1
         elem_id = f"usage-{self.element_counter}"
         
-        content = re.sub(r'^\*\*Uso:\*\*\s*', '', line)
+        content = USAGE_LABEL_RE.sub('', line)
         
         return HTMLElement(
             id=elem_id,
@@ -618,7 +649,7 @@ class MarkdownToHTMLConverter:
         self.element_counter += 1
         elem_id = f"example-{self.element_counter}"
         
-        content = re.sub(r'^\*\*Ejemplo:\*\*\s*', '', line)
+        content = EXAMPLE_LABEL_RE.sub('', line)
         
         return HTMLElement(
             id=elem_id,
@@ -645,8 +676,11 @@ class MarkdownToHTMLConverter:
         )
         
         i = start_idx
-        while i < len(lines) and lines[i].strip().startswith('- '):
-            item_content = lines[i].strip()[2:]
+        while i < len(lines):
+            stripped = lines[i].strip()
+            if not stripped.startswith('- '):
+                break
+            item_content = stripped[2:]
             self.element_counter += 1
             
             item_elem = HTMLElement(
@@ -685,8 +719,11 @@ class MarkdownToHTMLConverter:
         # Recolectar líneas del párrafo
         para_lines = []
         i = start_idx
-        while i < len(lines) and lines[i].strip() and not self._is_block_element(lines[i]):
-            para_lines.append(lines[i].strip())
+        while i < len(lines):
+            stripped = lines[i].strip()
+            if not stripped or self._is_block_element(stripped):
+                break
+            para_lines.append(stripped)
             i += 1
         
         content = " ".join(para_lines)
@@ -707,30 +744,25 @@ class MarkdownToHTMLConverter:
     
     def _is_block_element(self, line: str) -> bool:
         """Verifica si una línea es un elemento de bloque."""
-        patterns = [
-            r'^#{1,6}\s+',  # Encabezados
-            r'^\*\*\d+\.\s+.*\*\*$',  # Expresiones numeradas
-            r'^\*\[.*\]\*$',  # Transcripciones fonéticas
-            r'^\*\*(?:Traducción|Uso|Ejemplo):',  # Elementos especiales
-            r'^[-*+]\s+',  # Listas
-            r'^(---|___|[*]{3})$',  # Separadores
-        ]
-        
-        return any(re.match(pattern, line.strip()) for pattern in patterns)
+        return BLOCK_ELEMENT_RE.match(line.strip()) is not None
     
     def _process_inline_markdown(self, text: str) -> str:
         """Procesa markdown inline (negrita, cursiva, etc.)."""
-        # Negrita
-        text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-        
-        # Cursiva (evitar conflicto con negrita)
-        text = re.sub(r'(?<!\*)\*([^*]+?)\*(?!\*)', r'<em>\1</em>', text)
+        # Cada patrón requiere un literal; si no aparece se omite el regex
+        if '*' in text:
+            # Negrita
+            text = BOLD_RE.sub(r'<strong>\1</strong>', text)
+            
+            # Cursiva (evitar conflicto con negrita)
+            text = ITALIC_RE.sub(r'<em>\1</em>', text)
         
         # Código inline
-        text = re.sub(r'`(.+?)`', r'<code>\1</code>', text)
+        if '`' in text:
+            text = INLINE_CODE_RE.sub(r'<code>\1</code>', text)
         
         # Enlaces
-        text = re.sub(r'\[(.+?)\]\((.+?)\)', r'<a href="\2">\1</a>', text)
+        if '](' in text:
+            text = LINK_RE.sub(r'<a href="\2">\1</a>', text)
         
         # Escapar HTML restante
         return text
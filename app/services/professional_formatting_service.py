@@ -15,6 +15,20 @@ from datetime import datetime
 from .book_formatting_service import FormattingPlatform, FormattingOptions, PlatformSpecifications
 from .markdown_to_html_service import MarkdownToHTMLConverter, BookStructure, HTMLElement
 
+# Mapeo de tags HTML a tipos de elemento
+SOUP_TAG_TYPES = {
+    'h1': 'book-title',
+    'h2': 'chapter-title',
+    'h3': 'section',
+    'h4': 'subsection',
+    'p': 'paragraph',
+    'div': 'div',
+    'section': 'chapter'
+}
+
+# Términos en negrita candidatos al índice
+STRONG_TERM_RE = re.compile(r'<strong>([^<]+)</strong>')
+
 
 @dataclass
 class ProfessionalFormattingOptions(FormattingOptions):
@@ -449,23 +463,14 @@ class ProfessionalFormattingService:
     
     def _soup_to_html_element(self, soup_element) -> Optional[HTMLElement]:
         """Convierte un elemento BeautifulSoup a HTMLElement."""
-        # Mapeo de tags a tipos
-        tag_type_map = {
-            'h1': 'book-title',
-            'h2': 'chapter-title',
-            'h3': 'section',
-            'h4': 'subsection',
-            'p': 'paragraph',
-            'div': 'div',
-            'section': 'chapter'
-        }
+        element_type = SOUP_TAG_TYPES.get(soup_element.name, 'div')
         
-        element_type = tag_type_map.get(soup_element.name, 'div')
-        
-        # Extraer atributos
+        # Extraer atributos (los valores de texto se reutilizan sin copiarlos)
         attributes = {}
         for attr, value in soup_element.attrs.items():
-            if isinstance(value, list):
+            if type(value) is str:
+                attributes[attr] = value
+            elif isinstance(value, list):
                 attributes[attr] = ' '.join(value)
             else:
                 attributes[attr] = str(value)
@@ -594,8 +599,8 @@ class ProfessionalFormattingService:
             
             # También indexar términos en negritas
             if element and element.type.value == 'paragraph' and '<strong>' in element.content:
-                terms = re.findall(r'<strong>([^<]+)</strong>', element.content)
-                for term in terms:
+                for match in STRONG_TERM_RE.finditer(element.content):
+                    term = match.group(1)
                     if len(term) > 3 and term not in index:
                         index[term] = []
                     if term in index:
@@ -791,11 +796,21 @@ class ProfessionalFormattingService:
                               quality_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Genera datos de vista previa para la interfaz."""
         
-        # Estadísticas del libro
+        # Estadísticas del libro en una sola pasada sobre los elementos
+        chapters = 0
+        words_estimated = 0
+        for e in book_structure.elements:
+            if not e:
+                continue
+            if e.type.value == 'chapter':
+                chapters += 1
+            if hasattr(e, 'content') and e.content:
+                words_estimated += len(e.content.split())
+        
         stats = {
             'total_elements': len(book_structure.elements),
-            'chapters': len([e for e in book_structure.elements if e and e.type.value == 'chapter']),
-            'words_estimated': sum(len(e.content.split()) for e in book_structure.elements if e and hasattr(e, 'content') and e.content),
+            'chapters': chapters,
+            'words_estimated': words_estimated,
             'index_entries': len(book_structure.index),
             'toc_entries': len(book_structure.toc)
         }
@@ -817,7 +832,7 @@ class ProfessionalFormattingService:
             'sample_elements': sample_elements,
             'platform_settings': asdict(options),
             'export_formats': self._get_available_export_formats(quality_analysis),
-            'estimated_pages': self._calculate_estimated_pages(book_structure, options)
+            'estimated_pages': self._calculate_estimated_pages(book_structure, options, words_estimated)
         }
     
     def _get_available_export_formats(self, quality_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -853,11 +868,13 @@ class ProfessionalFormattingService:
         return formats
     
     def _calculate_estimated_pages(self, book_structure: BookStructure,
-                                 options: ProfessionalFormattingOptions) -> int:
+                                 options: ProfessionalFormattingOptions,
+                                 total_words: Optional[int] = None) -> int:
         """Calcula número estimado de páginas según formato."""
         
-        # Calcular palabras totales
-        total_words = sum(len(e.content.split()) for e in book_structure.elements if e and hasattr(e, 'content') and e.content)
+        # Calcular palabras totales si no vienen precalculadas
+        if total_words is None:
+            total_words = sum(len(e.content.split()) for e in book_structure.elements if e and hasattr(e, 'content') and e.content)
         
         # Palabras por página según formato
         words_per_page = {
@@ -32,6 +32,15 @@ def get_db():
     from app import db
     return db
 
+def release_db_connection():
+    """
+    Cierra la transacción en curso para devolver la conexión al pool.
+    
+    Se llama antes de las llamadas largas a Claude: sin esto la sesión retiene
+    la conexión (abierta por la última lectura) durante todo el streaming.
+    """
+    get_db().session.commit()
+
 # Import celery app after initialization to avoid circular imports
 def get_celery_app():
     """Get celery instance after app initialization"""
@@ -102,6 +111,7 @@ def _generate_book_architecture_task_impl(self, book_id):
             emit_book_progress_update(book_id, progress_data)
         
         # Generar arquitectura usando el nuevo método
+        release_db_connection()
         result = asyncio.run(claude_service.generate_book_architecture(book_id, validated_params))
         
         # Actualizar progreso - arquitectura completada
@@ -125,7 +135,7 @@ def _generate_book_architecture_task_impl(self, book_id):
         # Actualizar estadísticas de tokens usando el método que calcula costos
         if 'usage' in result:
             usage = result['usage']
-            book.update_tokens(
+            book.add_token_usage(
                 prompt_tokens=usage.get('prompt_tokens', 0),
                 completion_tokens=usage.get('completion_tokens', 0),
                 thinking_tokens=usage.get('thinking_tokens', 0)
@@ -361,6 +371,7 @@ def _generate_book_task_impl(self, book_id):
             except json.JSONDecodeError as e:
                 raise Exception(f"Error parsing architecture JSON: {e}")
         
+        release_db_connection()
         result = asyncio.run(claude_service.generate_book_from_architecture_multichunk(
             book_id, validated_params, architecture
         ))
@@ -388,7 +399,7 @@ def _generate_book_task_impl(self, book_id):
         # Actualizar estadísticas de tokens usando el método que calcula costos
         if 'usage' in result:
             usage = result['usage']
-            book.update_tokens(
+            book.add_token_usage(
                 prompt_tokens=usage.get('prompt_tokens', 0),
                 completion_tokens=usage.get('completion_tokens', 0),
                 thinking_tokens=usage.get('thinking_tokens', 0)
@@ -449,7 +460,7 @@ def _generate_book_task_impl(self, book_id):
         
         # Actualizar libro con rutas de archivos
         if file_paths:
-            book.file_paths = file_paths
+            book.update_file_paths(file_paths, commit=False)
         
         # Completar la generación
         book.status = BookStatus.COMPLETED
@@ -832,6 +843,7 @@ def _regenerate_book_architecture_task_impl(self, book_id, feedback_what, feedba
             emit_book_progress_update(book_id, progress_data)
         
         # Regenerar arquitectura usando el nuevo método con feedback
+        release_db_connection()
         result = asyncio.run(claude_service.regenerate_book_architecture(
             book_id, validated_params, current_architecture, feedback_what, feedback_how
         ))
@@ -857,7 +869,7 @@ def _regenerate_book_architecture_task_impl(self, book_id, feedback_what, feedba
         # Actualizar estadísticas de tokens usando el método que calcula costos
         if 'usage' in result:
             usage = result['usage']
-            book.update_tokens(
+            book.add_token_usage(
                 prompt_tokens=usage.get('prompt_tokens', 0),
                 completion_tokens=usage.get('completion_tokens', 0),
                 thinking_tokens=usage.get('thinking_tokens', 0)
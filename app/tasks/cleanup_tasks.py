@@ -5,6 +5,8 @@ import logging
 import os
 import shutil
 from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 from app import celery, db
 from app.models.system_log import SystemLog
 from app.models.book_generation import BookGeneration, BookStatus
@@ -13,6 +15,25 @@ from app.utils.logging import log_system_event
 
 logger = logging.getLogger(__name__)
 
+# Registros procesados por lote en las limpiezas que requieren lógica por fila
+CLEANUP_BATCH_SIZE = 500
+
+
+def iter_in_batches(query, model, batch_size=CLEANUP_BATCH_SIZE):
+    """
+    Recorre una consulta en lotes ordenados por id (paginación por clave).
+    
+    Mantiene acotada la memoria y permite confirmar la sesión entre lotes
+    sin depender de un cursor abierto.
+    """
+    last_id = 0
+    while True:
+        batch = query.filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield batch
+
 
 @celery.task
 def cleanup_old_logs():
@@ -60,37 +81,42 @@ def cleanup_old_files():
         cutoff_date = datetime.utcnow() - timedelta(days=7)
         
         # Buscar generaciones de libros antiguas completadas
-        old_books = BookGeneration.query.filter(
+        old_books = BookGeneration.query.options(selectinload(BookGeneration.files)).filter(
             BookGeneration.created_at < cutoff_date,
             BookGeneration.status == BookStatus.COMPLETED,
-            BookGeneration.file_paths.isnot(None)
-        ).all()
+            or_(BookGeneration.files.any(), BookGeneration.file_paths.isnot(None))
+        )
         
         deleted_files = 0
         freed_space = 0
-        
-        for book in old_books:
-            if book.file_paths:
-                for format_type, file_path in book.file_paths.items():
-                    if file_path and os.path.exists(file_path):
-                        try:
-                            # Obtener tamaño del archivo antes de eliminarlo
-                            file_size = os.path.getsize(file_path)
-                            
-                            # Eliminar archivo
-                            os.remove(file_path)
-                            deleted_files += 1
-                            freed_space += file_size
-                            
-                            logger.debug(f"Archivo eliminado: {file_path}")
-                            
-                        except Exception as file_exc:
-                            logger.warning(f"No se pudo eliminar archivo {file_path}: {str(file_exc)}")
-                
-                # Limpiar rutas de archivos en la base de datos
-                book.file_paths = None
-        
-        db.session.commit()
+        books_processed = 0
+        
+        for batch in iter_in_batches(old_books, BookGeneration):
+            for book in batch:
+                file_path_map = book.file_path_map
+                if file_path_map:
+                    for format_type, file_path in file_path_map.items():
+                        if file_path and os.path.exists(file_path):
+                            try:
+                                # Obtener tamaño del archivo antes de eliminarlo
+                                file_size = os.path.getsize(file_path)
+                                
+                                # Eliminar archivo
+                                os.remove(file_path)
+                                deleted_files += 1
+                                freed_space += file_size
+                                
+                                logger.debug(f"Archivo eliminado: {file_path}")
+                                
+                            except Exception as file_exc:
+                                logger.warning(f"No se pudo eliminar archivo {file_path}: {str(file_exc)}")
+                    
+                    # Limpiar rutas de archivos en la base de datos
+                    book.files = []
+                    book.file_paths = None
+            
+            books_processed += len(batch)
+            db.session.commit()
         
         # Convertir bytes a MB
         freed_space_mb = freed_space / (1024 * 1024)
@@ -102,7 +128,7 @@ def cleanup_old_files():
                 "cutoff_date": cutoff_date.isoformat(),
                 "deleted_files": deleted_files,
                 "freed_space_mb": round(freed_space_mb, 2),
-                "books_processed": len(old_books)
+                "books_processed": books_processed
             }
         )
         
@@ -111,7 +137,7 @@ def cleanup_old_files():
             'status': 'completed',
             'deleted_files': deleted_files,
             'freed_space_mb': round(freed_space_mb, 2),
-            'books_processed': len(old_books)
+            'books_processed': books_processed
         }
         
     except Exception as exc:
@@ -128,27 +154,27 @@ def cleanup_failed_generations():
         cutoff_date = datetime.utcnow() - timedelta(hours=24)
         
         # Buscar generaciones fallidas antiguas
-        failed_books = BookGeneration.query.filter(
+        failed_books = BookGeneration.query.options(selectinload(BookGeneration.files)).filter(
             BookGeneration.created_at < cutoff_date,
             BookGeneration.status == BookStatus.FAILED
-        ).all()
+        )
         
         deleted_count = 0
-        for book in failed_books:
-            # Limpiar archivos parciales si existen
-            if book.file_paths:
-                for format_type, file_path in book.file_paths.items():
+        for batch in iter_in_batches(failed_books, BookGeneration):
+            for book in batch:
+                # Limpiar archivos parciales si existen
+                for format_type, file_path in book.file_path_map.items():
                     if file_path and os.path.exists(file_path):
                         try:
                             os.remove(file_path)
                         except Exception:
                             pass
+                
+                # Eliminar registro de la base de datos
+                db.session.delete(book)
+                deleted_count += 1
             
-            # Eliminar registro de la base de datos
-            db.session.delete(book)
-            deleted_count += 1
-        
-        db.session.commit()
+            db.session.commit()
         
         # Log del evento
         log_system_event(
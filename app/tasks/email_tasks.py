@@ -43,11 +43,7 @@ def send_template_email(self, template_name, recipient_email, context=None, lang
     """
     try:
         # Obtener el template
-        template = EmailTemplate.query.filter_by(
-            name=template_name,
-            language=language,
-            is_active=True
-        ).first()
+        template = EmailTemplate.get_by_name(template_name, language)
         
         if not template:
             logger.error(f"Template '{template_name}' no encontrado para idioma '{language}'")
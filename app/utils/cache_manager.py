@@ -139,6 +139,7 @@ class CacheStrategies:
         'user_session': 3600,        # 1 hora
         'user_profile': 1800,        # 30 minutos
         'book_metadata': 7200,       # 2 horas
+        'book_progress': 2,          # 2 segundos (estado consultado por polling)
         'subscription_info': 3600,   # 1 hora
         'api_response': 300,         # 5 minutos
         'database_query': 600,       # 10 minutos
@@ -171,12 +171,12 @@ def generate_epub(book) -> Optional[str]:
             content_parts = book.content.split('## ')
             
             for i, part in enumerate(content_parts):
-                if not part.strip():
+                part = part.strip()
+                if not part:
                     continue
                 
-                lines = part.strip().split('\n')
-                chapter_title = lines[0] if lines else f'Capítulo {i}'
-                chapter_content = '\n'.join(lines[1:]) if len(lines) > 1 else ''
+                # Separar título y cuerpo sin partir el capítulo en líneas
+                chapter_title, _, chapter_content = part.partition('\n')
                 
                 # Create chapter
                 chapter = epub.EpubHtml(
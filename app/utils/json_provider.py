@@ -0,0 +1,50 @@
+"""
+Proveedor JSON de Flask basado en orjson.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Separadores compactos que Flask pide en producción; orjson ya no emite espacios
+COMPACT_SEPARATORS = (',', ':')
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Serializa y parsea JSON con orjson manteniendo el formato de Flask.
+
+    Las fechas y los tipos que orjson no conoce (``Decimal``, ``__html__``...)
+    pasan por el mismo ``default`` que el proveedor estándar, así que la salida
+    de ``jsonify`` no cambia. Las llamadas con opciones propias del módulo
+    ``json`` (``cls``, otros separadores...) se delegan al proveedor estándar.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        indent = kwargs.pop('indent', None)
+        separators = kwargs.pop('separators', None)
+        if kwargs or indent not in (None, 2) or (
+                indent is None and separators not in (None, COMPACT_SEPARATORS)):
+            return super().dumps(obj, indent=indent, separators=separators, **kwargs)
+
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def dumps_json_column(value) -> str:
+    """Serializador de las columnas JSON de SQLAlchemy (``json_serializer`` del engine)"""
+    # Las claves no str se convierten a texto, como hace el módulo json
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
@@ -5,7 +5,6 @@ import logging
 import traceback
 from datetime import datetime
 from flask import request, g
-from app import db
 from app.models.system_log import SystemLog, LogLevel, LogStatus
 
 logger = logging.getLogger(__name__)
@@ -43,8 +42,8 @@ def log_system_event(action, details=None, level="INFO", status="SUCCESS",
         if not user_id and hasattr(g, 'current_user') and g.current_user:
             user_id = g.current_user.id
         
-        # Crear registro de log
-        log_entry = SystemLog(
+        # Encolar el registro: se inserta por lotes sin bloquear ni confirmar la sesión del llamador
+        SystemLog.log_action(
             user_id=user_id,
             action=action,
             details=details,
@@ -57,9 +56,6 @@ def log_system_event(action, details=None, level="INFO", status="SUCCESS",
             execution_time=execution_time
         )
         
-        db.session.add(log_entry)
-        db.session.commit()
-        
         # También loggear en el sistema de archivos
         log_level = getattr(logging, level.upper(), logging.INFO)
         logger.log(log_level, f"[{action}] {details or ''}")
@@ -28,6 +28,9 @@ class BaseConfig:
         "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "30")),  # 30 conexiones adicionales
         "pool_reset_on_return": "commit",  # Reset automático
         "echo": False,  # Disable SQL logging for performance
+        # executemany de psycopg2: INSERT multi-VALUES y UPDATE/DELETE con execute_batch
+        "executemany_mode": "values_plus_batch",
+        "insertmanyvalues_page_size": 1000,
         "connect_args": {
             "connect_timeout": 10,
             "application_name": "buko_ai"
@@ -36,6 +39,7 @@ class BaseConfig:
     
     # Redis
     REDIS_URL = os.environ.get("REDIS_URL") or "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", 50))
     
     # Celery - Optimizado para 10,000 usuarios con libros de alta calidad
     CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL") or "redis://localhost:6379/0"
@@ -58,6 +62,14 @@ class BaseConfig:
     CELERY_WORKER_MAX_MEMORY_PER_CHILD = int(os.environ.get("CELERY_WORKER_MAX_MEMORY_PER_CHILD", 1000000))  # 1GB limite
     CELERY_WORKER_DISABLE_RATE_LIMITS = bool(os.environ.get("CELERY_WORKER_DISABLE_RATE_LIMITS", "True"))
     
+    # Pool de base de datos en los procesos de Celery: cada hijo prefork ejecuta una
+    # tarea a la vez, así que bastan pocas conexiones por proceso
+    CELERY_SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("CELERY_DB_POOL_SIZE", "2")),
+        "max_overflow": int(os.environ.get("CELERY_DB_MAX_OVERFLOW", "2")),
+        "pool_timeout": 5,
+    }
+    
     # Task routing con prioridades para 10K usuarios
     CELERY_TASK_ROUTES = {
         'app.tasks.book_generation.generate_book_architecture_task': {
@@ -240,6 +252,7 @@ class BaseConfig:
     CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/2")
     CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", 900))  # 15 minutos cache
     CACHE_KEY_PREFIX = os.environ.get("CACHE_KEY_PREFIX", "buko_ai_")
+    ENABLE_CACHE_WARMUP = False  # Solo los workers web pre-calientan el cache
     
     # Redis configuration para alta concurrencia
     CACHE_REDIS_CONNECTION_POOL_KWARGS = {
@@ -26,6 +26,9 @@ class DevelopmentConfig(BaseConfig):
         "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "15")),  # 15 adicionales en dev
         "pool_reset_on_return": "commit",
         "echo": False,
+        # executemany de psycopg2: INSERT multi-VALUES y UPDATE/DELETE con execute_batch
+        "executemany_mode": "values_plus_batch",
+        "insertmanyvalues_page_size": 1000,
         "connect_args": {
             "connect_timeout": 10,
             "application_name": "buko_ai_dev"
@@ -22,6 +22,9 @@ class ProductionConfig(BaseConfig):
         "pool_recycle": 3600,
         "pool_timeout": 30,
         "max_overflow": 40,
+        # executemany de psycopg2: INSERT multi-VALUES y UPDATE/DELETE con execute_batch
+        "executemany_mode": "values_plus_batch",
+        "insertmanyvalues_page_size": 1000,
     }
     
     # Debug toolbar deshabilitado
@@ -37,6 +40,7 @@ class ProductionConfig(BaseConfig):
     # Cache optimizado
     CACHE_TYPE = "redis"
     CACHE_DEFAULT_TIMEOUT = 3600
+    ENABLE_CACHE_WARMUP = True
     
     # WebSocket optimizado
     SOCKETIO_LOGGER = False
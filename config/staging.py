@@ -30,6 +30,7 @@ class StagingConfig(BaseConfig):
     # Cache habilitado
     CACHE_TYPE = "redis"
     CACHE_DEFAULT_TIMEOUT = 300
+    ENABLE_CACHE_WARMUP = True
     
     # WebSocket sin logging detallado
     SOCKETIO_LOGGER = False
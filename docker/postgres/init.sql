@@ -157,6 +157,17 @@ CREATE TABLE IF NOT EXISTS system_logs (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create book files table
+CREATE TABLE IF NOT EXISTS book_files (
+    id SERIAL PRIMARY KEY,
+    uuid UUID DEFAULT uuid_generate_v4() UNIQUE NOT NULL,
+    book_id INTEGER NOT NULL REFERENCES book_generations(id) ON DELETE CASCADE,
+    format VARCHAR(10) NOT NULL,
+    path VARCHAR(500) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create book downloads table
 CREATE TABLE IF NOT EXISTS book_downloads (
     id SERIAL PRIMARY KEY,
@@ -207,26 +218,38 @@ CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_subscription_type ON users(subscription_type);
 CREATE INDEX IF NOT EXISTS idx_users_status ON users(status);
 CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
+CREATE INDEX IF NOT EXISTS idx_users_status_subscription_type ON users(status, subscription_type);
 
 CREATE INDEX IF NOT EXISTS idx_book_generations_user_id ON book_generations(user_id);
 CREATE INDEX IF NOT EXISTS idx_book_generations_status ON book_generations(status);
 CREATE INDEX IF NOT EXISTS idx_book_generations_created_at ON book_generations(created_at);
 CREATE INDEX IF NOT EXISTS idx_book_generations_queue_position ON book_generations(queue_position);
+CREATE INDEX IF NOT EXISTS idx_book_generations_status_created_at ON book_generations(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_book_generations_queue ON book_generations(status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_book_generations_user_id_created_at ON book_generations(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_book_generations_status_started_at_completed_at ON book_generations(status, started_at, completed_at);
 
 CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON subscriptions(user_id);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_status ON subscriptions(status);
 CREATE INDEX IF NOT EXISTS idx_subscriptions_current_period_end ON subscriptions(current_period_end);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_status_current_period_end ON subscriptions(status, current_period_end);
 
-CREATE INDEX IF NOT EXISTS idx_payments_user_id ON payments(user_id);
-CREATE INDEX IF NOT EXISTS idx_payments_status ON payments(status);
+CREATE INDEX IF NOT EXISTS idx_payments_user_id_created_at ON payments(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_payments_status_created_at ON payments(status, created_at);
 CREATE INDEX IF NOT EXISTS idx_payments_created_at ON payments(created_at);
 
-CREATE INDEX IF NOT EXISTS idx_system_logs_user_id ON system_logs(user_id);
-CREATE INDEX IF NOT EXISTS idx_system_logs_action ON system_logs(action);
 CREATE INDEX IF NOT EXISTS idx_system_logs_created_at ON system_logs(created_at);
+CREATE INDEX IF NOT EXISTS idx_system_logs_user_id_created_at ON system_logs(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_system_logs_action_created_at ON system_logs(action, created_at);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_book_files_book_id_format ON book_files(book_id, format);
+
+CREATE INDEX IF NOT EXISTS idx_book_downloads_user_id_created_at ON book_downloads(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_book_downloads_book_id_created_at ON book_downloads(book_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_book_downloads_format_download_count ON book_downloads(format, download_count);
 
-CREATE INDEX IF NOT EXISTS idx_book_downloads_user_id ON book_downloads(user_id);
-CREATE INDEX IF NOT EXISTS idx_book_downloads_book_id ON book_downloads(book_id);
+CREATE INDEX IF NOT EXISTS idx_referrals_referrer_id ON referrals(referrer_id);
+CREATE INDEX IF NOT EXISTS idx_referrals_referral_code ON referrals(referral_code);
 
 -- Create full-text search indexes
 CREATE INDEX IF NOT EXISTS idx_book_generations_title_fts ON book_generations USING gin(to_tsvector('spanish', title));
@@ -0,0 +1,56 @@
+"""uuid server default for BaseModel tables
+
+Las bases creadas con db.create_all() antes de que BaseModel.uuid usara
+server_default tienen la columna NOT NULL sin valor por defecto.
+
+Revision ID: 3f2a9c1d7b40
+Revises: 
+Create Date: 2026-10-16 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Tablas de los modelos que heredan de BaseModel
+BASE_MODEL_TABLES = (
+    'users',
+    'book_generations',
+    'book_files',
+    'subscriptions',
+    'payments',
+    'system_logs',
+    'book_downloads',
+    'referrals',
+    'email_templates',
+)
+
+
+def _existing_tables():
+    """Tablas ya creadas; en una base vacía init_db las crea después con create_all"""
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    # gen_random_uuid() es nativa desde PostgreSQL 13; pgcrypto la aporta en versiones anteriores
+    server_version = op.get_bind().execute(sa.text('SHOW server_version_num')).scalar()
+    if int(server_version) < 130000:
+        op.execute('CREATE EXTENSION IF NOT EXISTS pgcrypto')
+    
+    existing_tables = _existing_tables()
+    for table in BASE_MODEL_TABLES:
+        if table in existing_tables:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN uuid SET DEFAULT gen_random_uuid()')
+
+
+def downgrade():
+    existing_tables = _existing_tables()
+    for table in BASE_MODEL_TABLES:
+        if table in existing_tables:
+            op.execute(f'ALTER TABLE {table} ALTER COLUMN uuid DROP DEFAULT')
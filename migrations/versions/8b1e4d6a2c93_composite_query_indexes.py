@@ -0,0 +1,114 @@
+"""composite indexes for listing, statistics and cleanup queries
+
+Los modelos declaran índices compuestos (columna de filtro + columna de orden)
+que db.create_all() no añade a tablas ya existentes. Se crean con CONCURRENTLY
+para no bloquear escrituras y se eliminan los índices simples de init.sql a los
+que sustituyen.
+
+Revision ID: 8b1e4d6a2c93
+Revises: 3f2a9c1d7b40
+Create Date: 2026-10-16 22:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4d6a2c93'
+down_revision = '3f2a9c1d7b40'
+branch_labels = None
+depends_on = None
+
+# (nombre, tabla, columnas, único) tal como se declaran en los modelos
+NEW_INDEXES = (
+    ('idx_users_subscription_type', 'users', ('subscription_type',), False),
+    ('idx_users_last_reset_date', 'users', ('last_reset_date',), False),
+    ('idx_users_status_subscription_type', 'users', ('status', 'subscription_type'), False),
+    ('idx_book_generations_status_created_at', 'book_generations', ('status', 'created_at'), False),
+    ('idx_book_generations_queue', 'book_generations', ('status', 'priority DESC', 'created_at'), False),
+    ('idx_book_generations_user_id_created_at', 'book_generations', ('user_id', 'created_at DESC'), False),
+    ('idx_book_generations_status_started_at_completed_at', 'book_generations',
+     ('status', 'started_at', 'completed_at'), False),
+    ('idx_book_files_book_id_format', 'book_files', ('book_id', 'format'), True),
+    ('idx_subscriptions_status_current_period_end', 'subscriptions', ('status', 'current_period_end'), False),
+    ('idx_payments_status_created_at', 'payments', ('status', 'created_at'), False),
+    ('idx_payments_user_id_created_at', 'payments', ('user_id', 'created_at'), False),
+    ('idx_system_logs_created_at', 'system_logs', ('created_at',), False),
+    ('idx_system_logs_level_created_at', 'system_logs', ('level', 'created_at'), False),
+    ('idx_system_logs_user_id_created_at', 'system_logs', ('user_id', 'created_at'), False),
+    ('idx_system_logs_action_created_at', 'system_logs', ('action', 'created_at'), False),
+    ('idx_book_downloads_user_id_created_at', 'book_downloads', ('user_id', 'created_at'), False),
+    ('idx_book_downloads_book_id_created_at', 'book_downloads', ('book_id', 'created_at'), False),
+    ('idx_book_downloads_format_download_count', 'book_downloads', ('format', 'download_count'), False),
+    ('idx_referrals_referrer_id', 'referrals', ('referrer_id',), False),
+    ('idx_referrals_referral_code', 'referrals', ('referral_code',), False),
+)
+
+# Índices de NEW_INDEXES que init.sql ya creaba: el downgrade los conserva
+INIT_SQL_INDEXES = ('idx_users_subscription_type', 'idx_system_logs_created_at')
+
+# Índices de init.sql cubiertos por el prefijo de un índice compuesto nuevo
+REPLACED_INDEXES = (
+    ('idx_payments_user_id', 'payments', ('user_id',)),
+    ('idx_payments_status', 'payments', ('status',)),
+    ('idx_system_logs_user_id', 'system_logs', ('user_id',)),
+    ('idx_system_logs_action', 'system_logs', ('action',)),
+    ('idx_book_downloads_user_id', 'book_downloads', ('user_id',)),
+    ('idx_book_downloads_book_id', 'book_downloads', ('book_id',)),
+)
+
+
+def _table_columns():
+    """Columnas de cada tabla existente; en una base vacía init_db crea las tablas con sus índices"""
+    inspector = sa.inspect(op.get_bind())
+    return {
+        table: {column['name'] for column in inspector.get_columns(table)}
+        for table in inspector.get_table_names()
+    }
+
+
+def _can_index(table_columns, table, columns):
+    """La tabla existe y tiene todas las columnas (init.sql no crea, por ejemplo, system_logs.level)"""
+    return table in table_columns and all(column.split()[0] in table_columns[table] for column in columns)
+
+
+def _invalid_indexes():
+    """Índices que dejó a medias un CREATE INDEX CONCURRENTLY fallido (IF NOT EXISTS no los rehace)"""
+    rows = op.get_bind().execute(sa.text(
+        'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE NOT i.indisvalid'
+    ))
+    return {name for name, in rows}
+
+
+def upgrade():
+    table_columns = _table_columns()
+    invalid_indexes = _invalid_indexes()
+    
+    # CONCURRENTLY no puede ejecutarse dentro de una transacción
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in NEW_INDEXES:
+            if not _can_index(table_columns, table, columns):
+                continue
+            if name in invalid_indexes:
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            op.execute(
+                f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                f'ON {table} ({", ".join(columns)})'
+            )
+        
+        for name, table, columns in REPLACED_INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+
+
+def downgrade():
+    table_columns = _table_columns()
+    
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED_INDEXES:
+            if _can_index(table_columns, table, columns):
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+        
+        for name, table, columns, unique in NEW_INDEXES:
+            if name not in INIT_SQL_INDEXES:
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from main import create_app
 from app.models import (
-    db, User, UserStatus, SubscriptionType, BookGeneration, BookStatus,
+    db, User, UserStatus, SubscriptionType, BookGeneration, BookFile, BookStatus,
     Subscription, Payment, PaymentStatus, PaymentMethod, SystemLog,
     BookDownload, EmailTemplate, Referral, LogLevel, BookFormat
 )
@@ -43,12 +43,17 @@ def create_sample_users(count: int = 10) -> List[User]:
     countries = ["España", "México", "Argentina", "Colombia", "Chile", "Perú", "Venezuela"]
     cities = ["Madrid", "Barcelona", "Ciudad de México", "Buenos Aires", "Bogotá", "Santiago", "Lima"]
     
-    for i in range(min(count, len(sample_data))):
-        user_data = sample_data[i]
-        
-        # Verificar si el usuario ya existe
-        existing_user = User.find_by_email(user_data["email"])
-        if existing_user:
+    sample_data = sample_data[:count]
+    
+    # Verificar de una vez qué usuarios ya existen
+    existing_emails = {
+        email for (email,) in db.session.query(User.email).filter(
+            User.email.in_([user_data["email"] for user_data in sample_data])
+        )
+    }
+    
+    for i, user_data in enumerate(sample_data):
+        if user_data["email"] in existing_emails:
             continue
         
         user = User(
@@ -72,10 +77,11 @@ def create_sample_users(count: int = 10) -> List[User]:
             user.subscription_start = datetime.utcnow() - timedelta(days=random.randint(1, 365))
             user.subscription_end = user.subscription_start + timedelta(days=30)
         
-        user.save()
+        user.save(commit=False)
         users.append(user)
         print(f"Created user: {user.email}")
     
+    db.session.commit()
     return users
 
 
@@ -191,16 +197,16 @@ def create_sample_books(users: List[User], count: int = 20) -> List[BookGenerati
         
         # Configurar rutas de archivos para libros completados
         if book.status == BookStatus.COMPLETED:
-            book.file_paths = {
-                "pdf": f"/storage/books/{book.uuid}.pdf",
-                "epub": f"/storage/books/{book.uuid}.epub",
-                "docx": f"/storage/books/{book.uuid}.docx",
-            }
+            book.files = [
+                BookFile(format=format_type, path=f"/storage/books/{book.uuid}.{format_type}")
+                for format_type in ("pdf", "epub", "docx")
+            ]
         
-        book.save()
+        book.save(commit=False)
         books.append(book)
         print(f"Created book: {book.title} for {user.email}")
     
+    db.session.commit()
     return books
 
 
@@ -218,7 +224,7 @@ def create_sample_subscriptions_and_payments(users: List[User]) -> None:
                 current_period_start=user.subscription_start,
                 current_period_end=user.subscription_end,
             )
-            subscription.save()
+            subscription.save(commit=False)
             
             # Crear pago
             plan_details = user.subscription_plan
@@ -234,9 +240,11 @@ def create_sample_subscriptions_and_payments(users: List[User]) -> None:
                 description=f"Suscripción {subscription.plan_type.value}",
                 processed_at=subscription.current_period_start,
             )
-            payment.save()
+            payment.save(commit=False)
             
             print(f"Created subscription and payment for {user.email}")
+    
+    db.session.commit()
 
 
 def create_sample_downloads(books: List[BookGeneration]) -> None:
@@ -258,7 +266,9 @@ def create_sample_downloads(books: List[BookGeneration]) -> None:
                 download_count=random.randint(1, 10),
                 last_downloaded_at=datetime.utcnow() - timedelta(days=random.randint(1, 30)),
             )
-            download.save()
+            download.save(commit=False)
+    
+    db.session.commit()
 
 
 def create_sample_logs(users: List[User]) -> None:
@@ -286,7 +296,9 @@ def create_sample_logs(users: List[User]) -> None:
             execution_time=random.randint(50, 2000),
             created_at=datetime.utcnow() - timedelta(days=random.randint(1, 30)),
         )
-        log.save()
+        log.save(commit=False)
+    
+    db.session.commit()
 
 
 def create_sample_referrals(users: List[User]) -> None:
@@ -305,9 +317,11 @@ def create_sample_referrals(users: List[User]) -> None:
                 commission_paid=round(random.uniform(0, 25), 2),
                 status="active",
             )
-            referral.save()
+            referral.save(commit=False)
             
             print(f"Created referral: {referrer.email} -> {referred.email}")
+    
+    db.session.commit()
 
 
 def main():
@@ -11,6 +11,8 @@ from datetime import datetime, timezone
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import func
+
 from app import create_app, db
 from app.models.book_generation import BookGeneration
 
@@ -25,27 +27,37 @@ def monitor_book(book_id):
             print(f"❌ Libro con ID {book_id} no encontrado")
             return
         
+        # Longitud y muestra calculadas en la base de datos para no cargar el contenido completo
+        content_length, content_sample = db.session.query(
+            func.length(BookGeneration.content),
+            func.substr(BookGeneration.content, 1, 100)
+        ).filter(BookGeneration.id == book_id).one()
+        
         now = datetime.now(timezone.utc)
         elapsed = (now - book.started_at).total_seconds() if book.started_at else 0
         
-        print(f"📚 Libro: {book.title}")
-        print(f"📊 Estado: {book.status}")
-        print(f"⏰ Tiempo transcurrido: {int(elapsed//60)}m {int(elapsed%60)}s")
-        print(f"📄 Contenido generado: {'Sí' if book.content else 'No'}")
-        print(f"🔄 Tokens procesados: {book.total_tokens or 0}")
-        print(f"💰 Costo estimado: ${book.estimated_cost or 0}")
-        print(f"❌ Error: {book.error_message or 'Ninguno'}")
-        print(f"📖 Páginas finales: {book.final_pages or 'N/A'}")
-        print(f"📝 Palabras finales: {book.final_words or 'N/A'}")
-        print(f"📅 Iniciado: {book.started_at.strftime('%H:%M:%S') if book.started_at else 'N/A'}")
-        print(f"✅ Completado: {book.completed_at.strftime('%H:%M:%S') if book.completed_at else 'N/A'}")
+        # Construir el reporte completo y emitirlo en una sola escritura
+        out = [
+            f"📚 Libro: {book.title}",
+            f"📊 Estado: {book.status}",
+            f"⏰ Tiempo transcurrido: {int(elapsed//60)}m {int(elapsed%60)}s",
+            f"📄 Contenido generado: {'Sí' if content_length else 'No'}",
+            f"🔄 Tokens procesados: {book.total_tokens or 0}",
+            f"💰 Costo estimado: ${book.estimated_cost or 0}",
+            f"❌ Error: {book.error_message or 'Ninguno'}",
+            f"📖 Páginas finales: {book.final_pages or 'N/A'}",
+            f"📝 Palabras finales: {book.final_words or 'N/A'}",
+            f"📅 Iniciado: {book.started_at.strftime('%H:%M:%S') if book.started_at else 'N/A'}",
+            f"✅ Completado: {book.completed_at.strftime('%H:%M:%S') if book.completed_at else 'N/A'}",
+        ]
         
         # Mostrar contenido si está disponible
-        if book.content:
-            content_length = len(book.content)
-            print(f"📄 Longitud del contenido: {content_length} caracteres")
+        if content_length:
+            out.append(f"📄 Longitud del contenido: {content_length} caracteres")
             if content_length > 100:
-                print(f"📝 Inicio del contenido: {book.content[:100]}...")
+                out.append(f"📝 Inicio del contenido: {content_sample}...")
+        
+        sys.stdout.write("\n".join(out) + "\n")
         
         return book.status
 
@@ -10,6 +10,7 @@ import json
 import psutil
 import redis
 import httpx
+from collections import Counter
 from datetime import datetime
 from typing import Dict, List, Any
 from pathlib import Path
@@ -19,6 +20,23 @@ import os
 # Agregar path de la aplicación
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+# Verificaciones en orden de ejecución
+VERIFICATIONS = (
+    'verify_docker_environment',
+    'verify_database_config',
+    'verify_redis_config',
+    'verify_celery_config',
+    'verify_claude_service_config',
+    'verify_websocket_config',
+    'verify_system_resources',
+    'verify_monitoring_system',
+)
+
+# Etiquetas de reporte precalculadas para cada verificación
+VERIFICATION_LABELS = {
+    name: name.replace('verify_', '').replace('_', ' ').title() for name in VERIFICATIONS
+}
+
 class SystemVerification:
     """Verificador del sistema para 10K usuarios."""
     
@@ -328,66 +346,62 @@ class SystemVerification:
         print("🚀 Iniciando verificación del sistema para 10,000 usuarios...")
         print("=" * 60)
         
-        verifications = [
-            self.verify_docker_environment,
-            self.verify_database_config,
-            self.verify_redis_config,
-            self.verify_celery_config,
-            self.verify_claude_service_config,
-            self.verify_websocket_config,
-            self.verify_system_resources,
-            self.verify_monitoring_system
-        ]
-        
-        for verification in verifications:
+        for name in VERIFICATIONS:
             try:
-                await verification()
+                await getattr(self, name)()
             except Exception as e:
-                test_name = verification.__name__.replace('verify_', '').replace('_', ' ').title()
-                self.log_error(test_name, f"Verification failed: {str(e)}")
+                self.log_error(VERIFICATION_LABELS[name], f"Verification failed: {str(e)}")
         
         # Resumen final
         self.print_summary()
     
     def print_summary(self):
         """Imprime resumen de verificaciones."""
+        status_counts = Counter(r['status'] for r in self.results)
         total_tests = len(self.results)
-        passed = len([r for r in self.results if r['status'] == 'PASS'])
-        warnings = len([r for r in self.results if r['status'] == 'WARN'])
-        failed = len([r for r in self.results if r['status'] == 'FAIL'])
+        passed = status_counts['PASS']
+        warnings = status_counts['WARN']
+        failed = status_counts['FAIL']
         
         duration = time.time() - self.start_time
         
-        print("\n" + "=" * 60)
-        print("📊 RESUMEN DE VERIFICACIÓN")
-        print("=" * 60)
-        print(f"⏱️  Duración: {duration:.2f} segundos")
-        print(f"📈 Total de tests: {total_tests}")
-        print(f"✅ Exitosos: {passed}")
-        print(f"⚠️  Advertencias: {warnings}")
-        print(f"❌ Fallados: {failed}")
-        
         if failed == 0 and warnings == 0:
-            print("\n🎉 ¡Sistema completamente optimizado para 10,000 usuarios!")
+            verdict = "🎉 ¡Sistema completamente optimizado para 10,000 usuarios!"
         elif failed == 0:
-            print("\n👍 Sistema funcionando bien, revisar advertencias para optimización.")
+            verdict = "👍 Sistema funcionando bien, revisar advertencias para optimización."
         else:
-            print("\n🔧 Sistema necesita correcciones antes de manejar 10,000 usuarios.")
+            verdict = "🔧 Sistema necesita correcciones antes de manejar 10,000 usuarios."
+        
+        # Construir el resumen completo y emitirlo de una vez
+        print("\n".join((
+            "\n" + "=" * 60,
+            "📊 RESUMEN DE VERIFICACIÓN",
+            "=" * 60,
+            f"⏱️  Duración: {duration:.2f} segundos",
+            f"📈 Total de tests: {total_tests}",
+            f"✅ Exitosos: {passed}",
+            f"⚠️  Advertencias: {warnings}",
+            f"❌ Fallados: {failed}",
+            "\n" + verdict,
+        )))
         
         # Guardar resultados
-        self.save_results()
+        self.save_results(status_counts)
     
-    def save_results(self):
+    def save_results(self, status_counts: Counter = None):
         """Guarda resultados en archivo JSON."""
         results_file = Path(__file__).parent.parent / 'verification_results.json'
         
+        if status_counts is None:
+            status_counts = Counter(r['status'] for r in self.results)
+        
         summary = {
             'timestamp': datetime.now().isoformat(),
             'duration_seconds': time.time() - self.start_time,
             'total_tests': len(self.results),
-            'passed': len([r for r in self.results if r['status'] == 'PASS']),
-            'warnings': len([r for r in self.results if r['status'] == 'WARN']),
-            'failed': len([r for r in self.results if r['status'] == 'FAIL']),
+            'passed': status_counts['PASS'],
+            'warnings': status_counts['WARN'],
+            'failed': status_counts['FAIL'],
             'results': self.results,
             'errors': self.errors
         }
@@ -0,0 +1,70 @@
+"""
+Fixtures compartidas de los tests de Buko AI.
+
+Los modelos usan tipos de PostgreSQL (INET, UUID, gen_random_uuid), así que los
+tests que tocan la base de datos necesitan ``TEST_DATABASE_URL`` apuntando a una
+base PostgreSQL de pruebas; sin ella se omiten.
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from app.models import db
+from config.testing import TestingConfig
+
+
+def _uses_postgresql(url: str) -> bool:
+    return url.startswith("postgresql")
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Aplicación mínima con la configuración de testing y solo la extensión de base de datos"""
+    app = Flask("buko_ai_tests")
+    app.config.from_object(TestingConfig)
+    if not _uses_postgresql(app.config["SQLALCHEMY_DATABASE_URI"]):
+        # Las opciones del pool son de PostgreSQL; sin base de pruebas solo corren los tests sin BD
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {}
+    db.init_app(app)
+    return app
+
+
+@pytest.fixture(scope="session")
+def _database(app):
+    """Crea el esquema una vez por sesión y lo elimina al terminar"""
+    if not _uses_postgresql(app.config["SQLALCHEMY_DATABASE_URI"]):
+        pytest.skip("TEST_DATABASE_URL debe apuntar a una base PostgreSQL de pruebas")
+    
+    with app.app_context():
+        db.create_all()
+        yield db
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def session(app, _database):
+    """Sesión de base de datos; las tablas se vacían al terminar cada test"""
+    yield db.session
+    
+    db.session.rollback()
+    tables = ", ".join(table.name for table in db.metadata.sorted_tables)
+    db.session.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    db.session.commit()
+
+
+@pytest.fixture
+def user(session):
+    """Usuario activo de pruebas"""
+    from app.models.user import User
+    
+    user = User(
+        email="lector@example.com",
+        password="Secreta123",
+        first_name="Ana",
+        last_name="Lectora",
+    )
+    session.add(user)
+    session.commit()
+    return user
@@ -0,0 +1,220 @@
+"""
+Tests de los formularios y validadores de autenticación
+"""
+
+import re
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from app.forms.auth import (
+    ChangePasswordForm, DeleteAccountForm, LoginForm, PasswordResetRequestForm,
+    ProfileForm, RegisterForm, TIMEZONE_KEYS
+)
+
+# Los formularios necesitan el contexto de petición que pytest-flask abre con ``app``
+pytestmark = pytest.mark.usefixtures('app')
+
+# Patrones originales a los que equivalen los validadores de una sola pasada
+PASSWORD_PATTERN = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$', re.ASCII)
+PHONE_PATTERN = re.compile(r'^[0-9\s\-\(\)]+$', re.ASCII)
+
+PASSWORD_SAMPLES = [
+    'Secreta1!',
+    'Secret1!',
+    'Secre1!',
+    'secreta1!',
+    'SECRETA1!',
+    'Secretas!',
+    'Secreta11',
+    'Secreta1!\n',
+    'Secreta1!\n\n',
+    'Secreta 1!',
+    'Secreta1#',
+    'Secreta1!ñ',
+    'Secreta١!',
+    'Aa1@Aa1@Aa1@Aa1@',
+    '',
+]
+
+PHONE_SAMPLES = [
+    '300 123 4567',
+    '(601) 555-0101',
+    '3001234567',
+    '300.123.4567',
+    '+57 300 123 4567',
+    '٣٠٠١٢٣',
+    '300\t123',
+    'abc',
+]
+
+
+def _form(form_class, **data):
+    return form_class(formdata=MultiDict(data))
+
+
+def _register_data(**overrides):
+    data = {
+        'first_name': 'Ana María',
+        'last_name': 'Núñez',
+        'country': 'CO',
+        'city': 'Bogotá',
+        'email': 'Ana@Example.com',
+        'password': 'Secreta1!',
+        'confirm_password': 'Secreta1!',
+        'preferred_language': 'es',
+        'terms_accepted': 'y',
+    }
+    data.update(overrides)
+    return data
+
+
+class TestPasswordComplexity:
+    @pytest.mark.parametrize('password', PASSWORD_SAMPLES)
+    def test_matches_original_pattern(self, password):
+        form = _form(ChangePasswordForm, current_password='x', new_password=password,
+                     confirm_new_password=password)
+        form.validate()
+        
+        complexity_failed = any('al menos: una minúscula' in error for error in form.new_password.errors)
+        assert complexity_failed == (PASSWORD_PATTERN.match(password) is None and password != '')
+
+
+class TestPersonalInfoFields:
+    @pytest.mark.parametrize('phone', PHONE_SAMPLES)
+    def test_phone_matches_original_pattern(self, phone):
+        form = _form(ProfileForm, **_register_data(phone_number=phone, timezone='UTC'))
+        form.validate()
+        
+        assert (not form.phone_number.errors) == bool(PHONE_PATTERN.match(phone))
+    
+    def test_valid_names(self):
+        form = _form(ProfileForm, **_register_data(timezone='UTC'))
+        
+        assert form.validate(), form.errors
+    
+    def test_empty_name_only_reports_required(self):
+        form = _form(ProfileForm, **_register_data(first_name='   ', timezone='UTC'))
+        form.validate()
+        
+        assert form.first_name.errors == ['El nombre es requerido']
+    
+    def test_reports_length_and_charset_errors_in_order(self):
+        form = _form(ProfileForm, **_register_data(last_name='1', timezone='UTC'))
+        form.validate()
+        
+        assert form.last_name.errors == [
+            'El apellido debe tener entre 2 y 50 caracteres',
+            'El apellido solo puede contener letras y espacios',
+        ]
+    
+    def test_city_has_no_charset_restriction(self):
+        form = _form(ProfileForm, **_register_data(city='Cali 2', timezone='UTC'))
+        form.validate()
+        
+        assert form.city.errors == []
+    
+    @pytest.mark.parametrize('timezone', sorted(TIMEZONE_KEYS))
+    def test_accepts_every_timezone_choice(self, timezone):
+        form = _form(ProfileForm, **_register_data(timezone=timezone))
+        
+        assert form.validate(), form.errors
+    
+    def test_rejects_unknown_timezone(self):
+        form = _form(ProfileForm, **_register_data(timezone='Mars/Olympus'))
+        form.validate()
+        
+        assert form.timezone.errors == ['Not a valid choice.']
+
+
+class TestEmailFields:
+    @pytest.mark.parametrize('email', ['sin-arroba', '@example.com', 'ana@', 'a@', 'x' * 2000 + '@example.com'])
+    def test_prefilter_rejects_impossible_emails(self, email):
+        form = _form(LoginForm, email=email, password='x')
+        form.validate()
+        
+        assert form.email.errors == ['Formato de email inválido']
+    
+    def test_valid_email(self):
+        form = _form(LoginForm, email='ana@example.com', password='x')
+        
+        assert form.validate(), form.errors
+    
+    def test_empty_email_only_reports_required(self):
+        form = _form(LoginForm, email='', password='x')
+        form.validate()
+        
+        assert form.email.errors == ['El email es requerido']
+
+
+class TestRegisterForm:
+    def test_valid_registration_lowercases_email(self, session):
+        form = _form(RegisterForm, **_register_data())
+        
+        assert form.validate(), form.errors
+        assert form.email.data == 'ana@example.com'
+    
+    def test_rejects_registered_email(self, session, user):
+        form = _form(RegisterForm, **_register_data(email=user.email.upper()))
+        form.validate()
+        
+        assert form.email.errors == ['Este email ya está registrado']
+    
+    def test_malformed_email_skips_duplicate_check(self, mocker):
+        email_exists = mocker.patch('app.models.user.User.email_exists')
+        form = _form(RegisterForm, **_register_data(email='no-es-un-email'))
+        form.validate()
+        
+        assert form.email.errors == ['Formato de email inválido']
+        email_exists.assert_not_called()
+    
+    def test_password_confirmation_must_match(self, mocker):
+        mocker.patch('app.models.user.User.email_exists', return_value=False)
+        form = _form(RegisterForm, **_register_data(confirm_password='Otra1234!'))
+        form.validate()
+        
+        assert form.confirm_password.errors == ['Las contraseñas no coinciden']
+    
+    def test_missing_confirmation_only_reports_required(self, mocker):
+        mocker.patch('app.models.user.User.email_exists', return_value=False)
+        form = _form(RegisterForm, **_register_data(confirm_password=''))
+        form.validate()
+        
+        assert form.confirm_password.errors == ['Confirma tu contraseña']
+
+
+class TestPasswordResetRequestForm:
+    def test_unknown_email(self, session):
+        form = _form(PasswordResetRequestForm, email='nadie@example.com')
+        form.validate()
+        
+        assert form.email.errors == ['No existe una cuenta con este email']
+    
+    def test_inactive_account(self, session, user):
+        from app.models.user import UserStatus
+        
+        user.status = UserStatus.INACTIVE
+        session.commit()
+        form = _form(PasswordResetRequestForm, email=user.email)
+        form.validate()
+        
+        assert form.email.errors == ['Esta cuenta está desactivada']
+    
+    def test_active_account(self, session, user):
+        form = _form(PasswordResetRequestForm, email=user.email.upper())
+        
+        assert form.validate(), form.errors
+
+
+class TestDeleteAccountForm:
+    @pytest.mark.parametrize('confirmation, valid', [
+        ('ELIMINAR', True),
+        ('eliminar', False),
+        ('ELIMINAR ', False),
+        ('ELIMINA', False),
+        ('ELIMINAR' * 1000, False),
+    ])
+    def test_confirmation_word(self, confirmation, valid):
+        form = _form(DeleteAccountForm, current_password='x', confirmation=confirmation)
+        
+        assert form.validate() == valid
@@ -0,0 +1,41 @@
+"""
+Tests de BaseModel
+"""
+
+from app.models.system_log import LogLevel, SystemLog
+
+
+def _log_rows(count):
+    return [{"action": f"accion_{i}", "level": LogLevel.INFO, "details": {"i": i}} for i in range(count)]
+
+
+class TestBulkCreate:
+    def test_inserts_all_rows_across_batches(self, session):
+        SystemLog.bulk_create(_log_rows(7), batch_size=3)
+        session.rollback()  # bulk_create ya confirmó la transacción
+        
+        logs = SystemLog.query.order_by(SystemLog.id).all()
+        assert [log.action for log in logs] == [f"accion_{i}" for i in range(7)]
+        assert [log.details for log in logs] == [{"i": i} for i in range(7)]
+    
+    def test_applies_column_defaults(self, session):
+        SystemLog.bulk_create(_log_rows(2))
+        
+        for log in SystemLog.query.all():
+            assert log.uuid is not None
+            assert log.created_at is not None
+            assert log.status is not None
+    
+    def test_returns_ids_in_insertion_order(self, session):
+        ids = SystemLog.bulk_create(_log_rows(5), batch_size=2, return_ids=True)
+        
+        assert len(ids) == 5
+        assert [SystemLog.find_by_id(log_id).action for log_id in ids] == [f"accion_{i}" for i in range(5)]
+    
+    def test_without_return_ids_returns_empty_list(self, session):
+        assert SystemLog.bulk_create(_log_rows(3)) == []
+        assert SystemLog.query.count() == 3
+    
+    def test_empty_mappings(self, session):
+        assert SystemLog.bulk_create([], return_ids=True) == []
+        assert SystemLog.query.count() == 0
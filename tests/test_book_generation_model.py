@@ -0,0 +1,54 @@
+"""
+Tests del modelo BookGeneration
+"""
+
+import pytest
+
+from app.models.book_generation import BookFile, BookGeneration
+
+
+@pytest.fixture
+def legacy_book(session, user):
+    """Libro anterior a book_files: sus rutas están en la columna JSON file_paths"""
+    book = BookGeneration(
+        user_id=user.id,
+        title="Libro antiguo",
+        file_paths={"pdf": "/books/antiguo.pdf", "epub": "/books/antiguo.epub"},
+    )
+    session.add(book)
+    session.commit()
+    return book
+
+
+class TestFilePaths:
+    def test_legacy_paths_are_read_from_json_column(self, legacy_book):
+        assert legacy_book.file_path_map == {"pdf": "/books/antiguo.pdf", "epub": "/books/antiguo.epub"}
+        assert legacy_book.get_file_path("epub") == "/books/antiguo.epub"
+        assert sorted(legacy_book.file_formats) == ["epub", "pdf"]
+    
+    def test_update_replaces_legacy_paths_with_book_files(self, session, legacy_book):
+        legacy_book.update_file_paths({"pdf": "/books/nuevo.pdf", "docx": "/books/nuevo.docx"})
+        
+        # Como antes (se reemplazaba el JSON completo), solo quedan las rutas nuevas
+        assert legacy_book.file_path_map == {"pdf": "/books/nuevo.pdf", "docx": "/books/nuevo.docx"}
+        assert legacy_book.get_file_path("epub") is None
+        assert BookFile.query.filter_by(book_id=legacy_book.id).count() == 2
+    
+    def test_update_upserts_existing_formats(self, session, legacy_book):
+        legacy_book.update_file_paths({"pdf": "/books/v1.pdf"})
+        legacy_book.update_file_paths({"pdf": "/books/v2.pdf", "epub": "/books/v2.epub"})
+        
+        assert legacy_book.file_path_map == {"pdf": "/books/v2.pdf", "epub": "/books/v2.epub"}
+        assert BookFile.query.filter_by(book_id=legacy_book.id, format="pdf").count() == 1
+    
+    def test_update_without_commit_is_rolled_back(self, session, legacy_book):
+        legacy_book.update_file_paths({"pdf": "/books/nuevo.pdf"}, commit=False)
+        session.rollback()
+        
+        assert BookFile.query.filter_by(book_id=legacy_book.id).count() == 0
+        assert legacy_book.file_path_map == {"pdf": "/books/antiguo.pdf", "epub": "/books/antiguo.epub"}
+    
+    def test_empty_update_keeps_paths(self, session, legacy_book):
+        legacy_book.update_file_paths({})
+        
+        assert legacy_book.file_path_map == {"pdf": "/books/antiguo.pdf", "epub": "/books/antiguo.epub"}
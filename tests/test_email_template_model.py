@@ -0,0 +1,47 @@
+"""
+Tests del modelo EmailTemplate
+"""
+
+from sqlalchemy import event
+
+from app.models import db
+from app.models.email_template import EmailTemplate
+
+
+def _count_queries(callback):
+    statements = []
+    
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        callback()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+    return len(statements)
+
+
+def test_active_templates_serialize_without_lazy_loads(session):
+    for name in ("welcome", "payment_confirmed", "subscription_expired"):
+        session.add(EmailTemplate(
+            name=name,
+            subject=f"Asunto {name}",
+            html_content=f"<p>{name}</p>",
+            text_content=name,
+            is_active=True,
+        ))
+    session.add(EmailTemplate(name="legacy", subject="Antigua", html_content="<p></p>", is_active=False))
+    session.commit()
+    session.expunge_all()
+    
+    serialized = []
+    queries = _count_queries(
+        lambda: serialized.extend(template.to_dict() for template in EmailTemplate.get_active_templates())
+    )
+    
+    # Una sola consulta: el contenido diferido viaja con la fila
+    assert queries == 1
+    assert sorted(item["name"] for item in serialized) == ["payment_confirmed", "subscription_expired", "welcome"]
+    assert all(item["html_content"] == f"<p>{item['name']}</p>" for item in serialized)
@@ -0,0 +1,56 @@
+"""
+Tests de los modelos Subscription y Payment
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.models.subscription import Payment, PaymentStatus
+
+
+@pytest.fixture
+def add_payment(session, user):
+    def add_payment(amount, created_at, status=PaymentStatus.COMPLETED):
+        payment = Payment(user_id=user.id, amount=Decimal(amount), status=status, created_at=created_at)
+        session.add(payment)
+        return payment
+    return add_payment
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class TestGetMonthlyRevenue:
+    def test_december_rolls_over_to_next_year(self, session, add_payment):
+        add_payment("10.00", _utc(2025, 12, 1))
+        add_payment("20.50", _utc(2025, 12, 31, 23, 59, 59))
+        add_payment("99.00", _utc(2026, 1, 1))
+        add_payment("5.00", _utc(2025, 11, 30, 23, 59, 59))
+        session.commit()
+        
+        assert Payment.get_monthly_revenue(2025, 12) == 30.5
+        assert Payment.get_monthly_revenue(2026, 1) == 99.0
+        assert Payment.get_monthly_revenue(2025, 11) == 5.0
+    
+    def test_month_bounds_are_utc(self, session, add_payment):
+        # 31 de enero 23:30 en Bogotá ya es 1 de febrero en UTC
+        bogota = timezone(timedelta(hours=-5))
+        add_payment("15.00", datetime(2026, 1, 31, 23, 30, tzinfo=bogota))
+        session.commit()
+        
+        assert Payment.get_monthly_revenue(2026, 1) == 0.0
+        assert Payment.get_monthly_revenue(2026, 2) == 15.0
+    
+    def test_only_completed_payments_count(self, session, add_payment):
+        add_payment("10.00", _utc(2026, 3, 10))
+        add_payment("40.00", _utc(2026, 3, 11), status=PaymentStatus.PENDING)
+        add_payment("50.00", _utc(2026, 3, 12), status=PaymentStatus.FAILED)
+        session.commit()
+        
+        assert Payment.get_monthly_revenue(2026, 3) == 10.0
+    
+    def test_month_without_payments(self, session):
+        assert Payment.get_monthly_revenue(2026, 4) == 0.0
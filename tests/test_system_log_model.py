@@ -0,0 +1,99 @@
+"""
+Tests de los modelos de sistema (SystemLog, BookDownload)
+"""
+
+import pytest
+
+from app.models.book_generation import BookGeneration
+from app.models.system_log import BookDownload, BookFormat, LogLevel, LogStatus, SystemLog
+
+
+@pytest.fixture
+def download(session, user):
+    book = BookGeneration(user_id=user.id, title="Libro descargado")
+    session.add(book)
+    session.flush()
+    download = BookDownload(user_id=user.id, book_id=book.id, format=BookFormat.PDF, download_count=1)
+    session.add(download)
+    session.commit()
+    return download
+
+
+class TestLogAction:
+    def test_flush_writes_queued_logs(self, session, user):
+        for i in range(25):
+            SystemLog.log_action(f"accion_{i}", user_id=user.id, details={"i": i})
+        
+        SystemLog.flush()
+        
+        logs = SystemLog.query.order_by(SystemLog.id).all()
+        assert [log.action for log in logs] == [f"accion_{i}" for i in range(25)]
+        assert all(log.user_id == user.id for log in logs)
+    
+    def test_returns_queued_values(self, session):
+        values = SystemLog.log_action("login_failed", level=LogLevel.WARNING, status=LogStatus.ERROR)
+        SystemLog.flush()
+        
+        assert values["action"] == "login_failed"
+        assert values["level"] == LogLevel.WARNING
+        log = SystemLog.query.one()
+        assert (log.level, log.status) == (LogLevel.WARNING, LogStatus.ERROR)
+    
+    def test_does_not_commit_callers_session(self, session, user):
+        user.first_name = "Cambiado"
+        SystemLog.log_action("perfil_actualizado", user_id=user.id)
+        SystemLog.flush()
+        session.rollback()
+        
+        assert user.first_name == "Ana"
+        assert SystemLog.query.count() == 1
+    
+    def test_flush_without_pending_logs_returns(self, session):
+        SystemLog.flush()
+        
+        assert SystemLog.query.count() == 0
+
+
+class TestIncrementDownloadCount:
+    def test_increments_in_the_database(self, session, download):
+        download.increment_download_count()
+        download.increment_download_count()
+        
+        assert download.download_count == 3
+        assert download.last_downloaded_at is not None
+    
+    def test_values_are_readable_before_commit(self, session, download):
+        download.increment_download_count(commit=False)
+        
+        # El atributo se relee con el valor del UPDATE, no queda una expresión SQL
+        assert download.download_count == 2
+        session.rollback()
+        assert download.download_count == 1
+
+
+
+class TestFormattedFileSize:
+    @pytest.mark.parametrize("file_size, expected", [
+        (None, None),
+        (0, None),
+        (1, "1.00 B"),
+        (1023, "1023.00 B"),
+        (1024, "1.00 KB"),
+        (1025, "1.00 KB"),
+        (1024 ** 2 - 1, "1024.00 KB"),
+        (1024 ** 2, "1.00 MB"),
+        (123456789, "117.74 MB"),
+        (1024 ** 3, "1.00 GB"),
+        (1024 ** 4, "1.00 TB"),
+        # TB es la unidad mayor: no se pasa a PB
+        (1024 ** 5, "1024.00 TB"),
+    ])
+    def test_boundaries(self, file_size, expected):
+        assert BookDownload(file_size=file_size).formatted_file_size == expected
+    
+    @pytest.mark.parametrize("file_size, expected", [
+        (-1, "-1.00 B"),
+        (-5000, "-5000.00 B"),
+    ])
+    def test_negative_sizes_stay_in_bytes(self, file_size, expected):
+        assert BookDownload(file_size=file_size).formatted_file_size == expected
@@ -0,0 +1,55 @@
+"""
+Tests del modelo User
+"""
+
+from app.models.book_generation import BookGeneration, BookStatus
+
+
+def _add_book(session, user, status, final_pages=None, final_words=None):
+    book = BookGeneration(
+        user_id=user.id,
+        title=f"Libro {status.value}",
+        status=status,
+        final_pages=final_pages,
+        final_words=final_words,
+    )
+    session.add(book)
+    return book
+
+
+class TestGetStatistics:
+    def test_counts_completed_books(self, session, user):
+        # Antes se comparaba el Enum con la cadena "completed" y siempre daba 0
+        _add_book(session, user, BookStatus.COMPLETED, final_pages=120, final_words=30000)
+        _add_book(session, user, BookStatus.COMPLETED, final_pages=80, final_words=20000)
+        _add_book(session, user, BookStatus.FAILED)
+        _add_book(session, user, BookStatus.QUEUED)
+        session.commit()
+        
+        stats = user.get_statistics()
+        
+        assert stats["total_books"] == 4
+        assert stats["completed_books"] == 2
+        assert stats["failed_books"] == 2
+        assert stats["total_pages"] == 200
+        assert stats["total_words"] == 50000
+    
+    def test_user_without_books(self, session, user):
+        stats = user.get_statistics()
+        
+        assert stats["total_books"] == 0
+        assert stats["completed_books"] == 0
+        assert stats["failed_books"] == 0
+        assert stats["total_pages"] == 0
+        assert stats["total_words"] == 0
+    
+    def test_ignores_other_users_books(self, session, user):
+        from app.models.user import User
+        
+        other = User(email="otro@example.com", password="Secreta123", first_name="Otro", last_name="Autor")
+        session.add(other)
+        session.commit()
+        _add_book(session, other, BookStatus.COMPLETED, final_pages=50, final_words=10000)
+        session.commit()
+        
+        assert user.get_statistics()["total_books"] == 0